@@ -5,17 +5,61 @@ Generador de infraestructura de red privada con kubernetes
 
 import json
 import os
-from typing import Any, Dict
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 from iac.composite import CompositeModule
 from iac.compute_factory import ParameterizedComputeFactory
+from iac.config_loader import LayeredConfigLoader
 from iac.dependency_injection import InfrastructureOrchestrator
 from iac.iam_module import IAMModule
+from iac.kubernetes_fleet import KubernetesFleet
 from iac.kubernetes_module import KubernetesModule
 from iac.network_composite import NetworkModuleBuilder
 from iac.network_factory import NetworkModuleFactory
+from iac.replica_sizing import ReplicaSizer
 from iac.singleton import ConfigSingleton
 
+# Valores por defecto de la configuración, sobrescritos por config/<entorno>.json
+# y por variables de entorno IAC_*
+DEFAULT_SETTINGS = {
+    "proyecto": "red-privada-k8s",
+    "region": "us-east-1",
+    "environment": "development",
+    "vpc_cidr": "10.0.0.0/16",
+    "subnet_count": 2,
+    "node_count": 3,
+    "master_instance_type": "t3.medium",
+    "worker_instance_type": "t3.medium",
+    # Tráfico objetivo por aplicación para dimensionar réplicas con benchmarks
+    # medidos: {app_name: {"target_rps": ..., "latency_slo_ms": ...}}
+    "replica_targets": {},
+    # Formato de los campos estructurados de los triggers: "repr" (str()) o "json"
+    "trigger_encoding": "repr",
+    # Ejecutar las políticas de seguridad sobre el modelo antes de exportar
+    "policy_check": True,
+    # Si hay violaciones de políticas, no se escriben los archivos
+    "policy_block_export": False,
+}
+
+# Reglas de seguridad compartidas con el pipeline
+POLICIES_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "pipeline", "policies"
+)
+
+
+def load_security_policies():
+    """
+    Importa pipeline/policies/security.py, con las mismas reglas que se
+    aplican al plan de terraform en el pipeline.
+    """
+    if POLICIES_DIR not in sys.path:
+        sys.path.insert(0, POLICIES_DIR)
+    import security
+
+    return security
+
 
 class InfrastructureBuilder:
     """
@@ -23,36 +67,51 @@ class InfrastructureBuilder:
     usando los patrones implementados y inyección de dependencias.
     """
 
-    def __init__(self, project_name: str = "red-privada-k8s"):
+    def __init__(self, project_name: str = None, env_name: str = None):
         """
-        Inicializa el builder de infraestructura
+        Inicializa el builder de infraestructura.
+        Sin env_name se usa el entorno activo del contexto (use_environment).
+        La configuración se carga por capas: DEFAULT_SETTINGS, config/<entorno>.json
+        y variables IAC_*; project_name, si se indica, tiene prioridad solo
+        para este build y no se guarda en la configuración compartida.
         """
-        # Usar Singleton para configuración global
-        self.config = ConfigSingleton(env_name="desarrollo-local")
-        self.config.set("proyecto", project_name)
-        self.config.set("region", "us-east-1")
-        self.config.set("environment", "development")
+        # Usar Singleton por entorno para la configuración
+        self.config = ConfigSingleton(env_name=env_name)
+        self.config.load(
+            LayeredConfigLoader(self.config.env_name, defaults=DEFAULT_SETTINGS)
+        )
+
+        # Leer siempre desde el mismo snapshot durante el build
+        self.settings = self.config.snapshot()
+        if project_name:
+            self.settings = self.settings.with_values({"proyecto": project_name})
+        project_name = self.settings.get("proyecto")
 
         # Inicializar orquestador con inyección de dependencias
         self.orchestrator = InfrastructureOrchestrator(project_name)
 
-        # Configuraciones por defecto
         self.network_config = {
             "vpc_name": f"{project_name}-vpc",
-            "vpc_cidr": "10.0.0.0/16",
-            "subnet_count": 2,
+            "vpc_cidr": self.settings.get("vpc_cidr"),
+            "subnet_count": self.settings.get("subnet_count"),
             "tags": {
                 "Project": project_name,
-                "Environment": self.config.get("environment"),
+                "Environment": self.settings.get("environment"),
                 "ManagedBy": "TerraformPatterns",
             },
         }
 
         self.kubernetes_config = {
             "cluster_name": f"{project_name}-cluster",
-            "node_count": 3,
-            "master_instance_type": "t3.medium",
-            "worker_instance_type": "t3.medium",
+            "node_count": self.settings.get("node_count"),
+            "master_instance_type": self.settings.get("master_instance_type"),
+            "worker_instance_type": self.settings.get("worker_instance_type"),
+            # Resultados de benchmark por réplica para dimensionar aplicaciones
+            "benchmarks_path": os.path.join(
+                os.path.dirname(os.path.abspath(__file__)),
+                "benchmarks",
+                "throughput.json",
+            ),
         }
 
         # Módulo composite final para exportación
@@ -67,7 +126,7 @@ class InfrastructureBuilder:
         )
 
         # Usar NetworkModuleBuilder con patrón Builder
-        network_builder = NetworkModuleBuilder(self.config.get("proyecto"))
+        network_builder = NetworkModuleBuilder(self.settings.get("proyecto"))
 
         # Construir red privada con dos subredes
         self.network_infrastructure = network_builder.with_private_network(
@@ -94,11 +153,13 @@ class InfrastructureBuilder:
         )
 
         # Crear módulo Kubernetes
-        self.k8s_module = KubernetesModule(self.config.get("proyecto"))
+        self.k8s_module = KubernetesModule(self.settings.get("proyecto"))
 
         # Inyectar dependencia de red (patrón de inyección de dependencias)
         self.k8s_module.inject_network_dependency(self.network_infrastructure)
 
+        sizing = self._replica_sizing()
+
         # Crear cluster con configuración
         self.k8s_module.create_cluster(
             cluster_name=self.kubernetes_config["cluster_name"],
@@ -122,6 +183,7 @@ class InfrastructureBuilder:
             image="nginx:1.21",
             replicas=2,
             ports=[80],
+            **sizing.get("nginx-demo", {}),
         )
 
         self.k8s_module.add_application(
@@ -130,6 +192,14 @@ class InfrastructureBuilder:
             image="prom/prometheus:latest",
             replicas=1,
             ports=[9090],
+            **sizing.get("prometheus", {}),
+        )
+
+        # Ubicar réplicas en los workers; el cluster crece si no alcanzan los nodos
+        scheduling = self.k8s_module.schedule_applications(resize_cluster=True)
+        self.kubernetes_config["node_count"] = scheduling["nodes_available"]
+        print(
+            f"[Builder] Scheduler: {scheduling['nodes_required']} nodos worker requeridos"
         )
 
         print(
@@ -137,6 +207,45 @@ class InfrastructureBuilder:
         )
         return self
 
+    def build_kubernetes_fleet(
+        self, cluster_specs: List[Dict[str, Any]], max_workers: int = None
+    ) -> "InfrastructureBuilder":
+        """
+        Construye clusters Kubernetes adicionales en paralelo sobre la misma red.
+        """
+        print(f"[Builder] Construyendo flota de {len(cluster_specs)} clusters")
+
+        fleet = KubernetesFleet(self.settings.get("proyecto"), max_workers)
+        fleet.inject_network_dependency(self.network_infrastructure)
+        fleet.add_clusters(cluster_specs)
+
+        fleet_resources = fleet.export().export()
+        self.final_module.add(fleet_resources)
+
+        print(f"[Builder] Flota creada con {len(fleet_resources['resource'])} recursos")
+        return self
+
+    def _replica_sizing(self) -> Dict[str, Dict[str, float]]:
+        """
+        Inyecta el dimensionador de réplicas y devuelve el tráfico objetivo
+        por aplicación. Sin benchmarks medidos (archivo ausente o con datos
+        de ejemplo) se usan las réplicas fijas.
+        """
+        benchmarks_path = self.kubernetes_config["benchmarks_path"]
+        if not os.path.exists(benchmarks_path):
+            return {}
+
+        replica_sizer = ReplicaSizer.from_file(benchmarks_path)
+        if replica_sizer.source != "measured":
+            print(
+                f"[Builder] Benchmarks sin mediciones (source "
+                f"'{replica_sizer.source}'), se usan réplicas fijas"
+            )
+            return {}
+
+        self.k8s_module.inject_replica_sizer(replica_sizer)
+        return self.settings.get("replica_targets") or {}
+
     def build_additional_compute_resources(self) -> "InfrastructureBuilder":
         """
         Construye recursos adicionales de compute usando Factory parametrizable.
@@ -196,22 +305,8 @@ class InfrastructureBuilder:
         network_resources = self.network_infrastructure.export_complete_infrastructure()
         k8s_resources = self.k8s_module.export_all_resources()
 
-        # Combinar todos los recursos en el módulo composite final
-        if "network_resources" in network_resources:
-            for resource in network_resources["network_resources"]:
-                self.final_module.add(resource)
-
-        if "iam_resources" in network_resources:
-            for resource in network_resources["iam_resources"]:
-                self.final_module.add(resource)
-
-        # Agregar recursos de Kubernetes
-        for resource_type, resources in k8s_resources.items():
-            if isinstance(resources, list):
-                for resource in resources:
-                    self.final_module.add(resource)
-            elif isinstance(resources, dict) and "resource" in resources:
-                self.final_module.add(resources)
+        self._add_to_final_module(network_resources, k8s_resources)
+        policy_results = self._prepare_final_module()
 
         # Exportar módulo composite final
         final_terraform_config = self.final_module.export()
@@ -219,9 +314,9 @@ class InfrastructureBuilder:
         # Preparar estructura final
         infrastructure_summary = {
             "project_config": {
-                "name": self.config.get("proyecto"),
-                "environment": self.config.get("environment"),
-                "region": self.config.get("region"),
+                "name": self.settings.get("proyecto"),
+                "environment": self.settings.get("environment"),
+                "region": self.settings.get("region"),
                 "created_with_patterns": [
                     "Singleton (ConfigSingleton)",
                     "Factory (NetworkFactory, ComputeFactory)",
@@ -247,7 +342,12 @@ class InfrastructureBuilder:
             },
             "dependency_analysis": complete_infrastructure.get("dependency_info", {}),
             "total_resources": len(final_terraform_config.get("resource", [])),
+            "expectation_manifest": self._build_expectation_manifest(),
         }
+        if policy_results is not None:
+            infrastructure_summary["policy_violations"] = {
+                name: errors for name, errors in policy_results if errors
+            }
 
         # Exportar archivos si se especifica una ruta
         if output_path:
@@ -272,6 +372,77 @@ class InfrastructureBuilder:
             "orchestration_details": complete_infrastructure,
         }
 
+    def _add_to_final_module(
+        self, network_resources: Dict[str, Any], k8s_resources: Dict[str, Any]
+    ) -> None:
+        """
+        Combina los recursos de red, IAM y Kubernetes en el módulo composite final.
+        """
+        if "network_resources" in network_resources:
+            for resource in network_resources["network_resources"]:
+                self.final_module.add(resource)
+
+        if "iam_resources" in network_resources:
+            for resource in network_resources["iam_resources"]:
+                self.final_module.add(resource)
+
+        # Agregar recursos de Kubernetes
+        for resource_type, resources in k8s_resources.items():
+            if isinstance(resources, list):
+                for resource in resources:
+                    self.final_module.add(resource)
+            elif isinstance(resources, dict) and "resource" in resources:
+                self.final_module.add(resources)
+
+    def _prepare_final_module(self) -> Optional[List[Tuple[str, List[str]]]]:
+        """
+        Codifica los triggers estructurados y ejecuta las políticas de
+        seguridad si están activadas; devuelve sus resultados o None.
+        """
+        if self.settings.get("trigger_encoding") == "json":
+            self.final_module.encode_structured_triggers()
+
+        if self.settings.get("policy_check"):
+            return self.check_policies()
+        return None
+
+    def check_policies(self) -> List[Tuple[str, List[str]]]:
+        """
+        Ejecuta las políticas de seguridad sobre los recursos del módulo final,
+        sin pasar por terraform plan. Con policy_block_export, las violaciones
+        detienen la exportación antes de escribir archivos.
+        """
+        security = load_security_policies()
+
+        start = time.perf_counter()
+        results = list(security.run_rules(self.final_module.iter_plan_resources()))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        violations = [(name, error) for name, errors in results for error in errors]
+        print(
+            f"Políticas de seguridad: {len(violations)} violaciones "
+            f"en {elapsed_ms:.1f} ms"
+        )
+        for name, error in violations:
+            print(f"  - [{name}] {error}")
+
+        if violations and self.settings.get("policy_block_export"):
+            raise ValueError(
+                f"Exportación bloqueada: {len(violations)} violaciones de políticas"
+            )
+        return results
+
+    def _build_expectation_manifest(self) -> Dict[str, Any]:
+        """
+        Construye el manifiesto de expectativas que usa el validador del plan:
+        total de recursos y cantidad por resource_type.
+        """
+        resource_types = self.final_module.count_resource_types()
+        return {
+            "total_resources": sum(resource_types.values()),
+            "resource_types": dict(sorted(resource_types.items())),
+        }
+
     def _export_terraform_files(
         self,
         terraform_config: Dict[str, Any],
@@ -294,3 +465,24 @@ class InfrastructureBuilder:
         summary_path = os.path.join(output_path, "infrastructure_summary.json")
         with open(summary_path, "w") as f:
             json.dump(summary, f, indent=2)
+
+
+def main(output_path: str = None) -> Dict[str, Any]:
+    """
+    Construye la infraestructura completa y exporta main.tf.json e
+    infrastructure_summary.json en output_path (por defecto terraform/).
+    """
+    output_path = output_path or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "terraform"
+    )
+    return (
+        InfrastructureBuilder()
+        .build_network_infrastructure()
+        .build_kubernetes_cluster()
+        .build_additional_compute_resources()
+        .finalize_and_export(output_path)
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -2,7 +2,25 @@
 Permite tratar múltiples recursos Terraform como una única unidad lógica o módulo compuesto.
 """
 
-from typing import Any, Dict, List
+import ast
+import json
+from collections import Counter
+from typing import Any, Dict, Iterator, List
+
+# Campos de triggers que guardan colecciones serializadas como texto
+STRUCTURED_TRIGGER_FIELDS = frozenset(
+    {
+        "tags",
+        "ports",
+        "environment",
+        "routes",
+        "attached_policies",
+        "source_policies",
+        "labels",
+        "annotations",
+        "placement",
+    }
+)
 
 
 class CompositeModule:
@@ -33,3 +51,59 @@ class CompositeModule:
             # Combina ordenadamente todos los bloques resource de los hijos
             aggregated["resource"].extend(child.get("resource", []))
         return aggregated
+
+    def iter_triggers(self) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre los triggers de cada instancia null_resource del módulo.
+        """
+        for child in self._children:
+            for block in child.get("resource", []):
+                for null_resource in block.get("null_resource", []):
+                    for instances in null_resource.values():
+                        for instance in instances:
+                            yield instance.get("triggers", {})
+
+    def iter_plan_resources(self) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre las instancias null_resource con el formato de los recursos de
+        planned_values en terraform show -json (address, type, name y triggers).
+        """
+        for child in self._children:
+            for block in child.get("resource", []):
+                for null_resource in block.get("null_resource", []):
+                    for name, instances in null_resource.items():
+                        for instance in instances:
+                            yield {
+                                "address": f"null_resource.{name}",
+                                "mode": "managed",
+                                "type": "null_resource",
+                                "name": name,
+                                "values": {"triggers": instance.get("triggers", {})},
+                            }
+
+    def count_resource_types(self) -> Counter:
+        """
+        Cuenta las instancias null_resource del módulo por resource_type.
+        """
+        return Counter(
+            triggers.get("resource_type", "") for triggers in self.iter_triggers()
+        )
+
+    def encode_structured_triggers(self) -> None:
+        """
+        Reescribe como JSON los campos estructurados de los triggers, que los
+        factories serializan con str(). Terraform solo admite strings en los
+        triggers de null_resource, por eso los mapas se guardan como texto JSON.
+        """
+        encoded: Dict[str, str] = {}
+        # Los triggers pueden compartirse entre instancias; no recodificar
+        done = set()
+        for triggers in self.iter_triggers():
+            for field in STRUCTURED_TRIGGER_FIELDS.intersection(triggers):
+                value = triggers[field]
+                if not isinstance(value, str) or not value or value in done:
+                    continue
+                if value not in encoded:
+                    encoded[value] = json.dumps(ast.literal_eval(value))
+                    done.add(encoded[value])
+                triggers[field] = encoded[value]
@@ -0,0 +1,169 @@
+"""
+Carga de configuración por capas: valores por defecto, un archivo por entorno
+y variables de entorno, en ese orden de prioridad.
+El archivo parseado se guarda en una caché binaria (marshal) indexada por
+hash y mtime, y un watcher vuelve a parsear solo la capa del archivo cuando
+cambia.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .file_cache import cache_file_name, load_cached
+
+logger = logging.getLogger(__name__)
+
+# Directorio config/ en la raíz del repositorio
+DEFAULT_CONFIG_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config"
+)
+
+
+class LayeredConfigLoader:
+    """
+    Lee las capas de configuración de un entorno.
+    Capas: defaults (dict en código), file (<config_dir>/<entorno>.json)
+    y environment (variables con prefijo, p. ej. IAC_NODE_COUNT=5).
+    """
+
+    LAYERS = ("defaults", "file", "environment")
+
+    def __init__(
+        self,
+        env_name: str,
+        defaults: Dict[str, Any] = None,
+        config_dir: str = DEFAULT_CONFIG_DIR,
+        env_prefix: str = "IAC_",
+        cache_dir: Optional[str] = None,
+    ):
+        """
+        Inicializa el cargador para un entorno.
+        """
+        self.env_name = env_name
+        self.defaults = dict(defaults or {})
+        self.config_path = os.path.join(config_dir, f"{env_name}.json")
+        self.env_prefix = env_prefix
+        self.cache_dir = cache_dir or os.path.join(config_dir, ".cache")
+        # (mtime_ns, tamaño) del archivo la última vez que se leyó
+        self._file_stat: Optional[Tuple[int, int]] = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        """
+        Obtiene mtime y tamaño del archivo del entorno, o None si no existe.
+        """
+        try:
+            stat = os.stat(self.config_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _cache_path(self) -> str:
+        """
+        Ruta del archivo de caché del entorno.
+        """
+        return os.path.join(self.cache_dir, cache_file_name(self.config_path))
+
+    def _parse(self, content: bytes) -> Dict[str, Any]:
+        """
+        Parsea el archivo del entorno, que debe contener un objeto JSON.
+        """
+        data = json.loads(content)
+        if not isinstance(data, dict):
+            raise ValueError(f"{self.config_path} debe contener un objeto JSON")
+        return data
+
+    def load_defaults(self) -> Dict[str, Any]:
+        """
+        Capa de valores por defecto.
+        """
+        return dict(self.defaults)
+
+    def load_file(self) -> Dict[str, Any]:
+        """
+        Capa del archivo del entorno.
+        Si mtime y tamaño coinciden con la caché se usa sin leer el archivo;
+        si cambiaron pero el hash es el mismo, se evita volver a parsear.
+        """
+        file_stat = self._stat()
+        self._file_stat = file_stat
+        if file_stat is None:
+            return {}
+        return load_cached(self.config_path, self._cache_path(), self._parse)
+
+    def load_environment(self) -> Dict[str, Any]:
+        """
+        Capa de variables de entorno. Los valores se interpretan como JSON
+        cuando es posible (números, booleanos) y si no como texto.
+        """
+        values = {}
+        for name, raw in os.environ.items():
+            if not name.startswith(self.env_prefix):
+                continue
+            key = name[len(self.env_prefix) :].lower()
+            try:
+                values[key] = json.loads(raw)
+            except ValueError:
+                values[key] = raw
+        return values
+
+    def load_layers(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Carga todas las capas en orden de prioridad ascendente.
+        """
+        return {
+            "defaults": self.load_defaults(),
+            "file": self.load_file(),
+            "environment": self.load_environment(),
+        }
+
+    def file_changed(self) -> bool:
+        """
+        Indica si el archivo del entorno cambió desde la última lectura.
+        """
+        return self._stat() != self._file_stat
+
+
+class ConfigWatcher:
+    """
+    Hilo daemon que consulta periódicamente si la configuración cambió
+    y ejecuta la recarga. Si una recarga falla (p. ej. un archivo a medio
+    guardar) el error se registra, se conserva la última configuración
+    válida y se sigue consultando.
+    """
+
+    def __init__(self, reload: Callable[[], Any], interval: float = 1.0):
+        """
+        Inicializa el watcher con la función de recarga y el intervalo en segundos.
+        """
+        self.reload = reload
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "ConfigWatcher":
+        """
+        Inicia el watcher.
+        """
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Detiene el watcher y espera a que termine.
+        """
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self) -> None:
+        """
+        Bucle de consulta hasta que se detenga el watcher.
+        """
+        while not self._stop.wait(self.interval):
+            try:
+                self.reload()
+            except Exception:
+                logger.exception("Error recargando la configuración")
@@ -0,0 +1,105 @@
+"""
+Caché en disco del contenido parseado de un archivo.
+Cada entrada se guarda con marshal, que se carga bastante más rápido que
+volver a parsear el JSON original, junto con el mtime, el tamaño y el hash
+del archivo; si la entrada no se puede leer o no tiene el formato esperado,
+se descarta y se vuelve a parsear el archivo.
+"""
+
+import hashlib
+import marshal
+import os
+from typing import Any, Callable, Dict, Optional
+
+# Campos obligatorios de una entrada y su tipo
+_ENTRY_FIELDS = {
+    "version": int,
+    "marshal_version": int,
+    "mtime_ns": int,
+    "size": int,
+    "sha256": str,
+}
+
+
+def cache_file_name(path: str, prefix: str = "") -> str:
+    """
+    Nombre del archivo de caché de un archivo, derivado de su ruta absoluta.
+    """
+    key = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()
+    return f"{prefix}{key[:16]}.marshal"
+
+
+def _read_entry(cache_path: str, version: int) -> Optional[Dict[str, Any]]:
+    """
+    Lee una entrada de caché, o None si no existe, está dañada o es de
+    otra versión del formato.
+    """
+    try:
+        with open(cache_path, "rb") as f:
+            entry = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+    if not isinstance(entry, dict) or "data" not in entry:
+        return None
+    for field, field_type in _ENTRY_FIELDS.items():
+        if not isinstance(entry.get(field), field_type):
+            return None
+    current = (version, marshal.version)
+    return entry if (entry["version"], entry["marshal_version"]) == current else None
+
+
+def _write_entry(cache_path: str, entry: Dict[str, Any]) -> None:
+    """
+    Escribe la entrada de caché de forma atómica; si falla, se ignora.
+    """
+    content = marshal.dumps(entry)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temp_path, "wb") as f:
+            f.write(content)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass
+
+
+def load_cached(
+    path: str, cache_path: str, parse: Callable[[bytes], Any], version: int = 1
+) -> Any:
+    """
+    Devuelve el contenido parseado de un archivo usando la caché.
+    Si mtime y tamaño coinciden con la caché no se lee el archivo; si
+    cambiaron pero el hash es el mismo, se evita volver a parsear.
+    parse recibe el contenido del archivo y debe devolver datos simples
+    (dict, list, str, números, bool o None) que marshal pueda guardar.
+    """
+    stat = os.stat(path)
+    cached = _read_entry(cache_path, version)
+    if cached and (cached["mtime_ns"], cached["size"]) == (
+        stat.st_mtime_ns,
+        stat.st_size,
+    ):
+        return cached["data"]
+
+    with open(path, "rb") as f:
+        content = f.read()
+    digest = hashlib.sha256(content).hexdigest()
+
+    if cached and cached["sha256"] == digest:
+        data = cached["data"]
+    else:
+        data = parse(content)
+
+    _write_entry(
+        cache_path,
+        {
+            "version": version,
+            "marshal_version": marshal.version,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "data": data,
+        },
+    )
+    return data
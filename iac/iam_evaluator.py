@@ -0,0 +1,328 @@
+"""
+Evaluador compilado de políticas IAM generadas.
+Parsea una sola vez los documentos de política, compila los comodines de
+Action y Resource en matchers y responde si un rol o usuario puede ejecutar
+una acción sobre un recurso.
+"""
+
+import ast
+import fnmatch
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Acciones que ningún rol generado debería poder ejecutar
+SENSITIVE_ACTIONS = [
+    "iam:CreateUser",
+    "iam:CreateAccessKey",
+    "iam:AttachRolePolicy",
+    "iam:PutRolePolicy",
+    "iam:PassRole",
+    "ec2:TerminateInstances",
+    "ec2:DeleteVpc",
+    "eks:DeleteCluster",
+]
+
+
+class WildcardMatcher:
+    """
+    Matcher precompilado para un conjunto de patrones con comodines * y ?.
+    Separa los patrones exactos, los de prefijo (terminados en un solo *)
+    y el resto, que se combinan en una única expresión regular.
+    Con negated coincide con todo lo que no cumple los patrones
+    (NotAction y NotResource).
+    """
+
+    def __init__(
+        self,
+        patterns: Iterable[str],
+        case_sensitive: bool = True,
+        negated: bool = False,
+    ):
+        """
+        Compila los patrones.
+        """
+        self.case_sensitive = case_sensitive
+        self.negated = negated
+        self.match_all = False
+        exact = set()
+        prefixes = []
+        generic = []
+
+        for pattern in patterns:
+            if not case_sensitive:
+                pattern = pattern.lower()
+
+            if pattern == "*":
+                self.match_all = True
+            elif "*" not in pattern and "?" not in pattern:
+                exact.add(pattern)
+            elif (
+                pattern.endswith("*") and "*" not in pattern[:-1] and "?" not in pattern
+            ):
+                prefixes.append(pattern[:-1])
+            else:
+                generic.append(fnmatch.translate(pattern))
+
+        self.exact = frozenset(exact)
+        self.prefixes = tuple(prefixes)
+        self.regex = re.compile("|".join(generic), re.DOTALL) if generic else None
+
+    def matches(self, value: str) -> bool:
+        """
+        Indica si el valor coincide con alguno de los patrones
+        (o con ninguno, si el matcher es negado).
+        """
+        return self._matches_patterns(value) != self.negated
+
+    def _has_patterns(self) -> bool:
+        """
+        Indica si el matcher tiene algún patrón.
+        """
+        return self.match_all or bool(self.exact or self.prefixes or self.regex)
+
+    def matches_everything(self) -> bool:
+        """
+        Indica si el matcher coincide con cualquier valor.
+        """
+        if self.negated:
+            return not self._has_patterns()
+        return self.match_all
+
+    def matches_something(self) -> bool:
+        """
+        Indica si existe algún valor con el que el matcher coincida.
+        """
+        if self.negated:
+            return not self.match_all
+        return self._has_patterns()
+
+    def _matches_patterns(self, value: str) -> bool:
+        """
+        Indica si el valor coincide con alguno de los patrones.
+        """
+        if self.match_all:
+            return True
+        if not self.case_sensitive:
+            value = value.lower()
+        return (
+            value in self.exact
+            or (bool(self.prefixes) and value.startswith(self.prefixes))
+            or (self.regex is not None and self.regex.match(value) is not None)
+        )
+
+
+# Sentencia compilada: (efecto, matcher de acciones, matcher de recursos)
+CompiledStatement = Tuple[str, WildcardMatcher, WildcardMatcher]
+
+
+def _as_list(value: Any) -> List[str]:
+    """
+    Normaliza campos de política que pueden ser string o lista.
+    """
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _parse_statements(policy_document: Any) -> Optional[List[Dict[str, Any]]]:
+    """
+    Sentencias de un documento de política, o None si falta o no es un
+    objeto JSON válido.
+    """
+    try:
+        document = json.loads(policy_document)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(document, dict):
+        return None
+
+    statements = document.get("Statement", [])
+    return [statements] if isinstance(statements, dict) else statements
+
+
+def _statement_matcher(
+    statement: Dict[str, Any], field: str, case_sensitive: bool
+) -> WildcardMatcher:
+    """
+    Compila el campo de una sentencia (Action o Resource), o su forma
+    negada (NotAction o NotResource) si la sentencia usa esa.
+    """
+    negated_field = f"Not{field}"
+    if negated_field in statement:
+        return WildcardMatcher(
+            _as_list(statement[negated_field]), case_sensitive, negated=True
+        )
+    return WildcardMatcher(_as_list(statement.get(field, [])), case_sensitive)
+
+
+class IAMPolicyEvaluator:
+    """
+    Evalúa permisos de roles y usuarios a partir de las políticas IAM generadas.
+    Aplica la semántica de IAM: un Deny explícito prevalece sobre cualquier Allow
+    y sin Allow aplicable la acción se deniega.
+    """
+
+    def __init__(self) -> None:
+        """
+        Inicializa el evaluador vacío.
+        """
+        self.policies: Dict[str, List[CompiledStatement]] = {}
+        self.principals: Dict[str, List[str]] = {}
+        # Políticas con un documento que no es un objeto JSON válido
+        self.invalid_policies: List[str] = []
+        # Documentos ya compilados, compartidos entre políticas idénticas
+        self._compiled_documents: Dict[str, List[CompiledStatement]] = {}
+
+    @classmethod
+    def from_triggers(
+        cls, triggers_list: Iterable[Dict[str, Any]]
+    ) -> "IAMPolicyEvaluator":
+        """
+        Construye el evaluador desde los triggers de recursos IAM.
+        Acepta tanto recursos generados como recursos de un plan de Terraform.
+        """
+        evaluator = cls()
+        for triggers in triggers_list:
+            resource_type = triggers.get("resource_type")
+            if resource_type == "iam_policy":
+                evaluator.add_policy(triggers["name"], triggers.get("policy_document"))
+            elif resource_type in ("iam_role", "iam_user"):
+                evaluator.add_principal(
+                    triggers["name"], triggers.get("attached_policies", "[]")
+                )
+        return evaluator
+
+    @classmethod
+    def from_resources(
+        cls, resources: Iterable[Dict[str, Any]]
+    ) -> "IAMPolicyEvaluator":
+        """
+        Construye el evaluador desde recursos generados por las factories IAM.
+        """
+        triggers_list = []
+        for resource in resources:
+            for block in resource.get("resource", []):
+                for null_resource in block.get("null_resource", []):
+                    for instances in null_resource.values():
+                        triggers_list.extend(
+                            instance.get("triggers", {}) for instance in instances
+                        )
+        return cls.from_triggers(triggers_list)
+
+    def add_policy(
+        self, name: str, policy_document: Optional[str]
+    ) -> "IAMPolicyEvaluator":
+        """
+        Parsea y compila un documento de política.
+        Las políticas sin documento (que reporta la regla "seguridad iam") o
+        con un documento inválido se omiten; las inválidas quedan en
+        invalid_policies.
+        """
+        compiled = self._compiled_documents.get(policy_document)
+        if compiled is None:
+            statements = _parse_statements(policy_document)
+            if statements is None:
+                if policy_document is not None:
+                    self.invalid_policies.append(name)
+                return self
+
+            compiled = [
+                (
+                    statement.get("Effect", "Allow"),
+                    # Las acciones IAM no distinguen mayúsculas
+                    _statement_matcher(statement, "Action", False),
+                    _statement_matcher(statement, "Resource", True),
+                )
+                for statement in statements
+            ]
+            self._compiled_documents[policy_document] = compiled
+
+        self.policies[name] = compiled
+        return self
+
+    def add_principal(self, name: str, attached_policies: Any) -> "IAMPolicyEvaluator":
+        """
+        Registra un rol o usuario con sus políticas adjuntas.
+        """
+        if isinstance(attached_policies, str):
+            attached_policies = ast.literal_eval(attached_policies)
+        self.principals[name] = list(attached_policies)
+        return self
+
+    def _statements(self, principal: str) -> List[CompiledStatement]:
+        """
+        Sentencias compiladas de todas las políticas de un principal.
+        """
+        if principal not in self.principals:
+            raise ValueError(f"Rol o usuario '{principal}' no registrado")
+
+        statements = []
+        for policy in self.principals[principal]:
+            statements.extend(self.policies.get(policy, []))
+        return statements
+
+    def is_allowed(
+        self, principal: str, action: str, resource: Optional[str] = None
+    ) -> bool:
+        """
+        Indica si el principal puede ejecutar la acción sobre el recurso.
+        Sin recurso se evalúa la acción sobre cualquier recurso.
+        """
+        return self._decide(self._statements(principal), action, resource)
+
+    @staticmethod
+    def _decide(
+        statements: List[CompiledStatement],
+        action: str,
+        resource: Optional[str],
+    ) -> bool:
+        """
+        Aplica la lógica Deny explícito > Allow > Deny implícito.
+        Sin recurso, un Deny solo bloquea si cubre todos los recursos y un
+        Allow solo cuenta si cubre alguno.
+        """
+        allowed = False
+        for effect, actions, resources in statements:
+            if not actions.matches(action):
+                continue
+            if effect == "Deny":
+                if resource is None:
+                    blocks = resources.matches_everything()
+                else:
+                    blocks = resources.matches(resource)
+                if blocks:
+                    return False
+            elif resource is None:
+                allowed = allowed or resources.matches_something()
+            elif resources.matches(resource):
+                allowed = True
+        return allowed
+
+    def sweep(
+        self, actions: Iterable[str], resource: Optional[str] = None
+    ) -> Dict[str, List[str]]:
+        """
+        Evalúa todos los pares rol × acción y devuelve, por principal,
+        las acciones permitidas.
+        """
+        actions = list(actions)
+        granted = {}
+        # Principales con las mismas políticas comparten el resultado
+        by_policies: Dict[Tuple[str, ...], List[str]] = {}
+        for principal, policies in self.principals.items():
+            key = tuple(policies)
+            if key not in by_policies:
+                statements = self._statements(principal)
+                by_policies[key] = [
+                    action
+                    for action in actions
+                    if self._decide(statements, action, resource)
+                ]
+            granted[principal] = by_policies[key]
+        return granted
+
+    def find_privileged(self, actions: Iterable[str] = None) -> Dict[str, List[str]]:
+        """
+        Obtiene los principales que pueden ejecutar alguna acción sensible.
+        """
+        granted = self.sweep(actions or SENSITIVE_ACTIONS)
+        return {principal: found for principal, found in granted.items() if found}
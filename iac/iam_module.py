@@ -3,10 +3,70 @@ Módulo para crear roles, políticas y usuarios IAM ficticios
 usando patrones Composite y Factory para reutilización.
 """
 
+import ast
+import hashlib
 import json
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple, Union
+
+
+@lru_cache(maxsize=None)
+def serialize_policy_document(
+    actions: Tuple[str, ...], resources: Union[str, Tuple[str, ...]]
+) -> Tuple[str, str]:
+    """
+    Serializa un documento de política una sola vez por contenido.
+    Devuelve el JSON emitido en los triggers y el hash de su forma canónica.
+    """
+    policy_document = {
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Action": list(actions),
+                "Resource": (
+                    resources if isinstance(resources, str) else list(resources)
+                ),
+            }
+        ],
+    }
+    return json.dumps(policy_document), _document_hash(policy_document)
+
+
+@lru_cache(maxsize=None)
+def serialize_trust_policy(principal_type: str, principal: str) -> str:
+    """
+    Serializa una política de confianza una sola vez por principal.
+    """
+    trust_policy = {
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Principal": {principal_type: principal},
+                "Action": "sts:AssumeRole",
+            }
+        ],
+    }
+    return json.dumps(trust_policy)
+
+
+def _document_hash(document: Dict[str, Any]) -> str:
+    """
+    Hash del documento en forma canónica (claves ordenadas, sin espacios).
+    """
+    canonical = json.dumps(document, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def _resource_triggers(resource: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Obtiene los triggers de un recurso null_resource generado por las factories.
+    """
+    null_resource = resource["resource"][0]["null_resource"][0]
+    return next(iter(null_resource.values()))[0]["triggers"]
 
 
 class IAMPolicyFactory:
@@ -29,18 +89,16 @@ class IAMPolicyFactory:
         ]
         resources = resources or ["*"]
 
-        policy_document = {
-            "Version": "2012-10-17",
-            "Statement": [
-                {"Effect": "Allow", "Action": actions, "Resource": resources}
-            ],
-        }
+        policy_document, document_hash = serialize_policy_document(
+            tuple(actions), tuple(resources)
+        )
 
         triggers = {
             "resource_type": "iam_policy",
             "name": name,
             "policy_id": f"pol-{uuid.uuid4().hex[:8]}",
-            "policy_document": json.dumps(policy_document),
+            "policy_document": policy_document,
+            "document_hash": document_hash,
             "policy_type": "ec2",
             "created_at": datetime.utcnow().isoformat(),
         }
@@ -64,21 +122,19 @@ class IAMPolicyFactory:
         ]
 
         resources = (
-            [f"arn:aws:eks:*:*:cluster/{cluster_name}"] if cluster_name else ["*"]
+            (f"arn:aws:eks:*:*:cluster/{cluster_name}",) if cluster_name else ("*",)
         )
 
-        policy_document = {
-            "Version": "2012-10-17",
-            "Statement": [
-                {"Effect": "Allow", "Action": actions, "Resource": resources}
-            ],
-        }
+        policy_document, document_hash = serialize_policy_document(
+            tuple(actions), resources
+        )
 
         triggers = {
             "resource_type": "iam_policy",
             "name": name,
             "policy_id": f"pol-{uuid.uuid4().hex[:8]}",
-            "policy_document": json.dumps(policy_document),
+            "policy_document": policy_document,
+            "document_hash": document_hash,
             "policy_type": "kubernetes",
             "cluster_dependency": cluster_name or "any",
             "created_at": datetime.utcnow().isoformat(),
@@ -104,16 +160,14 @@ class IAMPolicyFactory:
             "ec2:AuthorizeSecurityGroupIngress",
         ]
 
-        policy_document = {
-            "Version": "2012-10-17",
-            "Statement": [{"Effect": "Allow", "Action": actions, "Resource": "*"}],
-        }
+        policy_document, document_hash = serialize_policy_document(tuple(actions), "*")
 
         triggers = {
             "resource_type": "iam_policy",
             "name": name,
             "policy_id": f"pol-{uuid.uuid4().hex[:8]}",
-            "policy_document": json.dumps(policy_document),
+            "policy_document": policy_document,
+            "document_hash": document_hash,
             "policy_type": "network",
             "vpc_dependency": vpc_name or "any",
             "created_at": datetime.utcnow().isoformat(),
@@ -125,6 +179,157 @@ class IAMPolicyFactory:
             ]
         }
 
+    @staticmethod
+    def create_packed_policy(
+        name: str, policy_document: Dict[str, Any], source_policies: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Crea una política IAM a partir de un documento empaquetado
+        que combina las sentencias de otras políticas.
+        """
+        triggers = {
+            "resource_type": "iam_policy",
+            "name": name,
+            "policy_id": f"pol-{uuid.uuid4().hex[:8]}",
+            "policy_document": json.dumps(policy_document),
+            "document_hash": _document_hash(policy_document),
+            "policy_type": "packed",
+            "source_policies": str(source_policies),
+            "created_at": datetime.utcnow().isoformat(),
+        }
+
+        return {
+            "resource": [
+                {"null_resource": [{f"iam_policy_{name}": [{"triggers": triggers}]}]}
+            ]
+        }
+
+
+class IAMPolicyPacker:
+    """
+    Empaqueta sentencias IAM en la menor cantidad de políticas posible.
+    Fusiona las sentencias con el mismo efecto y conjunto de recursos,
+    deduplica acciones y reparte las sentencias con first-fit-decreasing
+    sin superar el tamaño máximo del documento.
+    """
+
+    # Límite de AWS para políticas administradas (caracteres sin espacios)
+    DEFAULT_MAX_DOCUMENT_SIZE = 6144
+
+    # Tamaño de {"Version":"2012-10-17","Statement":[]} sin sentencias
+    _DOCUMENT_OVERHEAD = len(
+        json.dumps({"Version": "2012-10-17", "Statement": []}, separators=(",", ":"))
+    )
+
+    # Campos de las sentencias que merge_statements sabe fusionar
+    _MERGEABLE_FIELDS = frozenset({"Effect", "Action", "Resource"})
+
+    def __init__(self, max_document_size: int = DEFAULT_MAX_DOCUMENT_SIZE):
+        """
+        Inicializa el empaquetador con el tamaño máximo de documento.
+        """
+        self.max_document_size = max_document_size
+
+    @staticmethod
+    def _size(statement: Dict[str, Any]) -> int:
+        """
+        Tamaño serializado compacto de una sentencia.
+        """
+        return len(json.dumps(statement, separators=(",", ":")))
+
+    def merge_statements(
+        self, statements: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Fusiona sentencias con el mismo efecto y recursos, deduplicando acciones.
+        Las sentencias con otros campos (NotAction, Condition, Sid...) se
+        conservan tal cual, porque fusionarlas cambiaría su significado.
+        """
+        merged: Dict[Tuple[str, Tuple[str, ...]], Dict[str, None]] = {}
+        kept: List[Dict[str, Any]] = []
+        for statement in statements:
+            if not self._MERGEABLE_FIELDS.issuperset(statement):
+                kept.append(statement)
+                continue
+            resources = statement.get("Resource", "*")
+            resources = [resources] if isinstance(resources, str) else resources
+            actions = statement.get("Action", [])
+            actions = [actions] if isinstance(actions, str) else actions
+
+            key = (statement.get("Effect", "Allow"), tuple(sorted(set(resources))))
+            # dict.fromkeys deduplica; las acciones se ordenan al emitir
+            # para que el documento y su hash no dependan del orden de entrada
+            merged.setdefault(key, {}).update(dict.fromkeys(actions))
+
+        return kept + [
+            {
+                "Effect": effect,
+                "Action": sorted(actions),
+                "Resource": list(resources) if len(resources) > 1 else resources[0],
+            }
+            for (effect, resources), actions in merged.items()
+        ]
+
+    def _split(self, statement: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Divide una sentencia demasiado grande en varias con los mismos recursos.
+        """
+        limit = self.max_document_size - self._DOCUMENT_OVERHEAD
+        if self._size(statement) <= limit:
+            return [statement]
+        if not self._MERGEABLE_FIELDS.issuperset(statement):
+            raise ValueError(
+                f"Una sentencia con {sorted(statement)} no cabe en un documento "
+                f"de {self.max_document_size} caracteres"
+            )
+
+        base = self._size({**statement, "Action": []})
+        parts: List[Dict[str, Any]] = []
+        actions: List[str] = []
+        size = base
+        for action in statement["Action"]:
+            action_size = len(json.dumps(action)) + 1
+            if base + action_size > limit:
+                raise ValueError(
+                    f"La acción '{action}' no cabe en un documento de "
+                    f"{self.max_document_size} caracteres"
+                )
+            if actions and size + action_size > limit:
+                parts.append({**statement, "Action": actions})
+                actions, size = [], base
+            actions.append(action)
+            size += action_size
+        parts.append({**statement, "Action": actions})
+        return parts
+
+    def pack(self, statements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Empaqueta las sentencias en documentos de política completos.
+        """
+        pieces = []
+        for statement in self.merge_statements(statements):
+            pieces.extend(self._split(statement))
+
+        # First-fit-decreasing por tamaño de la sentencia
+        pieces.sort(key=self._size, reverse=True)
+        bins: List[List[Dict[str, Any]]] = []
+        free: List[int] = []
+        for piece in pieces:
+            # +1 por la coma que separa sentencias
+            size = self._size(piece) + 1
+            for index, available in enumerate(free):
+                if size <= available:
+                    bins[index].append(piece)
+                    free[index] -= size
+                    break
+            else:
+                bins.append([piece])
+                free.append(self.max_document_size - self._DOCUMENT_OVERHEAD - size + 1)
+
+        return [
+            {"Version": "2012-10-17", "Statement": statements} for statements in bins
+        ]
+
 
 class IAMRoleFactory:
     """
@@ -142,16 +347,7 @@ class IAMRoleFactory:
         tags = tags or {}
         policies = policies or []
 
-        trust_policy = {
-            "Version": "2012-10-17",
-            "Statement": [
-                {
-                    "Effect": "Allow",
-                    "Principal": {"Service": f"{service}.amazonaws.com"},
-                    "Action": "sts:AssumeRole",
-                }
-            ],
-        }
+        trust_policy = serialize_trust_policy("Service", f"{service}.amazonaws.com")
 
         triggers = {
             "resource_type": "iam_role",
@@ -159,7 +355,7 @@ class IAMRoleFactory:
             "role_id": f"role-{uuid.uuid4().hex[:8]}",
             "arn": f"arn:aws:iam::123456789012:role/{name}",
             "service": service,
-            "trust_policy": json.dumps(trust_policy),
+            "trust_policy": trust_policy,
             "attached_policies": str(policies),
             "created_at": datetime.utcnow().isoformat(),
             "tags": str(tags),
@@ -181,16 +377,7 @@ class IAMRoleFactory:
         tags = tags or {}
         policies = policies or []
 
-        trust_policy = {
-            "Version": "2012-10-17",
-            "Statement": [
-                {
-                    "Effect": "Allow",
-                    "Principal": {"AWS": "arn:aws:iam::123456789012:root"},
-                    "Action": "sts:AssumeRole",
-                }
-            ],
-        }
+        trust_policy = serialize_trust_policy("AWS", "arn:aws:iam::123456789012:root")
 
         triggers = {
             "resource_type": "iam_role",
@@ -198,7 +385,7 @@ class IAMRoleFactory:
             "role_id": f"role-{uuid.uuid4().hex[:8]}",
             "arn": f"arn:aws:iam::123456789012:role/{name}",
             "role_type": "user_assumable",
-            "trust_policy": json.dumps(trust_policy),
+            "trust_policy": trust_policy,
             "attached_policies": str(policies),
             "created_at": datetime.utcnow().isoformat(),
             "tags": str(tags),
@@ -250,14 +437,221 @@ class IAMModule:
     """
     Módulo composite que agrupa políticas, roles y usuarios IAM
     para crear configuraciones completas reutilizables.
+    Las políticas se internan por contenido: una política idéntica a otra
+    ya agregada no se duplica y sus referencias apuntan a la existente.
+    Roles y usuarios son identidades con nombre y ARN propios, nunca se internan.
     """
 
-    def __init__(self, module_name: str):
+    def __init__(
+        self,
+        module_name: str,
+        max_document_size: int = IAMPolicyPacker.DEFAULT_MAX_DOCUMENT_SIZE,
+    ):
         """
         Inicializa el módulo IAM.
         """
         self.module_name = module_name
+        self.max_document_size = max_document_size
         self.resources: List[Dict[str, Any]] = []
+        # Hash del documento -> nombre de la política canónica
+        self.policy_index: Dict[str, str] = {}
+        # Nombre de una política descartada -> nombre de la política canónica
+        self.aliases: Dict[str, str] = {}
+
+    def _resolve_policies(self, attached_policies: str) -> str:
+        """
+        Reemplaza las políticas descartadas por sus equivalentes canónicas.
+        """
+        if not self.aliases:
+            return attached_policies
+
+        resolved: List[str] = []
+        for policy in ast.literal_eval(attached_policies):
+            policy = self.aliases.get(policy, policy)
+            if policy not in resolved:
+                resolved.append(policy)
+        return str(resolved)
+
+    def intern_resource(self, resource: Dict[str, Any]) -> str:
+        """
+        Agrega un recurso IAM. Una política con el mismo documento que otra ya
+        agregada se descarta; roles y usuarios siempre se agregan, con sus
+        políticas adjuntas apuntando a las canónicas.
+        Devuelve el nombre del recurso canónico que deben referenciar los demás.
+        """
+        triggers = _resource_triggers(resource)
+        name = triggers["name"]
+
+        if "attached_policies" in triggers:
+            triggers["attached_policies"] = self._resolve_policies(
+                triggers["attached_policies"]
+            )
+
+        if triggers["resource_type"] == "iam_policy":
+            canonical = self.policy_index.get(triggers["document_hash"])
+            if canonical is not None:
+                self.aliases[name] = canonical
+                return canonical
+            self.policy_index[triggers["document_hash"]] = name
+
+        self.resources.append(resource)
+        return name
+
+    def intern_resources(self, resources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Interna una lista de recursos IAM y devuelve solo los que se agregaron.
+        """
+        added = []
+        for resource in resources:
+            count = len(self.resources)
+            self.intern_resource(resource)
+            if len(self.resources) > count:
+                added.append(resource)
+        return added
+
+    def _policy_groups(self) -> Dict[Tuple[str, ...], List[str]]:
+        """
+        Agrupa las políticas por el conjunto de principales que las adjuntan.
+        Las políticas que ningún principal del módulo adjunta quedan fuera:
+        pueden referenciarse por nombre desde otro lado.
+        """
+        attachments: Dict[str, List[str]] = {
+            name: [] for name in self._triggers_by_type("iam_policy")
+        }
+        for triggers in self._principals():
+            for policy in ast.literal_eval(triggers["attached_policies"]):
+                if policy in attachments:
+                    attachments[policy].append(triggers["name"])
+
+        groups: Dict[Tuple[str, ...], List[str]] = {}
+        for policy, attached_by in attachments.items():
+            if attached_by:
+                groups.setdefault(tuple(sorted(attached_by)), []).append(policy)
+        return groups
+
+    def _triggers_by_type(self, resource_type: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Triggers de los recursos de un tipo, indexados por nombre.
+        """
+        found = {}
+        for resource in self.resources:
+            triggers = _resource_triggers(resource)
+            if triggers["resource_type"] == resource_type:
+                found[triggers["name"]] = triggers
+        return found
+
+    def _principals(self) -> List[Dict[str, Any]]:
+        """
+        Triggers de los roles y usuarios del módulo.
+        """
+        return [
+            triggers
+            for triggers in map(_resource_triggers, self.resources)
+            if "attached_policies" in triggers
+        ]
+
+    def _pack_group(
+        self,
+        packer: IAMPolicyPacker,
+        group: List[str],
+        policies: Dict[str, Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Empaqueta las sentencias de un grupo. Devuelve los documentos
+        empaquetados, o una lista vacía si empaquetar no reduce la cantidad
+        de documentos.
+        """
+        statements = []
+        for policy in group:
+            document = json.loads(policies[policy]["policy_document"])
+            statements.extend(document.get("Statement", []))
+
+        documents = packer.pack(statements)
+        return documents if len(documents) < len(group) else []
+
+    def _packed_policy(
+        self,
+        document: Dict[str, Any],
+        group: List[str],
+        created: List[Dict[str, Any]],
+    ) -> str:
+        """
+        Devuelve el nombre de la política para un documento empaquetado.
+        Como en intern_resource, si ya hay una política con el mismo documento
+        se reutiliza; si no, se crea y se agrega a created.
+        """
+        document_hash = _document_hash(document)
+        canonical = self.policy_index.get(document_hash)
+        if canonical is not None:
+            return canonical
+
+        name = f"{self.module_name}_packed_{document_hash[:8]}"
+        created.append(IAMPolicyFactory.create_packed_policy(name, document, group))
+        self.policy_index[document_hash] = name
+        return name
+
+    def _replace_policies(
+        self,
+        replaced: Dict[str, List[str]],
+        packed: Dict[str, List[Dict[str, Any]]],
+    ) -> None:
+        """
+        Sustituye las políticas reemplazadas, en las referencias de roles y
+        usuarios y en la lista de recursos del módulo.
+        """
+        for triggers in self._principals():
+            attached: List[str] = []
+            for policy in ast.literal_eval(triggers["attached_policies"]):
+                for name in replaced.get(policy, [policy]):
+                    if name not in attached:
+                        attached.append(name)
+            triggers["attached_policies"] = str(attached)
+
+        resources = []
+        for resource in self.resources:
+            name = _resource_triggers(resource)["name"]
+            if name not in replaced:
+                resources.append(resource)
+            else:
+                resources.extend(packed.get(name, []))
+        self.resources = resources
+
+    def pack_policies(self) -> Dict[str, int]:
+        """
+        Reempaqueta las políticas del módulo en la menor cantidad posible.
+        Solo se combinan políticas adjuntas exactamente al mismo conjunto de
+        roles y usuarios, por lo que ningún principal gana permisos.
+        Se llama al exportar, una vez agregados todos los recursos.
+        """
+        packer = IAMPolicyPacker(self.max_document_size)
+        policies = self._triggers_by_type("iam_policy")
+
+        packed_groups = []
+        for group in self._policy_groups().values():
+            documents = self._pack_group(packer, group, policies)
+            if documents:
+                packed_groups.append((group, documents))
+                # Las políticas reemplazadas dejan de ser canónicas
+                for policy in group:
+                    self.policy_index.pop(policies[policy]["document_hash"], None)
+
+        # Política reemplazada -> nombres de las políticas empaquetadas
+        replaced: Dict[str, List[str]] = {}
+        # Primera política de cada grupo -> recursos empaquetados que la sustituyen
+        packed: Dict[str, List[Dict[str, Any]]] = {}
+        for group, documents in packed_groups:
+            created: List[Dict[str, Any]] = []
+            names = [
+                self._packed_policy(document, group, created) for document in documents
+            ]
+            replaced.update(dict.fromkeys(group, names))
+            packed[group[0]] = created
+
+        self._replace_policies(replaced, packed)
+        return {
+            "policies_before": len(policies),
+            "policies_after": len(self._triggers_by_type("iam_policy")),
+        }
 
     def add_kubernetes_rbac(
         self, cluster_name: str, tags: Dict[str, str] = None
@@ -268,22 +662,25 @@ class IAMModule:
         tags = tags or {}
 
         # Política para administrador del cluster
-        admin_policy = IAMPolicyFactory.create_kubernetes_policy(
-            f"{cluster_name}_admin_policy", cluster_name
+        admin_policy = self.intern_resource(
+            IAMPolicyFactory.create_kubernetes_policy(
+                f"{cluster_name}_admin_policy", cluster_name
+            )
         )
-        self.resources.append(admin_policy)
 
         # Rol para nodos del cluster
-        node_role = IAMRoleFactory.create_service_role(
-            f"{cluster_name}_node_role", "ec2", [f"{cluster_name}_admin_policy"], tags
+        self.intern_resource(
+            IAMRoleFactory.create_service_role(
+                f"{cluster_name}_node_role", "ec2", [admin_policy], tags
+            )
         )
-        self.resources.append(node_role)
 
         # Usuario de servicio para CI/CD
-        service_user = IAMUserFactory.create_service_user(
-            f"{cluster_name}_cicd_user", [f"{cluster_name}_admin_policy"], tags
+        self.intern_resource(
+            IAMUserFactory.create_service_user(
+                f"{cluster_name}_cicd_user", [admin_policy], tags
+            )
         )
-        self.resources.append(service_user)
 
         return self
 
@@ -296,16 +693,18 @@ class IAMModule:
         tags = tags or {}
 
         # Política para gestión de red
-        network_policy = IAMPolicyFactory.create_network_policy(
-            f"{vpc_name}_network_policy", vpc_name
+        network_policy = self.intern_resource(
+            IAMPolicyFactory.create_network_policy(
+                f"{vpc_name}_network_policy", vpc_name
+            )
         )
-        self.resources.append(network_policy)
 
         # Rol para administrador de red
-        network_admin_role = IAMRoleFactory.create_user_role(
-            f"{vpc_name}_network_admin", [f"{vpc_name}_network_policy"], tags
+        self.intern_resource(
+            IAMRoleFactory.create_user_role(
+                f"{vpc_name}_network_admin", [network_policy], tags
+            )
         )
-        self.resources.append(network_admin_role)
 
         return self
 
@@ -318,24 +717,26 @@ class IAMModule:
         tags = tags or {}
 
         # Política para gestión de EC2
-        compute_policy = IAMPolicyFactory.create_ec2_policy(
-            f"{compute_name}_compute_policy"
+        compute_policy = self.intern_resource(
+            IAMPolicyFactory.create_ec2_policy(f"{compute_name}_compute_policy")
         )
-        self.resources.append(compute_policy)
 
         # Rol para instancias EC2
-        instance_role = IAMRoleFactory.create_service_role(
-            f"{compute_name}_instance_role",
-            "ec2",
-            [f"{compute_name}_compute_policy"],
-            tags,
+        self.intern_resource(
+            IAMRoleFactory.create_service_role(
+                f"{compute_name}_instance_role",
+                "ec2",
+                [compute_policy],
+                tags,
+            )
         )
-        self.resources.append(instance_role)
 
         return self
 
     def export_resources(self) -> List[Dict[str, Any]]:
         """
-        Exporta todos los recursos del módulo.
+        Exporta todos los recursos del módulo, con las políticas de cada
+        conjunto de principales empaquetadas.
         """
+        self.pack_policies()
         return self.resources.copy()
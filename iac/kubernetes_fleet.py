@@ -0,0 +1,189 @@
+"""
+Generación de flotas de clusters Kubernetes en paralelo.
+Cada cluster se construye en un proceso del pool y los resultados
+se combinan en un único módulo composite en el orden de las especificaciones.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from .composite import CompositeModule
+from .iam_module import IAMModule
+from .kubernetes_module import KubernetesModule
+from .network_composite import NetworkInfrastructureComposite
+
+# Orden fijo en el que se combinan los recursos de cada cluster
+RESOURCE_GROUPS = [
+    "cluster_resources",
+    "namespace_resources",
+    "application_resources",
+    "iam_resources",
+]
+
+# Dependencia de red de cada proceso worker (se envía una sola vez por proceso)
+_worker_network: Optional[NetworkInfrastructureComposite] = None
+
+
+def _init_worker(network_infrastructure: NetworkInfrastructureComposite) -> None:
+    """
+    Inicializa un proceso worker con la dependencia de red compartida.
+    """
+    global _worker_network
+    _worker_network = network_infrastructure
+
+
+def build_cluster_resources(
+    network_infrastructure: NetworkInfrastructureComposite, spec: Dict[str, Any]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Construye un cluster completo (nodos, addons, namespaces, aplicaciones e IAM)
+    a partir de su especificación y exporta sus recursos.
+    """
+    cluster_name = spec["cluster_name"]
+
+    module = KubernetesModule(spec.get("module_name", cluster_name))
+    module.inject_network_dependency(network_infrastructure)
+    module.create_cluster(
+        cluster_name=cluster_name,
+        compute_config=dict(spec.get("compute_config", {})),
+        tags=spec.get("tags"),
+    )
+
+    for namespace in spec.get("namespaces", []):
+        module.add_namespace(
+            namespace["name"], namespace.get("labels"), namespace.get("annotations")
+        )
+
+    for application in spec.get("applications", []):
+        module.add_application(**application)
+
+    module.schedule_applications(resize_cluster=spec.get("resize_cluster", False))
+
+    return module.export_all_resources()
+
+
+def _resource_names(resource: Dict[str, Any]) -> List[str]:
+    """
+    Nombres de los null_resource de un recurso exportado.
+    """
+    return [
+        name
+        for block in resource.get("resource", [])
+        for null_resource in block.get("null_resource", [])
+        for name in null_resource
+    ]
+
+
+def _build_in_worker(spec: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Punto de entrada de los procesos worker.
+    """
+    return build_cluster_resources(_worker_network, spec)
+
+
+class KubernetesFleet:
+    """
+    Flota de clusters Kubernetes generados en paralelo sobre un pool de procesos.
+    Usa la misma inyección de dependencias de red que KubernetesModule.
+    """
+
+    def __init__(self, fleet_name: str, max_workers: Optional[int] = None):
+        """
+        Inicializa la flota.
+        """
+        self.fleet_name = fleet_name
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cluster_specs: Dict[str, Dict[str, Any]] = {}
+        self.network_dependency: Optional[NetworkInfrastructureComposite] = None
+
+    def inject_network_dependency(
+        self, network_infrastructure: NetworkInfrastructureComposite
+    ) -> "KubernetesFleet":
+        """
+        Inyecta la dependencia de infraestructura de red compartida por la flota.
+        """
+        self.network_dependency = network_infrastructure
+        return self
+
+    def add_cluster(self, spec: Dict[str, Any]) -> "KubernetesFleet":
+        """
+        Agrega la especificación de un cluster a la flota.
+
+        La especificación contiene cluster_name y, opcionalmente, compute_config,
+        tags, namespaces ({name, labels, annotations}), applications (argumentos
+        de KubernetesModule.add_application) y resize_cluster para el scheduler.
+        """
+        cluster_name = spec.get("cluster_name")
+        if not cluster_name:
+            raise ValueError("La especificación del cluster requiere 'cluster_name'")
+
+        if cluster_name in self.cluster_specs:
+            raise ValueError(f"El cluster '{cluster_name}' ya existe en la flota")
+
+        self.cluster_specs[cluster_name] = spec
+        return self
+
+    def add_clusters(self, specs: List[Dict[str, Any]]) -> "KubernetesFleet":
+        """
+        Agrega varias especificaciones de cluster.
+        """
+        for spec in specs:
+            self.add_cluster(spec)
+        return self
+
+    def generate(self) -> List[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Genera los recursos de todos los clusters.
+        Los resultados se devuelven en el orden en que se agregaron los clusters.
+        """
+        if not self.network_dependency:
+            raise ValueError(
+                "Debe inyectar dependencia de red antes de generar la flota"
+            )
+
+        specs = list(self.cluster_specs.values())
+        workers = min(self.max_workers, len(specs))
+
+        # Para un solo worker el pool solo agrega costo de arranque
+        if workers <= 1:
+            return [
+                build_cluster_resources(self.network_dependency, spec) for spec in specs
+            ]
+
+        chunksize = max(1, len(specs) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.network_dependency,),
+        ) as executor:
+            # map conserva el orden de entrada sin importar qué proceso termine primero
+            return list(executor.map(_build_in_worker, specs, chunksize=chunksize))
+
+    def export(self) -> CompositeModule:
+        """
+        Genera la flota y combina todos los recursos en un módulo composite,
+        cluster por cluster y grupo por grupo.
+        Terraform rechaza dos null_resource con el mismo nombre, por eso un
+        nombre repetido entre clusters es un error y no se combina.
+        """
+        composite = CompositeModule()
+        # Las políticas idénticas entre clusters se emiten una sola vez
+        iam_module = IAMModule(f"{self.fleet_name}_fleet_iam")
+        names = set()
+
+        for cluster_resources in self.generate():
+            for group in RESOURCE_GROUPS:
+                resources = cluster_resources.get(group, [])
+                if group == "iam_resources":
+                    resources = iam_module.intern_resources(resources)
+                for resource in resources:
+                    for name in _resource_names(resource):
+                        if name in names:
+                            raise ValueError(
+                                f"El recurso '{name}' está duplicado en la flota"
+                            )
+                        names.add(name)
+                    composite.add(resource)
+
+        return composite
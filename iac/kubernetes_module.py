@@ -5,12 +5,14 @@ con dependencias en módulos de red y compute.
 
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from .compute_factory import (KubernetesClusterFactory,
                               ParameterizedComputeFactory)
 from .iam_module import IAMModule
 from .network_composite import NetworkInfrastructureComposite
+from .replica_sizing import ReplicaSizer
+from .scheduler import ReplicaScheduler
 
 
 class KubernetesComponent:
@@ -227,7 +229,7 @@ class KubernetesNamespace:
                 {
                     "null_resource": [
                         {
-                            f"k8s_namespace_{self.namespace_name}": [
+                            f"k8s_namespace_{self.cluster_name}_{self.namespace_name}": [
                                 {"triggers": triggers}
                             ]
                         }
@@ -251,9 +253,17 @@ class KubernetesApplication:
         replicas: int = 2,
         ports: List[int] = None,
         environment: Dict[str, str] = None,
+        cpu_request: int = 250,
+        memory_request: int = 256,
+        target_rps: float = None,
+        latency_slo_ms: float = None,
+        replica_sizer: ReplicaSizer = None,
     ):
         """
         Inicializa una aplicación.
+        cpu_request se expresa en milicores y memory_request en MiB por réplica.
+        Con target_rps y latency_slo_ms las réplicas se calculan desde el
+        throughput por réplica de replica_sizer en lugar de usar replicas.
         """
         self.app_name = app_name
         self.namespace = namespace
@@ -262,6 +272,42 @@ class KubernetesApplication:
         self.replicas = replicas
         self.ports = ports or [80]
         self.environment = environment or {}
+        self.cpu_request = cpu_request
+        self.memory_request = memory_request
+        self.target_rps = target_rps
+        self.latency_slo_ms = latency_slo_ms
+        self.autoscaling: Dict[str, Any] = {}
+        # Réplicas por nodo worker, asignadas por el scheduler
+        self.placement: Dict[str, int] = {}
+        # El mismo nombre de aplicación puede repetirse en otro namespace o cluster
+        self.resource_key = f"{cluster_name}_{namespace}_{app_name}"
+
+        if target_rps is not None:
+            if latency_slo_ms is None or replica_sizer is None:
+                raise ValueError(
+                    "target_rps requiere latency_slo_ms y un ReplicaSizer con benchmarks"
+                )
+            self.autoscaling = replica_sizer.size(
+                [app_name, image], target_rps, latency_slo_ms
+            )
+            self.replicas = self.autoscaling["replicas"]
+
+    def _autoscaling_triggers(self) -> Dict[str, str]:
+        """
+        Triggers de dimensionamiento y límites HPA, si la aplicación fue dimensionada.
+        """
+        if not self.autoscaling:
+            return {}
+
+        return {
+            "target_rps": str(self.target_rps),
+            "latency_slo_ms": str(self.latency_slo_ms),
+            "per_replica_rps": str(self.autoscaling["per_replica_rps"]),
+            "benchmark_source": self.autoscaling["benchmark_source"],
+            "hpa_min_replicas": str(self.autoscaling["min_replicas"]),
+            "hpa_max_replicas": str(self.autoscaling["max_replicas"]),
+            "hpa_target_utilization": str(self.autoscaling["target_utilization"]),
+        }
 
     def export(self) -> List[Dict[str, Any]]:
         """
@@ -275,7 +321,7 @@ class KubernetesApplication:
                 {
                     "null_resource": [
                         {
-                            f"k8s_deployment_{self.app_name}": [
+                            f"k8s_deployment_{self.resource_key}": [
                                 {
                                     "triggers": {
                                         "resource_type": "kubernetes_deployment",
@@ -284,9 +330,13 @@ class KubernetesApplication:
                                         "cluster_dependency": self.cluster_name,
                                         "image": self.image,
                                         "replicas": str(self.replicas),
+                                        "cpu_request": f"{self.cpu_request}m",
+                                        "memory_request": f"{self.memory_request}Mi",
+                                        "placement": str(self.placement),
                                         "ports": str(self.ports),
                                         "environment": str(self.environment),
                                         "created_at": datetime.utcnow().isoformat(),
+                                        **self._autoscaling_triggers(),
                                     }
                                 }
                             ]
@@ -303,7 +353,7 @@ class KubernetesApplication:
                 {
                     "null_resource": [
                         {
-                            f"k8s_service_{self.app_name}": [
+                            f"k8s_service_{self.resource_key}": [
                                 {
                                     "triggers": {
                                         "resource_type": "kubernetes_service",
@@ -339,10 +389,22 @@ class KubernetesModule:
         """
         self.module_name = module_name
         self.cluster: Optional[MinikubeCluster] = None
-        self.namespaces: List[KubernetesNamespace] = []
-        self.applications: List[KubernetesApplication] = []
+        # Índices por nombre: los dict conservan el orden de inserción
+        self.namespaces: Dict[str, KubernetesNamespace] = {}
+        self.applications: Dict[Tuple[str, str], KubernetesApplication] = {}
+        self.applications_by_namespace: Dict[
+            str, Dict[str, KubernetesApplication]
+        ] = {}
         self.iam_module: IAMModule = IAMModule(f"{module_name}_k8s_iam")
         self.network_dependency: Optional[NetworkInfrastructureComposite] = None
+        self.replica_sizer: Optional[ReplicaSizer] = None
+
+    def inject_replica_sizer(self, replica_sizer: ReplicaSizer) -> "KubernetesModule":
+        """
+        Inyecta el dimensionador de réplicas basado en resultados de benchmark.
+        """
+        self.replica_sizer = replica_sizer
+        return self
 
     def inject_network_dependency(
         self, network_infrastructure: NetworkInfrastructureComposite
@@ -407,10 +469,14 @@ class KubernetesModule:
         if not self.cluster:
             raise ValueError("Debe crear un cluster antes de agregar namespaces")
 
+        if namespace_name in self.namespaces:
+            raise ValueError(f"El namespace '{namespace_name}' ya existe")
+
         namespace = KubernetesNamespace(
             namespace_name, self.cluster.cluster_name, labels, annotations
         )
-        self.namespaces.append(namespace)
+        self.namespaces[namespace_name] = namespace
+        self.applications_by_namespace[namespace_name] = {}
         return self
 
     def add_application(
@@ -421,6 +487,10 @@ class KubernetesModule:
         replicas: int = 2,
         ports: List[int] = None,
         environment: Dict[str, str] = None,
+        cpu_request: int = 250,
+        memory_request: int = 256,
+        target_rps: float = None,
+        latency_slo_ms: float = None,
     ) -> "KubernetesModule":
         """
         Agrega una aplicación al cluster.
@@ -428,6 +498,16 @@ class KubernetesModule:
         if not self.cluster:
             raise ValueError("Debe crear un cluster antes de agregar aplicaciones")
 
+        if namespace not in self.namespaces:
+            raise ValueError(
+                f"El namespace '{namespace}' no existe, agréguelo con add_namespace()"
+            )
+
+        if (namespace, app_name) in self.applications:
+            raise ValueError(
+                f"La aplicación '{app_name}' ya existe en el namespace '{namespace}'"
+            )
+
         application = KubernetesApplication(
             app_name,
             namespace,
@@ -436,10 +516,97 @@ class KubernetesModule:
             replicas,
             ports,
             environment,
+            cpu_request,
+            memory_request,
+            target_rps,
+            latency_slo_ms,
+            self.replica_sizer,
         )
-        self.applications.append(application)
+        self.applications[(namespace, app_name)] = application
+        self.applications_by_namespace[namespace][app_name] = application
         return self
 
+    def get_namespace(self, namespace_name: str) -> Optional[KubernetesNamespace]:
+        """
+        Obtiene un namespace por su nombre.
+        """
+        return self.namespaces.get(namespace_name)
+
+    def get_application(
+        self, namespace: str, app_name: str
+    ) -> Optional[KubernetesApplication]:
+        """
+        Obtiene una aplicación por namespace y nombre.
+        """
+        return self.applications.get((namespace, app_name))
+
+    def iter_applications(
+        self, namespace: Optional[str] = None
+    ) -> Iterator[KubernetesApplication]:
+        """
+        Itera las aplicaciones del módulo, o solo las de un namespace.
+        """
+        if namespace is None:
+            return iter(self.applications.values())
+        return iter(self.applications_by_namespace.get(namespace, {}).values())
+
+    def iter_namespace_resources(
+        self,
+    ) -> Iterator[Tuple[str, Dict[str, List[Dict[str, Any]]]]]:
+        """
+        Exporta los recursos namespace por namespace, sin materializar
+        el módulo completo.
+        """
+        for namespace_name, namespace in self.namespaces.items():
+            application_resources = []
+            for application in self.iter_applications(namespace_name):
+                application_resources.extend(application.export())
+
+            yield namespace_name, {
+                "namespace_resources": [namespace.export()],
+                "application_resources": application_resources,
+            }
+
+    def schedule_applications(self, resize_cluster: bool = False) -> Dict[str, Any]:
+        """
+        Ubica las réplicas de todas las aplicaciones en los workers del cluster
+        y registra la ubicación en cada aplicación.
+        Con resize_cluster se regeneran los nodos si el cluster no alcanza.
+        """
+        if not self.cluster:
+            raise ValueError("Debe crear un cluster antes de planificar aplicaciones")
+
+        compute_config = self.cluster.compute_config
+        scheduler = ReplicaScheduler(compute_config["worker_instance_type"])
+
+        workloads = [
+            {
+                "name": f"{namespace}/{app_name}",
+                "replicas": application.replicas,
+                "cpu": application.cpu_request,
+                "memory": application.memory_request,
+            }
+            for (namespace, app_name), application in self.applications.items()
+        ]
+
+        def worker_names() -> List[str]:
+            return [
+                f"{self.cluster.cluster_name}-worker-{i + 1}"
+                for i in range(compute_config["node_count"])
+            ]
+
+        report = scheduler.schedule(workloads, worker_names())
+
+        if resize_cluster and not report["fits"]:
+            compute_config["node_count"] = report["nodes_required"]
+            self.cluster.cluster_resources = self.cluster._create_cluster_resources()
+            report = scheduler.schedule(workloads, worker_names())
+
+        for (namespace, app_name), application in self.applications.items():
+            application.placement = report["placements"][f"{namespace}/{app_name}"]
+
+        return report
+
     def export_all_resources(self) -> Dict[str, List[Dict[str, Any]]]:
         """
         Exporta todos los recursos del módulo.
@@ -454,10 +621,10 @@ class KubernetesModule:
         if self.cluster:
             result["cluster_resources"] = self.cluster.export()
 
-        for namespace in self.namespaces:
+        for namespace in self.namespaces.values():
             result["namespace_resources"].append(namespace.export())
 
-        for application in self.applications:
+        for application in self.applications.values():
             result["application_resources"].extend(application.export())
 
         result["iam_resources"] = self.iam_module.export_resources()
@@ -0,0 +1,114 @@
+"""
+Dimensionamiento de réplicas a partir del throughput por réplica.
+Los resultados de benchmark indican, para cada servicio, la latencia p99
+a distintas tasas de requests sobre una sola réplica.
+El archivo benchmarks/throughput.json del repositorio contiene datos de
+ejemplo (source "example"), no mediciones: InfrastructureBuilder solo
+dimensiona réplicas con resultados de una prueba de carga (source "measured").
+"""
+
+import json
+import math
+from typing import Any, Dict, List
+
+
+class ReplicaSizer:
+    """
+    Calcula réplicas y límites de autoescalado (estilo HPA) para una tasa
+    objetivo de requests y un SLO de latencia.
+    """
+
+    def __init__(
+        self,
+        benchmarks: Dict[str, List[Dict[str, float]]],
+        headroom: float = 0.3,
+        burst_factor: float = 2.0,
+        source: str = "measured",
+    ):
+        """
+        Inicializa el dimensionador.
+        benchmarks asocia cada servicio (app_name o imagen) con muestras
+        {rps, p99_latency_ms} sobre una réplica; source indica su origen
+        ("measured" o "example").
+        """
+        if headroom < 0 or burst_factor < 1:
+            raise ValueError("headroom debe ser >= 0 y burst_factor >= 1")
+
+        # Ordenar una sola vez las muestras por rps
+        self.benchmarks = {
+            service: sorted(samples, key=lambda sample: sample["rps"])
+            for service, samples in benchmarks.items()
+        }
+        self.headroom = headroom
+        self.burst_factor = burst_factor
+        self.source = source
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs: Any) -> "ReplicaSizer":
+        """
+        Crea el dimensionador desde un archivo JSON de resultados de benchmark:
+        {"source", "services": {servicio: [muestras]}} o directamente
+        {servicio: [muestras]}, que se considera medido.
+        """
+        with open(path) as f:
+            data = json.load(f)
+
+        if "services" in data:
+            kwargs.setdefault("source", data.get("source", "measured"))
+            data = data["services"]
+        return cls(data, **kwargs)
+
+    def per_replica_throughput(self, service: str, latency_slo_ms: float) -> float:
+        """
+        Obtiene el máximo rps por réplica que cumple el SLO de latencia,
+        interpolando linealmente entre las muestras medidas.
+        """
+        samples = self.benchmarks.get(service)
+        if not samples:
+            raise ValueError(f"No hay resultados de benchmark para '{service}'")
+
+        if samples[0]["p99_latency_ms"] > latency_slo_ms:
+            raise ValueError(
+                f"'{service}' no cumple un SLO de {latency_slo_ms}ms "
+                f"ni con la carga mínima medida"
+            )
+
+        for previous, current in zip(samples, samples[1:]):
+            if current["p99_latency_ms"] > latency_slo_ms:
+                ratio = (latency_slo_ms - previous["p99_latency_ms"]) / (
+                    current["p99_latency_ms"] - previous["p99_latency_ms"]
+                )
+                return previous["rps"] + ratio * (current["rps"] - previous["rps"])
+
+        # No se extrapola más allá de la mayor carga medida
+        return samples[-1]["rps"]
+
+    def size(
+        self, services: List[str], target_rps: float, latency_slo_ms: float
+    ) -> Dict[str, Any]:
+        """
+        Calcula réplicas deseadas y límites min/max para el primer servicio
+        de la lista que tenga resultados de benchmark.
+        """
+        service = next((s for s in services if s in self.benchmarks), None)
+        if service is None:
+            raise ValueError(f"No hay resultados de benchmark para {services}")
+
+        capacity = self.per_replica_throughput(service, latency_slo_ms)
+
+        min_replicas = max(1, math.ceil(target_rps / capacity))
+        replicas = max(
+            min_replicas, math.ceil(target_rps * (1 + self.headroom) / capacity)
+        )
+        max_replicas = max(replicas, math.ceil(replicas * self.burst_factor))
+
+        return {
+            "benchmark": service,
+            "benchmark_source": self.source,
+            "per_replica_rps": round(capacity, 2),
+            "replicas": replicas,
+            "min_replicas": min_replicas,
+            "max_replicas": max_replicas,
+            # Escalar antes de consumir el margen reservado
+            "target_utilization": round(100 / (1 + self.headroom)),
+        }
@@ -0,0 +1,241 @@
+"""
+Scheduler de réplicas para aplicaciones Kubernetes simuladas.
+Ubica las réplicas en nodos worker usando bin-packing first-fit-decreasing
+según las solicitudes de CPU/memoria y la capacidad de cada instance_type.
+"""
+
+from typing import Any, Dict, List, Optional
+
+# Capacidad asignable por instance_type: CPU en milicores y memoria en MiB
+INSTANCE_CAPACITIES: Dict[str, Dict[str, int]] = {
+    "t3.micro": {"cpu": 2000, "memory": 1024},
+    "t3.small": {"cpu": 2000, "memory": 2048},
+    "t3.medium": {"cpu": 2000, "memory": 4096},
+    "t3.large": {"cpu": 2000, "memory": 8192},
+    "t3.xlarge": {"cpu": 4000, "memory": 16384},
+    "t3.2xlarge": {"cpu": 8000, "memory": 32768},
+    "m5.large": {"cpu": 2000, "memory": 8192},
+    "m5.xlarge": {"cpu": 4000, "memory": 16384},
+    "c5.large": {"cpu": 2000, "memory": 4096},
+    "c5.xlarge": {"cpu": 4000, "memory": 8192},
+}
+
+
+class _NodePool:
+    """
+    Nodos worker abiertos durante un empaquetado, con su capacidad libre.
+    Un nodo con menos libre que la réplica más chica ya no recibe nada y
+    sale de la lista de nodos abiertos.
+    """
+
+    def __init__(
+        self, cpu_capacity: int, memory_capacity: int, min_cpu: int, min_memory: int
+    ):
+        self.cpu_capacity = cpu_capacity
+        self.memory_capacity = memory_capacity
+        self.min_cpu = min_cpu
+        self.min_memory = min_memory
+        self.free_cpu: List[int] = []
+        self.free_memory: List[int] = []
+        self.open_nodes: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.free_cpu)
+
+    def _usable(self, node: int) -> bool:
+        """
+        Indica si al nodo todavía le cabe la réplica más chica.
+        """
+        return (
+            self.free_cpu[node] >= self.min_cpu
+            and self.free_memory[node] >= self.min_memory
+        )
+
+    def _take(self, node: int, cpu: int, memory: int, count: int) -> None:
+        """
+        Descuenta count réplicas de la capacidad libre de un nodo.
+        """
+        self.free_cpu[node] -= count * cpu
+        self.free_memory[node] -= count * memory
+
+    def _fill_open_nodes(
+        self, cpu: int, memory: int, remaining: int, assigned: Dict[int, int]
+    ) -> int:
+        """
+        Ubica réplicas en los nodos abiertos, en orden (first-fit).
+        Devuelve las réplicas que quedaron sin ubicar.
+        """
+        still_open = []
+        for node in self.open_nodes:
+            fit = min(self.free_cpu[node] // cpu, self.free_memory[node] // memory)
+            placed = min(fit, remaining)
+            if placed:
+                self._take(node, cpu, memory, placed)
+                assigned[node] = placed
+                remaining -= placed
+            if self._usable(node):
+                still_open.append(node)
+        self.open_nodes = still_open
+        return remaining
+
+    def _open_nodes(
+        self, cpu: int, memory: int, remaining: int, assigned: Dict[int, int]
+    ) -> None:
+        """
+        Abre nodos nuevos hasta ubicar todas las réplicas restantes.
+        """
+        per_node = min(self.cpu_capacity // cpu, self.memory_capacity // memory)
+        while remaining:
+            node = len(self.free_cpu)
+            self.free_cpu.append(self.cpu_capacity)
+            self.free_memory.append(self.memory_capacity)
+            placed = min(per_node, remaining)
+            self._take(node, cpu, memory, placed)
+            assigned[node] = placed
+            remaining -= placed
+            if self._usable(node):
+                self.open_nodes.append(node)
+
+    def place(self, cpu: int, memory: int, replicas: int) -> Dict[int, int]:
+        """
+        Ubica las réplicas de una carga; devuelve réplicas por índice de nodo.
+        """
+        assigned: Dict[int, int] = {}
+        remaining = self._fill_open_nodes(cpu, memory, replicas, assigned)
+        self._open_nodes(cpu, memory, remaining, assigned)
+        return assigned
+
+
+class ReplicaScheduler:
+    """
+    Empaqueta réplicas en nodos worker con first-fit-decreasing.
+    Las réplicas de una misma aplicación son idénticas, por lo que se ubican
+    en lote: cada nodo recibe de una vez todas las réplicas que le caben.
+    """
+
+    def __init__(
+        self,
+        instance_type: str = "t3.medium",
+        capacities: Dict[str, Dict[str, int]] = None,
+    ):
+        """
+        Inicializa el scheduler para un tipo de instancia worker.
+        """
+        capacities = capacities or INSTANCE_CAPACITIES
+        if instance_type not in capacities:
+            raise ValueError(
+                f"Capacidad desconocida para instance_type '{instance_type}'"
+            )
+
+        self.instance_type = instance_type
+        self.cpu_capacity = capacities[instance_type]["cpu"]
+        self.memory_capacity = capacities[instance_type]["memory"]
+
+    def _dominant_share(self, cpu: int, memory: int) -> float:
+        """
+        Fracción del nodo que ocupa una réplica en su recurso dominante.
+        """
+        return max(cpu / self.cpu_capacity, memory / self.memory_capacity)
+
+    def _validate(self, workloads: List[Dict[str, Any]]) -> None:
+        """
+        Verifica que cada réplica solicite recursos y quepa en un nodo.
+        """
+        for workload in workloads:
+            if workload["cpu"] <= 0 or workload["memory"] <= 0:
+                raise ValueError(
+                    f"La aplicación '{workload['name']}' debe solicitar CPU y memoria"
+                )
+            if (
+                workload["cpu"] > self.cpu_capacity
+                or workload["memory"] > self.memory_capacity
+            ):
+                raise ValueError(
+                    f"Una réplica de '{workload['name']}' no cabe en un nodo "
+                    f"{self.instance_type}"
+                )
+
+    def schedule(
+        self, workloads: List[Dict[str, Any]], node_names: List[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Ubica las réplicas de cada carga en nodos worker.
+
+        Cada carga es un dict con name, replicas, cpu (milicores) y memory (MiB).
+        Los nodos se nombran con node_names y, si no alcanzan, con worker-N.
+        """
+        self._validate(workloads)
+
+        # Orden decreciente por recurso dominante; sorted es estable ante empates
+        ordered = sorted(
+            (w for w in workloads if w["replicas"] > 0),
+            key=lambda w: self._dominant_share(w["cpu"], w["memory"]),
+            reverse=True,
+        )
+
+        nodes = _NodePool(
+            self.cpu_capacity,
+            self.memory_capacity,
+            min((w["cpu"] for w in ordered), default=0),
+            min((w["memory"] for w in ordered), default=0),
+        )
+        placements = {
+            workload["name"]: nodes.place(
+                workload["cpu"], workload["memory"], workload["replicas"]
+            )
+            for workload in ordered
+        }
+
+        return self._report(workloads, node_names or [], nodes, placements)
+
+    def _report(
+        self,
+        workloads: List[Dict[str, Any]],
+        node_names: List[str],
+        nodes: _NodePool,
+        placements: Dict[str, Dict[int, int]],
+    ) -> Dict[str, Any]:
+        """
+        Arma el reporte del empaquetado con los nombres de los nodos.
+        """
+        nodes_required = len(nodes)
+        names = node_names + [
+            f"worker-{i + 1}" for i in range(len(node_names), nodes_required)
+        ]
+
+        return {
+            "instance_type": self.instance_type,
+            "nodes_required": nodes_required,
+            "nodes_available": len(node_names),
+            "fits": nodes_required <= len(node_names),
+            "placements": {
+                workload["name"]: {
+                    names[node]: count
+                    for node, count in sorted(
+                        placements.get(workload["name"], {}).items()
+                    )
+                }
+                for workload in workloads
+            },
+            "node_usage": [
+                {
+                    "node": names[node],
+                    "cpu_used": self.cpu_capacity - nodes.free_cpu[node],
+                    "memory_used": self.memory_capacity - nodes.free_memory[node],
+                }
+                for node in range(nodes_required)
+            ],
+        }
+
+
+def minimum_nodes(
+    workloads: List[Dict[str, Any]],
+    instance_type: str = "t3.medium",
+    capacities: Optional[Dict[str, Dict[str, int]]] = None,
+) -> int:
+    """
+    Calcula el número mínimo de nodos worker que requiere un conjunto de cargas.
+    """
+    return ReplicaScheduler(instance_type, capacities).schedule(workloads)[
+        "nodes_required"
+    ]
@@ -2,11 +2,44 @@
 
 Asegura que una clase tenga una única instancia global, compartida en todo el sistema.
 Esta implementación es segura para entornos con múltiples hilos (thread-safe).
+La configuración mantiene una instancia por entorno; el entorno activo es
+local a cada hilo o tarea (contextvars).
 """
 
 import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timezone
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Dict, Hashable, Iterator, Mapping, Optional, Tuple
+
+from .config_loader import ConfigWatcher, LayeredConfigLoader
+
+DEFAULT_ENVIRONMENT = "desarrollo-local"
+
+# Entorno activo del hilo o tarea actual
+_active_environment: ContextVar[str] = ContextVar(
+    "active_environment", default=DEFAULT_ENVIRONMENT
+)
+
+
+def get_active_environment() -> str:
+    """
+    Obtiene el entorno activo del contexto actual.
+    """
+    return _active_environment.get()
+
+
+@contextmanager
+def use_environment(env_name: str) -> Iterator[str]:
+    """
+    Activa un entorno dentro del bloque, solo para el hilo o tarea actual.
+    """
+    token = _active_environment.set(env_name)
+    try:
+        yield env_name
+    finally:
+        _active_environment.reset(token)
 
 
 class SingletonMeta(type):
@@ -15,42 +48,171 @@ class SingletonMeta(type):
     compartan el mismo objeto (único en memoria).
     """
 
-    _instances: Dict[type, "ConfigSingleton"] = {}
+    _instances: Dict[Tuple[type, Hashable], "ConfigSingleton"] = {}
     _lock: threading.Lock = threading.Lock()  # Controla el acceso concurrente
 
+    def instance_key(cls, *args, **kwargs) -> Hashable:
+        """
+        Clave que identifica la instancia única. Por defecto hay una sola por clase;
+        las clases pueden redefinirla para tener una instancia por clave.
+        """
+        return None
+
     def __call__(cls, *args, **kwargs):
         """
-        Controla la creación de instancias: solo permite una única instancia por clase.
-        Si ya existe, devuelve la existente. Si no, la crea protegida por un lock.
+        Controla la creación de instancias: solo permite una única instancia por clave.
+        Si ya existe, la devuelve sin tomar el lock (doble verificación).
+        Si no, la crea protegida por el lock.
+        """
+        key = (cls, cls.instance_key(*args, **kwargs))
+        instance = cls._instances.get(key)
+        if instance is None:
+            with cls._lock:
+                # Otro hilo pudo crearla mientras se esperaba el lock
+                instance = cls._instances.get(key)
+                if instance is None:
+                    instance = super().__call__(*args, **kwargs)
+                    cls._instances[key] = instance
+        return instance
+
+
+class ConfigSnapshot:
+    """
+    Vista inmutable de la configuración en una versión determinada.
+    Los lectores la conservan durante un build sin ver escrituras posteriores.
+    """
+
+    __slots__ = ("version", "settings")
+
+    def __init__(self, version: int, settings: Mapping[str, Any]) -> None:
+        """
+        Inicializa el snapshot con una copia de solo lectura de la configuración.
+        """
+        self.version = version
+        self.settings: Mapping[str, Any] = MappingProxyType(dict(settings))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Recupera un valor del snapshot.
+        """
+        return self.settings.get(key, default)
+
+    def with_values(self, values: Mapping[str, Any]) -> "ConfigSnapshot":
+        """
+        Crea un snapshot derivado con algunos valores reemplazados, sin
+        publicarlo: sirve para valores propios de un build.
         """
-        with cls._lock:
-            if cls not in cls._instances:
-                cls._instances[cls] = super().__call__(*args, **kwargs)
-        return cls._instances[cls]
+        return ConfigSnapshot(self.version, {**self.settings, **values})
 
 
 class ConfigSingleton(metaclass=SingletonMeta):
     """
     Clase Singleton que actúa como contenedor de configuración global.
     Todas las clases del sistema pueden consultar y modificar esta configuración compartida.
+    Existe una instancia por entorno: sin env_name se usa el entorno activo del contexto.
+    Cada escritura publica un snapshot nuevo (copy-on-write), de modo que
+    los lectores nunca ven una configuración a medio actualizar.
     """
 
-    def __init__(self, env_name: str = "default") -> None:
+    @classmethod
+    def instance_key(cls, env_name: Optional[str] = None) -> str:
+        """
+        Una instancia por entorno.
+        """
+        return env_name or get_active_environment()
+
+    @classmethod
+    def current(cls) -> "ConfigSingleton":
+        """
+        Obtiene la configuración del entorno activo en el contexto actual.
+        """
+        return cls(env_name=get_active_environment())
+
+    def __init__(self, env_name: Optional[str] = None) -> None:
         """
         Inicializa la configuración con un nombre de entorno y un timestamp de creación.
         """
-        self.env_name = env_name
+        self.env_name = self.instance_key(env_name)
         self.created_at = datetime.now(tz=timezone.utc).isoformat()  # Fecha de creación
-        self.settings: Dict[str, Any] = {}  # Diccionario para guardar claves y valores
+        self._write_lock = threading.Lock()  # Serializa a los escritores
+        self._snapshot = ConfigSnapshot(0, {})  # Versión publicada actualmente
+        # Capas en orden de prioridad ascendente; set/update escriben en overrides
+        self._layers: Dict[str, Dict[str, Any]] = {"overrides": {}}
+        self._loader: Optional[LayeredConfigLoader] = None
+
+    @property
+    def settings(self) -> Mapping[str, Any]:
+        """
+        Configuración publicada actualmente (solo lectura).
+        """
+        return self._snapshot.settings
+
+    def snapshot(self) -> ConfigSnapshot:
+        """
+        Obtiene la versión publicada actualmente de la configuración.
+        """
+        return self._snapshot
 
     def set(self, key: str, value: Any) -> None:
         """
         Establece un valor en la configuración global.
         """
-        self.settings[key] = value
+        self.update({key: value})
+
+    def update(self, values: Mapping[str, Any]) -> ConfigSnapshot:
+        """
+        Establece varios valores y los publica juntos en una sola versión.
+        """
+        with self._write_lock:
+            self._layers["overrides"] = {**self._layers["overrides"], **values}
+            return self._publish()
+
+    def _publish(self) -> ConfigSnapshot:
+        """
+        Combina las capas y publica un snapshot nuevo. Requiere el lock de escritura.
+        """
+        merged: Dict[str, Any] = {}
+        for layer in self._layers.values():
+            merged.update(layer)
+
+        # La reasignación del atributo es atómica: los lectores ven la
+        # versión anterior o la nueva, nunca una mezcla
+        self._snapshot = ConfigSnapshot(self._snapshot.version + 1, merged)
+        return self._snapshot
+
+    def load(self, loader: LayeredConfigLoader) -> ConfigSnapshot:
+        """
+        Carga las capas defaults, archivo del entorno y variables de entorno.
+        Los valores establecidos con set/update siguen teniendo prioridad.
+        """
+        layers = loader.load_layers()
+        with self._write_lock:
+            self._loader = loader
+            self._layers = {**layers, "overrides": self._layers["overrides"]}
+            return self._publish()
+
+    def reload(self) -> Optional[ConfigSnapshot]:
+        """
+        Vuelve a parsear solo la capa del archivo si cambió desde la última carga.
+        Devuelve el snapshot nuevo o None si no hubo cambios.
+        """
+        loader = self._loader
+        if loader is None or not loader.file_changed():
+            return None
+
+        file_layer = loader.load_file()
+        with self._write_lock:
+            self._layers["file"] = file_layer
+            return self._publish()
+
+    def watch(self, interval: float = 1.0) -> ConfigWatcher:
+        """
+        Inicia un watcher que recarga la configuración cuando cambia el archivo.
+        """
+        return ConfigWatcher(self.reload, interval).start()
 
     def get(self, key: str, default: Any = None) -> Any:
         """
         Recupera un valor de la configuración global.
         """
-        return self.settings.get(key, default)
+        return self._snapshot.get(key, default)
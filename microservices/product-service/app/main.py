@@ -4,9 +4,13 @@ from datetime import datetime
 from typing import Dict, List, Optional
 
 import uvicorn
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Response
 from pydantic import BaseModel
 
+from product_index import ProductIndex, decode_cursor, encode_cursor
+from product_stats import ProductStats
+from product_store import ProductStore
+
 app = FastAPI(
     title="Product Service",
     description="microservicio para gestión de productos",
@@ -42,8 +46,39 @@ class ProductUpdate(BaseModel):
     stock: Optional[int] = None
 
 
-# almacenamiento en memoria
+# almacenamiento en memoria, persistido en el wal y los snapshots de product_store
 products_db: Dict[str, Product] = {}
+# indices secundarios de busqueda, actualizados en cada alta y modificacion
+product_index = ProductIndex()
+# totales de /stats, actualizados en cada alta y modificacion
+product_stats = ProductStats()
+product_store = ProductStore(
+    os.getenv(
+        "PRODUCT_DATA_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "products"),
+    ),
+    encode=lambda product: product.dict(),
+    snapshot_every=int(os.getenv("PRODUCT_SNAPSHOT_EVERY", 10000)),
+)
+
+
+@app.on_event("startup")
+async def load_products():
+    """recuperar el catalogo del almacenamiento y reconstruir indices y totales"""
+    for record in product_store.recover():
+        products_db[record["id"]] = Product(**record)
+
+    product_index.extend(products_db.values())
+    for product in products_db.values():
+        product_stats.add(product)
+
+    product_store.open(products_db.values)
+
+
+@app.on_event("shutdown")
+async def close_store():
+    """persistir las escrituras pendientes al detener el servicio"""
+    await product_store.close()
 
 
 @app.get("/health")
@@ -61,35 +96,49 @@ async def create_product(product_data: ProductCreate):
         id=product_id, created_at=now, updated_at=now, **product_data.dict()
     )
     products_db[product_id] = product
+    product_index.add(product)
+    product_stats.add(product)
+    product_store.append(product)
+    await product_store.sync()
     return product
 
 
 @app.get("/products", response_model=List[Product])
 async def search_products(
+    response: Response,
     name: Optional[str] = Query(None, description="buscar por nombre"),
     category: Optional[str] = Query(None, description="filtrar por categoría"),
     min_price: Optional[float] = Query(None, description="precio mínimo"),
     max_price: Optional[float] = Query(None, description="precio máximo"),
     limit: int = Query(10, description="número máximo de resultados"),
+    cursor: Optional[str] = Query(None, description="cursor de la página siguiente"),
 ):
-    """buscar productos con filtros"""
-    results = list(products_db.values())
-
-    # aplicar filtros
-    if name:
-        results = [p for p in results if name.lower() in p.name.lower()]
-
-    if category:
-        results = [p for p in results if category.lower() == p.category.lower()]
-
-    if min_price is not None:
-        results = [p for p in results if p.price >= min_price]
-
-    if max_price is not None:
-        results = [p for p in results if p.price <= max_price]
-
-    # limitar resultados
-    return results[:limit]
+    """
+    buscar productos con filtros, en orden de creacion. si quedan mas
+    resultados, el cursor de la pagina siguiente va en el header X-Next-Cursor
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # se pide un resultado extra para saber si hay otra pagina
+    limit = max(limit, 0)
+    product_ids = product_index.search(
+        name=name,
+        category=category,
+        min_price=min_price,
+        max_price=max_price,
+        limit=limit + 1,
+        after=after,
+    )
+    has_more = len(product_ids) > limit
+    product_ids = product_ids[:limit]
+    if has_more and product_ids:
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            product_index.seq(product_ids[-1])
+        )
+    return [products_db[product_id] for product_id in product_ids]
 
 
 @app.get("/products/{product_id}", response_model=Product)
@@ -116,6 +165,10 @@ async def update_product(product_id: str, product_data: ProductUpdate):
     # actualizar timestamp
     product.updated_at = datetime.now()
     products_db[product_id] = product
+    product_index.add(product)
+    product_stats.add(product)
+    product_store.append(product)
+    await product_store.sync()
 
     return product
 
@@ -123,23 +176,20 @@ async def update_product(product_id: str, product_data: ProductUpdate):
 @app.get("/products/category/{category}", response_model=List[Product])
 async def get_products_by_category(category: str):
     """obtener productos por categoría"""
-    results = [
-        p for p in products_db.values() if p.category.lower() == category.lower()
-    ]
-    return results
+    product_ids = product_index.search(category=category)
+    return [products_db[product_id] for product_id in product_ids]
 
 
 @app.get("/stats")
 async def get_product_stats():
     """obtener estadísticas de productos"""
-    total_products = len(products_db)
-    total_stock = sum(p.stock for p in products_db.values())
-    categories = list(set(p.category for p in products_db.values()))
+    by_category = product_stats.categories()
 
     return {
-        "total_products": total_products,
-        "total_stock": total_stock,
-        "categories": categories,
+        "total_products": product_stats.total_products,
+        "total_stock": product_stats.total_stock,
+        "categories": list(by_category),
+        "by_category": by_category,
         "timestamp": datetime.now(),
     }
 
@@ -0,0 +1,296 @@
+"""
+indices secundarios del catalogo de productos
+
+mantiene un indice hash por categoria normalizada, un indice de precios
+ordenado (consultado con bisect) y un indice de trigramas para buscar
+subcadenas del nombre. las busquedas devuelven los ids en orden de creacion:
+si los candidatos son pocos se parte del indice mas selectivo y se
+intersectan los demas; si son muchos se recorre el catalogo en orden de
+creacion y se corta al llegar al limite
+"""
+
+import base64
+import binascii
+import heapq
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+TRIGRAM = 3
+CURSOR_PREFIX = "seq:"
+
+
+def normalize(text: str) -> str:
+    """normalizar texto para comparar sin distinguir mayusculas"""
+    return text.lower()
+
+
+def trigrams(text: str) -> Set[str]:
+    """trigramas de un texto normalizado"""
+    return {text[i : i + TRIGRAM] for i in range(len(text) - TRIGRAM + 1)}
+
+
+def encode_cursor(seq: int) -> str:
+    """cursor opaco que apunta despues del producto con esa secuencia"""
+    raw = f"{CURSOR_PREFIX}{seq}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """secuencia de un cursor; ValueError si el cursor no es valido"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+    except (binascii.Error, UnicodeError) as e:
+        raise ValueError(f"cursor invalido: {cursor}") from e
+    if not raw.startswith(CURSOR_PREFIX) or not raw[len(CURSOR_PREFIX) :].isdigit():
+        raise ValueError(f"cursor invalido: {cursor}")
+    return int(raw[len(CURSOR_PREFIX) :])
+
+
+class IndexEntry(NamedTuple):
+    """valores indexados de un producto"""
+
+    seq: int
+    category: str
+    price: float
+    name: str
+
+
+class SearchPlan(NamedTuple):
+    """indices que aplican a una busqueda"""
+
+    # conjuntos de ids de los indices hash, del menor al mayor
+    id_sets: List[Set[str]]
+    # posiciones [lo, hi) en el indice de precios, o None sin filtro de precio
+    price_range: Optional[Tuple[int, int]]
+    # candidatos del indice mas selectivo
+    candidates: int
+
+    def contains(self, product_id: str) -> bool:
+        """verificar si el id esta en todos los indices hash aplicables"""
+        return all(product_id in ids for ids in self.id_sets)
+
+
+class ProductIndex:
+    """indices secundarios actualizados en cada alta y modificacion"""
+
+    def __init__(self) -> None:
+        self.entries: Dict[str, IndexEntry] = {}
+        self.by_category: Dict[str, Set[str]] = {}
+        # precios ordenados y, en paralelo, el id de cada precio
+        self.price_keys: List[float] = []
+        self.price_ids: List[str] = []
+        self.by_trigram: Dict[str, Set[str]] = {}
+        # id de cada secuencia de creacion
+        self.order: List[str] = []
+
+    def seq(self, product_id: str) -> int:
+        """secuencia de creacion de un producto indexado"""
+        return self.entries[product_id].seq
+
+    def add(self, product) -> None:
+        """indexar un producto nuevo o reindexar uno modificado"""
+        previous = self.entries.get(product.id)
+        if previous is not None:
+            self._unindex(product.id, previous)
+            seq = previous.seq
+        else:
+            seq = len(self.order)
+            self.order.append(product.id)
+
+        entry = self._index(product, seq)
+        position = bisect_right(self.price_keys, entry.price)
+        self.price_keys.insert(position, entry.price)
+        self.price_ids.insert(position, product.id)
+
+    def extend(self, products: Iterable) -> None:
+        """
+        indexar en bloque productos nuevos, en orden de creacion. el indice de
+        precios se ordena una sola vez en lugar de insertar cada precio
+        """
+        prices = list(zip(self.price_keys, self.price_ids))
+        for product in products:
+            self.order.append(product.id)
+            entry = self._index(product, len(self.order) - 1)
+            prices.append((entry.price, product.id))
+
+        # orden estable: a igual precio se mantiene el orden de creacion
+        prices.sort(key=lambda item: item[0])
+        self.price_keys = [price for price, _ in prices]
+        self.price_ids = [product_id for _, product_id in prices]
+
+    def _index(self, product, seq: int) -> IndexEntry:
+        """agregar un producto a los indices hash y devolver su entrada"""
+        entry = IndexEntry(
+            seq, normalize(product.category), product.price, normalize(product.name)
+        )
+        self.entries[product.id] = entry
+
+        self.by_category.setdefault(entry.category, set()).add(product.id)
+        for trigram in trigrams(entry.name):
+            self.by_trigram.setdefault(trigram, set()).add(product.id)
+        return entry
+
+    def _unindex(self, product_id: str, entry: IndexEntry) -> None:
+        """quitar los valores indexados de un producto"""
+        del self.entries[product_id]
+
+        _discard(self.by_category, entry.category, product_id)
+
+        lo = bisect_left(self.price_keys, entry.price)
+        hi = bisect_right(self.price_keys, entry.price, lo)
+        position = self.price_ids.index(product_id, lo, hi)
+        del self.price_keys[position]
+        del self.price_ids[position]
+
+        for trigram in trigrams(entry.name):
+            _discard(self.by_trigram, trigram, product_id)
+
+    def _price_range(self, min_price: Optional[float], max_price: Optional[float]):
+        """posiciones [lo, hi) del rango de precios en el indice ordenado"""
+        lo = 0 if min_price is None else bisect_left(self.price_keys, min_price)
+        hi = (
+            len(self.price_keys)
+            if max_price is None
+            else bisect_right(self.price_keys, max_price)
+        )
+        return lo, max(lo, hi)
+
+    def search(
+        self,
+        name: Optional[str] = None,
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+    ) -> List[str]:
+        """
+        ids de los productos que cumplen los filtros, en orden de creacion.
+        after: solo productos creados despues de esa secuencia (paginacion).
+        cada indice aporta un conjunto de candidatos con su tamano; si
+        recorrer el catalogo hasta juntar limit resultados cuesta menos que
+        los candidatos del indice mas selectivo, se recorre el catalogo
+        """
+        name = normalize(name) if name else None
+        start = 0 if after is None else after + 1
+        plan = self._plan(name, category, min_price, max_price)
+        matches = self._matcher(name, min_price, max_price, start)
+
+        # con los candidatos repartidos en el catalogo, se esperan unos
+        # limit * total / candidatos productos recorridos hasta el limite
+        if limit is not None and limit * len(self.entries) < plan.candidates**2:
+            return self._scan_matches(plan, matches, start, limit)
+
+        found_ids = [
+            product_id for product_id in self._intersect(plan) if matches(product_id)
+        ]
+        if limit is None:
+            return sorted(found_ids, key=self.seq)
+        return heapq.nsmallest(limit, found_ids, key=self.seq)
+
+    def _plan(
+        self,
+        name: Optional[str],
+        category: Optional[str],
+        min_price: Optional[float],
+        max_price: Optional[float],
+    ) -> SearchPlan:
+        """indices que aplican a los filtros y candidatos del mas selectivo"""
+        # conjuntos de ids de los indices hash aplicables, del menor al mayor
+        id_sets: List[Set[str]] = []
+        if category:
+            id_sets.append(self.by_category.get(normalize(category), set()))
+        if name and len(name) >= TRIGRAM:
+            id_sets.extend(self.by_trigram.get(t, set()) for t in trigrams(name))
+        id_sets.sort(key=len)
+
+        candidates = len(id_sets[0]) if id_sets else len(self.entries)
+        price_range = None
+        if min_price is not None or max_price is not None:
+            price_range = self._price_range(min_price, max_price)
+            candidates = min(candidates, price_range[1] - price_range[0])
+        return SearchPlan(id_sets, price_range, candidates)
+
+    def _matcher(
+        self,
+        name: Optional[str],
+        min_price: Optional[float],
+        max_price: Optional[float],
+        start: int,
+    ) -> Callable[[str], bool]:
+        """
+        filtro de cada candidato: las subcadenas, el rango de precios y la
+        secuencia se verifican sobre la entrada indexada
+        """
+        entries = self.entries
+
+        def matches(product_id: str) -> bool:
+            entry = entries[product_id]
+            return (
+                entry.seq >= start
+                and (not name or name in entry.name)
+                and (min_price is None or entry.price >= min_price)
+                and (max_price is None or entry.price <= max_price)
+            )
+
+        return matches
+
+    def _intersect(self, plan: SearchPlan) -> Iterable[str]:
+        """candidatos del indice mas selectivo, intersectados con los demas"""
+        id_sets = plan.id_sets
+        if plan.price_range is not None:
+            lo, hi = plan.price_range
+            if not id_sets or hi - lo < len(id_sets[0]):
+                # el rango de precios es el mas selectivo
+                return (
+                    product_id
+                    for product_id in self.price_ids[lo:hi]
+                    if plan.contains(product_id)
+                )
+        if id_sets:
+            return id_sets[0].intersection(*id_sets[1:])
+        # sin indices aplicables (nombre de menos de 3 caracteres)
+        return self.entries
+
+    def _scan_matches(
+        self,
+        plan: SearchPlan,
+        matches: Callable[[str], bool],
+        start: int,
+        limit: int,
+    ) -> List[str]:
+        """recorrer el catalogo en orden de creacion hasta juntar limit ids"""
+        found = (
+            product_id
+            for product_id in self._scan(start)
+            if plan.contains(product_id) and matches(product_id)
+        )
+        return list(islice(found, limit))
+
+    def _scan(self, start: int) -> Iterator[str]:
+        """ids de los productos en orden de creacion desde una secuencia"""
+        order = self.order
+        for seq in range(start, len(order)):
+            yield order[seq]
+
+
+def _discard(index: Dict[str, Set[str]], key: str, product_id: str) -> None:
+    """quitar un id de un indice hash, borrando la clave si queda vacia"""
+    ids = index.get(key)
+    if ids is None:
+        return
+    ids.discard(product_id)
+    if not ids:
+        del index[key]
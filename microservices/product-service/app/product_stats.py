@@ -0,0 +1,76 @@
+"""
+estadisticas acumuladas del catalogo de productos
+
+los totales y el desglose por categoria se actualizan en cada alta y
+modificacion, asi /stats no recorre el catalogo: su costo depende solo del
+numero de categorias
+"""
+
+from typing import Dict, NamedTuple
+
+
+class StatsEntry(NamedTuple):
+    """valores de un producto que aportan a las estadisticas"""
+
+    category: str
+    stock: int
+
+
+class CategoryStats:
+    """productos y stock de una categoria"""
+
+    __slots__ = ("count", "stock")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.stock = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        """representacion para la respuesta de /stats"""
+        return {"count": self.count, "stock": self.stock}
+
+
+class ProductStats:
+    """agregados del catalogo actualizados en O(1) por producto"""
+
+    def __init__(self) -> None:
+        self.entries: Dict[str, StatsEntry] = {}
+        self.total_stock = 0
+        self.by_category: Dict[str, CategoryStats] = {}
+
+    @property
+    def total_products(self) -> int:
+        """numero de productos contados"""
+        return len(self.entries)
+
+    def add(self, product) -> None:
+        """contar un producto nuevo o actualizar los aportes de uno modificado"""
+        if product.id in self.entries:
+            self.remove(product.id)
+
+        entry = StatsEntry(product.category, product.stock)
+        self.entries[product.id] = entry
+        self.total_stock += entry.stock
+
+        stats = self.by_category.get(entry.category)
+        if stats is None:
+            stats = self.by_category[entry.category] = CategoryStats()
+        stats.count += 1
+        stats.stock += entry.stock
+
+    def remove(self, product_id: str) -> None:
+        """descontar un producto"""
+        entry = self.entries.pop(product_id)
+        self.total_stock -= entry.stock
+
+        stats = self.by_category[entry.category]
+        stats.count -= 1
+        stats.stock -= entry.stock
+        if not stats.count:
+            del self.by_category[entry.category]
+
+    def categories(self) -> Dict[str, Dict[str, int]]:
+        """desglose de productos y stock por categoria"""
+        return {
+            category: stats.to_dict() for category, stats in self.by_category.items()
+        }
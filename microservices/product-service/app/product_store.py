@@ -0,0 +1,243 @@
+"""
+almacenamiento durable del catalogo de productos
+
+cada alta o modificacion agrega el estado completo del producto a un log de
+escritura anticipada (wal) en json lines. el fsync se hace por lotes: las
+escrituras que llegan mientras un fsync esta en curso esperan al siguiente y
+comparten su costo, asi la latencia de cada escritura es a lo sumo la de dos
+fsync sin importar la carga.
+
+cada snapshot_every registros el wal rota a un segmento nuevo y un hilo
+escribe un snapshot compactado con el estado de todos los productos. el
+snapshot de la generacion N contiene al menos todo lo de los segmentos
+anteriores a N; como los registros son estados completos, reaplicar los
+segmentos desde N sobre el snapshot reconstruye el catalogo aunque el
+snapshot haya visto cambios posteriores a la rotacion
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+SNAPSHOT_EVERY = 10000
+
+logger = logging.getLogger(__name__)
+
+_SEGMENT = re.compile(r"wal-(\d+)\.log")
+_SNAPSHOT = re.compile(r"snapshot-(\d+)\.jsonl")
+
+
+def _json_default(value: Any) -> Any:
+    """serializar valores que json no conoce (fechas)"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"tipo no serializable: {type(value).__name__}")
+
+
+def _read_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    leer los registros de un archivo json lines. una ultima linea sin salto
+    de linea es una escritura cortada por una caida y se descarta
+    """
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.endswith("\n"):
+                return
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"registro invalido en {path}:{number}: {e}") from e
+
+
+def _fsync_dir(path: Path) -> None:
+    """persistir las entradas de un directorio (renombres y borrados)"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class ProductStore:
+    """wal con fsync por lotes y snapshots compactados en un directorio"""
+
+    def __init__(
+        self,
+        data_dir: str,
+        encode: Callable[[Any], Dict[str, Any]],
+        snapshot_every: int = SNAPSHOT_EVERY,
+    ) -> None:
+        """encode: convierte un producto en el registro json que se guarda"""
+        self.data_dir = Path(data_dir)
+        self.encode = encode
+        self.snapshot_every = snapshot_every
+        self.generation = 0
+        self.records_since_snapshot = 0
+        self._wal = None
+        self._source: Optional[Callable[[], Iterable[Any]]] = None
+        # registros escritos al wal y registros ya persistidos con fsync
+        self._written = 0
+        self._synced = 0
+        self._syncing: Optional[asyncio.Future] = None
+        self._snapshotting: Optional[asyncio.Future] = None
+
+    def _files(self, pattern: "re.Pattern") -> Dict[int, Path]:
+        """archivos del directorio que cumplen el patron, por generacion"""
+        files = {}
+        for path in self.data_dir.iterdir():
+            match = pattern.fullmatch(path.name)
+            if match:
+                files[int(match.group(1))] = path
+        return files
+
+    def recover(self) -> Iterator[Dict[str, Any]]:
+        """
+        entregar los registros del ultimo snapshot y de los segmentos
+        posteriores, en orden. un registro posterior del mismo id reemplaza
+        al anterior
+        """
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        # snapshots que una caida dejo a medio escribir
+        for temp_path in self.data_dir.glob("snapshot-*.tmp"):
+            temp_path.unlink()
+
+        snapshots = self._files(_SNAPSHOT)
+        segments = self._files(_SEGMENT)
+
+        start = max(snapshots, default=0)
+        if snapshots:
+            yield from _read_records(snapshots[start])
+
+        self.records_since_snapshot = 0
+        for generation in sorted(g for g in segments if g >= start):
+            for record in _read_records(segments[generation]):
+                self.records_since_snapshot += 1
+                yield record
+
+        # las escrituras nuevas van a un segmento propio
+        self.generation = max([start - 1, *segments]) + 1
+
+    def open(self, source: Callable[[], Iterable[Any]]) -> None:
+        """
+        abrir el segmento actual del wal. source entrega los productos
+        vigentes cuando hay que escribir un snapshot
+        """
+        self._source = source
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self._wal = self._open_segment(self.generation)
+
+    def _open_segment(self, generation: int):
+        """abrir un segmento del wal para agregar registros"""
+        path = self.data_dir / f"wal-{generation}.log"
+        wal = open(path, "a", encoding="utf-8")
+        _fsync_dir(self.data_dir)
+        return wal
+
+    def append(self, product: Any) -> None:
+        """agregar el estado de un producto al wal (sin esperar el fsync)"""
+        record = json.dumps(self.encode(product), default=_json_default)
+        self._wal.write(record + "\n")
+        self._written += 1
+        self.records_since_snapshot += 1
+
+    async def sync(self) -> None:
+        """esperar a que todo lo agregado hasta ahora este persistido"""
+        target = self._written
+        while self._synced < target:
+            if self._syncing is None:
+                self._syncing = asyncio.ensure_future(self._sync_batch())
+            # shield: si se cancela una peticion el lote sigue para las demas
+            await asyncio.shield(self._syncing)
+
+    async def _sync_batch(self) -> None:
+        """persistir con un fsync todos los registros pendientes"""
+        try:
+            wal = self._wal
+            target = self._written
+            rotate = self._snapshot_due()
+            if rotate:
+                # los registros que lleguen durante el fsync van al segmento nuevo
+                self.generation += 1
+                self._wal = self._open_segment(self.generation)
+                products = list(self._source())
+                self.records_since_snapshot = 0
+
+            wal.flush()
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, os.fsync, wal.fileno())
+            self._synced = target
+
+            if rotate:
+                wal.close()
+                self._snapshotting = loop.run_in_executor(
+                    None, self._write_snapshot, self.generation, products
+                )
+        finally:
+            self._syncing = None
+
+    def _snapshot_due(self) -> bool:
+        """hay que compactar y no hay otro snapshot en curso"""
+        if self.records_since_snapshot < self.snapshot_every:
+            return False
+        if self._snapshotting is None:
+            return True
+        if not self._snapshotting.done():
+            return False
+        self._report_snapshot()
+        return True
+
+    def _report_snapshot(self) -> None:
+        """
+        registrar el error del snapshot anterior, si fallo. los segmentos
+        siguen en disco y el proximo snapshot vuelve a compactarlos
+        """
+        error = self._snapshotting.exception()
+        self._snapshotting = None
+        if error is not None:
+            logger.error(
+                "fallo el snapshot de la generacion anterior a %s",
+                self.generation,
+                exc_info=error,
+            )
+
+    def _write_snapshot(self, generation: int, products: List[Any]) -> None:
+        """
+        escribir el snapshot de una generacion y borrar los archivos que deja
+        obsoletos. corre en un hilo; si falla, los archivos anteriores siguen
+        siendo suficientes para recuperar
+        """
+        path = self.data_dir / f"snapshot-{generation}.jsonl"
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for product in products:
+                record = json.dumps(self.encode(product), default=_json_default)
+                f.write(record + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        _fsync_dir(self.data_dir)
+
+        for pattern in (_SNAPSHOT, _SEGMENT):
+            for old_generation, old_path in self._files(pattern).items():
+                if old_generation < generation:
+                    old_path.unlink()
+
+    async def close(self) -> None:
+        """
+        persistir lo pendiente, esperar el snapshot en curso y cerrar. sin
+        open() no hay nada que cerrar; el error de un snapshot se propaga
+        """
+        if self._wal is None:
+            return
+        try:
+            await self.sync()
+            if self._snapshotting is not None:
+                await self._snapshotting
+        finally:
+            self._wal.close()
+            self._wal = None
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+digest de un plan validado, para validar solo lo que cambio
+
+el digest guarda el hash de cada recurso por direccion y, solo para los
+recursos que los tienen, los errores de cada regla y el grupo que ocupan en
+las reglas agregadas; por regla agregada guarda los errores de cada grupo.
+un digest solo es valido para las mismas reglas con que se genero
+(huella de rules.json y de los modulos que las compilan y evaluan)
+"""
+
+import hashlib
+import json
+
+DIGEST_VERSION = 1
+
+# los digest empiezan con esta clave, los planes con format_version
+_DIGEST_MARKER = b'{"digest_version"'
+
+
+def resource_address(resource):
+    """direccion unica del recurso dentro del plan"""
+    address = resource.get("address")
+    if address:
+        return address
+    return f"{resource.get('type')}.{resource.get('name')}"
+
+
+def resource_hash(text):
+    """
+    hash del texto json del recurso. terraform show -json escribe siempre
+    igual el mismo recurso, asi no hace falta volver a serializarlo
+    """
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def rules_fingerprint(*paths):
+    """huella de los archivos que definen las reglas"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def empty_digest(fingerprint):
+    """digest sin recursos: todo el plan se considera nuevo"""
+    return {
+        "digest_version": DIGEST_VERSION,
+        "fingerprint": fingerprint,
+        "hashes": {},
+        "errors": {},
+        "groups": {},
+        "group_errors": {},
+    }
+
+
+def is_digest(path):
+    """verificar si el archivo es un digest y no un plan"""
+    with open(path, "rb") as f:
+        return f.read(len(_DIGEST_MARKER)) == _DIGEST_MARKER
+
+
+def load_digest(path, fingerprint):
+    """
+    cargar un digest. si se genero con otras reglas sus errores no sirven y
+    se devuelve None
+    """
+    with open(path) as f:
+        digest = json.load(f)
+    if (
+        digest.get("digest_version") != DIGEST_VERSION
+        or digest.get("fingerprint") != fingerprint
+    ):
+        return None
+    return digest
+
+
+def write_digest(path, digest):
+    """escribir el digest; digest_version va primero para reconocerlo"""
+    with open(path, "w") as f:
+        json.dump(digest, f, separators=(",", ":"))
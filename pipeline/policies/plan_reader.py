@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+lectura incremental de planes de terraform en json
+
+recorre el documento por bloques y entrega los recursos de
+planned_values.root_module y de sus child_modules uno a uno, sin cargar el
+plan completo en memoria. las demas secciones del plan se saltan sin
+decodificarlas
+"""
+
+import json
+import mmap
+import os
+import re
+
+CHUNK_SIZE = 1 << 20
+# margen al final del buffer en el que un valor puede estar incompleto
+_TAIL = 32
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# siguiente caracter que cambia la profundidad o abre un string
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+# resto de un string ya abierto, incluyendo las comillas de cierre
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+# fin de un elemento de arreglo: separador o cierre
+_ITEM_END = re.compile(r"[ \t\n\r]*([,\]])[ \t\n\r]*")
+# inicio de un objeto que sigue a otro objeto en un arreglo; "{" seguido de
+# comillas sin escapar no puede estar dentro de un string
+_OBJECT_BOUNDARY = re.compile(rb'\}[ \t\n\r]*,[ \t\n\r]*(?=\{[ \t\n\r]*")')
+
+
+class PlanResourceStream:
+    """iterador de recursos de un plan json leido desde un archivo o un pipe"""
+
+    def __init__(self, source, chunk_size=CHUNK_SIZE):
+        """inicializar con un objeto de texto con metodo read"""
+        self.source = source
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        # caracteres ya descartados del inicio del buffer
+        self.consumed = 0
+        self.eof = False
+        self.has_planned_values = False
+        # inicio en el buffer del ultimo valor decodificado
+        self.value_start = 0
+        # el arreglo de recursos actual es el de root_module
+        self.in_root_module = False
+        self._decoder = json.JSONDecoder()
+
+    def __iter__(self):
+        """recorrer el plan entregando cada recurso de todos los modulos"""
+        for _ in self._resource_arrays():
+            for _ in self._array_items():
+                yield self._decode_value()
+
+    def with_modules(self):
+        """recorrer el plan entregando (direccion del modulo, recurso)"""
+        for resource in self:
+            yield module_address(resource), resource
+
+    def with_text(self):
+        """recorrer el plan entregando (recurso, texto json del recurso)"""
+        for _ in self._resource_arrays():
+            for _ in self._array_items():
+                resource = self._decode_value()
+                yield resource, self.buffer[self.value_start : self.pos]
+
+    @property
+    def offset(self):
+        """posicion actual respecto al inicio del plan"""
+        return self.consumed + self.pos
+
+    def resource_array_offset(self):
+        """
+        obtener la posicion del primer recurso de root_module, o None si
+        root_module no tiene recursos antes de sus child_modules
+        """
+        for _ in self._resource_arrays():
+            if not self.in_root_module:
+                return None
+            self._expect("[")
+            if self._peek() != "]":
+                return self.offset
+            self.pos += 1
+        return None
+
+    def resume_root_module(self):
+        """
+        recorrer los recursos que siguen en root_module, con la fuente
+        posicionada justo despues del cierre de su arreglo resources
+        """
+        for _ in self._module_arrays(resumed=True):
+            for _ in self._array_items():
+                yield self._decode_value()
+
+    def _resource_arrays(self):
+        """posicionarse en cada arreglo de recursos del plan"""
+        for key in self._object_keys():
+            if key != "planned_values":
+                self._skip_value()
+                continue
+
+            self.has_planned_values = True
+            for module_key in self._object_keys():
+                if module_key == "root_module":
+                    yield from self._module_arrays()
+                    # no se necesita nada mas del plan
+                    return
+                self._skip_value()
+            return
+
+    def _module_arrays(self, resumed=False):
+        """
+        posicionarse en el arreglo de recursos de root_module y de cada uno de
+        sus child_modules, a cualquier profundidad. el arbol se recorre con
+        una pila de generadores de claves, sin recursion ni listas intermedias
+        """
+        stack = [self._object_keys(resumed)]
+        while stack:
+            key = next(stack[-1], None)
+            if key is None:
+                stack.pop()
+            elif key == "resources":
+                self.in_root_module = len(stack) == 1
+                yield
+            elif key == "child_modules":
+                stack.append(self._child_module_keys())
+            else:
+                self._skip_value()
+
+    def _child_module_keys(self):
+        """entregar las claves de cada modulo de un arreglo child_modules"""
+        for _ in self._array_items():
+            yield from self._object_keys()
+
+    def _fill(self):
+        """leer el siguiente bloque, descartando lo ya consumido"""
+        if self.eof:
+            return False
+
+        # leer al menos lo que ya hay en el buffer para que los valores
+        # grandes no se decodifiquen una vez por bloque
+        chunk = self.source.read(max(self.chunk_size, len(self.buffer) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.consumed += self.pos
+        self.pos = 0
+        return True
+
+    def _error(self, message):
+        """construir error de parseo en la posicion actual"""
+        return json.JSONDecodeError(message, self.buffer, self.pos)
+
+    def _peek(self):
+        """obtener el siguiente caracter significativo sin consumirlo"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return None
+
+    def _expect(self, chars):
+        """consumir el siguiente caracter, que debe estar en chars"""
+        char = self._peek()
+        if char is None or char not in chars:
+            raise self._error(f"se esperaba {chars!r}")
+        self.pos += 1
+        return char
+
+    def _decode_value(self):
+        """decodificar el siguiente valor completo"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # solo se pide otro bloque si el valor quedo cortado al final
+                truncated = len(self.buffer) - e.pos <= _TAIL or e.msg.startswith(
+                    "Unterminated string"
+                )
+                if truncated and self._fill():
+                    continue
+                raise
+
+            # un numero al final del buffer puede continuar en el siguiente bloque
+            if len(self.buffer) - end <= _TAIL and self._fill():
+                continue
+
+            self.value_start = self.pos
+            self.pos = end
+            return value
+
+    def _skip_value(self):
+        """saltar el siguiente valor sin decodificarlo"""
+        if self._peek() not in ("{", "["):
+            self._decode_value()
+            return
+
+        depth = 0
+        while True:
+            match = _STRUCTURAL.search(self.buffer, self.pos)
+            if match is None:
+                self.pos = len(self.buffer)
+                if not self._fill():
+                    raise self._error("fin inesperado del plan")
+                continue
+
+            self.pos = match.end()
+            char = match.group()
+            if char == '"':
+                self._skip_string()
+            elif char in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def _skip_string(self):
+        """saltar el resto de un string ya abierto"""
+        while True:
+            match = _STRING_BODY.match(self.buffer, self.pos)
+            if match is not None:
+                self.pos = match.end()
+                return
+            if not self._fill():
+                raise self._error("string sin cerrar")
+
+    def _object_keys(self, resumed=False):
+        """
+        entregar las claves de un objeto, dejando la posicion en su valor.
+        resumed: la posicion esta despues del valor de una clave ya entregada
+        """
+        if resumed:
+            if self._expect(",}") == "}":
+                return
+        else:
+            self._expect("{")
+            if self._peek() == "}":
+                self.pos += 1
+                return
+
+        while True:
+            key = self._decode_value()
+            if not isinstance(key, str):
+                raise self._error("se esperaba una clave")
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def _array_items(self):
+        """recorrer los elementos de un arreglo, dejando la posicion en cada uno"""
+        self._expect("[")
+        if self._peek() == "]":
+            self.pos += 1
+            return
+
+        while True:
+            yield
+            if self._expect(",]") == "]":
+                return
+
+
+def module_address(resource):
+    """direccion del modulo de un recurso segun su address; "" en root_module"""
+    address = resource.get("address", "")
+    if not address.startswith("module."):
+        return ""
+
+    local = f"{resource.get('type')}.{resource.get('name')}"
+    if resource.get("mode") == "data":
+        local = f"data.{local}"
+    prefix, found, _ = address.rpartition(f".{local}")
+    return prefix if found else ""
+
+
+def iter_plan_resources(source, chunk_size=CHUNK_SIZE):
+    """iterar los recursos de todos los modulos de planned_values de un plan json"""
+    return iter(PlanResourceStream(source, chunk_size))
+
+
+class PlanShard:
+    """
+    recursos de un rango de bytes del arreglo de recursos de un plan.
+    el rango es valido si se consume exactamente: recursos completos separados
+    por comas, o recursos hasta el cierre del arreglo
+    """
+
+    def __init__(self, data, start, stop):
+        """inicializar con el contenido del plan (bytes o mmap) y el rango"""
+        self.data = data
+        self.start = start
+        self.stop = stop
+        self.verified = False
+        self.array_end = False
+        # offset en bytes que sigue al cierre del arreglo, si esta en el rango
+        self.array_end_offset = None
+
+    def __iter__(self):
+        """decodificar los recursos del rango; json invalido produce error"""
+        text = bytes(self.data[self.start : self.stop]).decode("utf-8")
+        decoder = json.JSONDecoder()
+        pos = 0
+
+        while pos < len(text):
+            resource, pos = decoder.raw_decode(text, pos)
+            yield resource
+
+            match = _ITEM_END.match(text, pos)
+            if match is None:
+                return
+            if match.group(1) == "]":
+                self.array_end = True
+                self.array_end_offset = self.start + len(
+                    text[: match.start(1) + 1].encode("utf-8")
+                )
+                break
+            pos = match.end()
+
+        self.verified = True
+
+
+def plan_shards(plan_path, shard_count):
+    """
+    dividir el arreglo de recursos de un plan en rangos de bytes de tamano
+    similar. los cortes son especulativos: se ubican en el siguiente inicio de
+    objeto tras cada punto de corte y PlanShard verifica que sean recursos
+    """
+    # latin-1 hace corresponder cada byte con un caracter, asi los offsets
+    # del lector son offsets de bytes en el archivo
+    with open(plan_path, encoding="latin-1", newline="") as plan_file:
+        first = PlanResourceStream(plan_file).resource_array_offset()
+    if first is None:
+        return []
+
+    size = os.path.getsize(plan_path)
+    step = max(1, (size - first) // max(1, shard_count))
+    cuts = [first]
+
+    with open(plan_path, "rb") as plan_file, mmap.mmap(
+        plan_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        for i in range(1, shard_count):
+            match = _OBJECT_BOUNDARY.search(data, max(first + i * step, cuts[-1] + 1))
+            if match is None:
+                break
+            cuts.append(match.end())
+
+    return list(zip(cuts, cuts[1:] + [size]))
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+compilador de reglas de politica declarativas
+
+las reglas se definen en json con rutas de campos dentro de los triggers,
+operadores y comparaciones tipadas (string, int, semver, cidr). cada regla se
+compila una sola vez en una funcion (recurso, triggers) -> errores, y la
+version normalizada del archivo se guarda en cache binaria (marshal)
+entre ejecuciones
+"""
+
+import ipaddress
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+from trigger_fields import field_value
+
+# raiz del repositorio para compartir la cache de archivos de iac/
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from iac.file_cache import cache_file_name, load_cached  # noqa: E402
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / ".cache"
+
+# cambia cuando cambia el formato normalizado guardado en cache
+COMPILER_VERSION = 2
+
+COMPARISONS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">=": lambda a, b: a >= b,
+    ">": lambda a, b: a > b,
+    "<=": lambda a, b: a <= b,
+    "<": lambda a, b: a < b,
+}
+
+_SEMVER = re.compile(r"v?(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:[-+].*)?")
+
+
+def parse_semver(value):
+    """convertir una version a tupla (mayor, menor, parche)"""
+    match = _SEMVER.fullmatch(str(value).strip())
+    if match is None:
+        raise ValueError(f"version invalida: {value}")
+    return tuple(int(part or 0) for part in match.groups())
+
+
+def parse_cidr(value):
+    """convertir un bloque cidr a red"""
+    return ipaddress.ip_network(str(value), strict=False)
+
+
+# conversion de valores por tipo de comparacion
+CONVERTERS = {
+    "string": str,
+    "int": int,
+    "semver": parse_semver,
+    "cidr": parse_cidr,
+}
+
+
+class RuleSpecError(ValueError):
+    """error en la definicion de una regla"""
+
+
+def _normalize_check(rule_name, check):
+    """
+    validar un chequeo. el valor de referencia se valida pero se guarda tal
+    cual, para que la regla normalizada se pueda guardar como json; se
+    convierte una sola vez al compilar
+    """
+    op = check.get("op")
+    field = check.get("field")
+    if not field or "message" not in check:
+        raise RuleSpecError(f"regla '{rule_name}': chequeo sin field o message")
+
+    value_type = check.get("type", "string")
+    if value_type not in CONVERTERS:
+        raise RuleSpecError(f"regla '{rule_name}': tipo desconocido '{value_type}'")
+
+    value = check.get("value")
+    if op in COMPARISONS:
+        CONVERTERS[value_type](value)
+    elif op == "within":
+        if value_type != "cidr":
+            raise RuleSpecError(f"regla '{rule_name}': 'within' requiere tipo cidr")
+        parse_cidr(value)
+    elif op == "contains_all":
+        value = list(value)
+    elif op != "present":
+        raise RuleSpecError(f"regla '{rule_name}': operador desconocido '{op}'")
+
+    return {
+        "path": field.split("."),
+        "op": op,
+        "type": value_type,
+        "value": value,
+        "when_present": bool(check.get("when_present", False)),
+        "message": check["message"],
+    }
+
+
+def normalize_rules(document):
+    """validar el documento de reglas y normalizarlo"""
+    rules = []
+    for rule in document.get("rules", []):
+        name = rule.get("name")
+        if not name:
+            raise RuleSpecError("regla sin nombre")
+
+        rules.append(
+            {
+                "name": name,
+                "resource_types": rule.get("resource_types"),
+                "contains": rule.get("contains"),
+                "checks": [
+                    _normalize_check(name, check) for check in rule.get("checks", [])
+                ],
+            }
+        )
+    return rules
+
+
+def _field_getter(path):
+    """
+    obtener el valor de una ruta de campos dentro de los triggers. los campos
+    estructurados se decodifican, asi una ruta como tags.Environment entra
+    en el mapa de tags
+    """
+    field = path[0]
+    if len(path) == 1:
+        return lambda triggers: field_value(triggers, field)
+
+    def get(triggers):
+        value = field_value(triggers, field)
+        for key in path[1:]:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+
+    return get
+
+
+def _failure_test(check):
+    """
+    construir la funcion que recibe el valor del campo y devuelve None si
+    cumple, o el contexto para el mensaje de error si no cumple
+    """
+    op = check["op"]
+    expected = check["value"]
+
+    if op == "present":
+        return lambda value: None if value else {}
+
+    if op == "contains_all":
+
+        def missing_items(value):
+            missing = [item for item in expected if item not in (value or ())]
+            return {"missing": missing} if missing else None
+
+        return missing_items
+
+    convert = CONVERTERS[check["type"]]
+    expected = convert(expected)
+    if op == "within":
+
+        def matches(actual):
+            return actual.subnet_of(expected)
+
+    else:
+        compare = COMPARISONS[op]
+
+        def matches(actual):
+            return compare(actual, expected)
+
+    def compare_value(value):
+        # valores ausentes o que no se pueden convertir no cumplen
+        try:
+            return None if matches(convert(value)) else {}
+        except (TypeError, ValueError):
+            return {}
+
+    return compare_value
+
+
+def compile_rule(rule):
+    """compilar una regla normalizada en una funcion (recurso, triggers) -> errores"""
+    checks = [
+        (
+            _field_getter(check["path"]),
+            _failure_test(check),
+            check["when_present"],
+            check["message"],
+        )
+        for check in rule["checks"]
+    ]
+
+    def evaluate(resource, triggers):
+        errors = []
+        for get, failure, when_present, message in checks:
+            value = get(triggers)
+            # un mapa vacio si cuenta como presente: solo falta el campo o su texto
+            if when_present and (value is None or value == ""):
+                continue
+
+            context = failure(value)
+            if context is not None:
+                errors.append(
+                    message.format(
+                        resource_name=resource.get("name", "unknown"),
+                        value=value,
+                        **context,
+                    )
+                )
+        return errors
+
+    return evaluate
+
+
+def _parse_rules(content):
+    """validar y normalizar el contenido de un archivo de reglas"""
+    return normalize_rules(json.loads(content))
+
+
+def load_rule_specs(rules_path, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    cargar las reglas normalizadas de un archivo json. si mtime y tamano
+    coinciden con la cache no se lee el archivo; si cambiaron pero el hash es
+    el mismo se evita volver a validar
+    """
+    cache_path = os.path.join(cache_dir, cache_file_name(rules_path, "rules-"))
+    return load_cached(rules_path, cache_path, _parse_rules, COMPILER_VERSION)
+
+
+def load_rules(rules_path, cache_dir=DEFAULT_CACHE_DIR):
+    """cargar y compilar las reglas de un archivo json"""
+    return [
+        (rule, compile_rule(rule)) for rule in load_rule_specs(rules_path, cache_dir)
+    ]
@@ -1,192 +1,603 @@
 #!/usr/bin/env python3
 """
 validaciones de politicas de seguridad para terraform
+
+las reglas por recurso se definen en rules.json y se compilan al cargar el
+modulo; las reglas que cruzan recursos se registran con @policy_rule.
+el plan se lee por bloques y cada recurso se despacha, en una sola pasada,
+a las reglas que aplican a su resource_type. con el digest de la validacion
+anterior solo se evaluan los recursos nuevos o cambiados. opcionalmente se escriben
+reportes json y junit xml con el tiempo y los recursos examinados por regla
 """
 
+import argparse
 import json
+import mmap
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# raiz del repositorio para reutilizar el evaluador iam de iac/
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import rule_compiler  # noqa: E402
+import trigger_fields  # noqa: E402
+from iac import iam_evaluator  # noqa: E402
+from iac.iam_evaluator import IAMPolicyEvaluator  # noqa: E402
+from plan_digest import (  # noqa: E402
+    empty_digest,
+    is_digest,
+    load_digest,
+    resource_address,
+    resource_hash,
+    rules_fingerprint,
+    write_digest,
+)
+from plan_reader import PlanResourceStream, PlanShard, plan_shards  # noqa: E402
+from rule_compiler import load_rules  # noqa: E402
+from validation_report import (  # noqa: E402
+    RuleResult,
+    write_json_report,
+    write_junit_report,
+)
+
+# reglas registradas, en orden de ejecucion
+RULES = []
+
+RULES_PATH = Path(__file__).resolve().parent / "rules.json"
+
+# archivos que definen el resultado de las reglas: un digest generado con
+# otra version de cualquiera de ellos no se reutiliza
+RULE_SOURCES = (
+    RULES_PATH,
+    Path(__file__).resolve(),
+    Path(rule_compiler.__file__).resolve(),
+    Path(trigger_fields.__file__).resolve(),
+    Path(iam_evaluator.__file__).resolve(),
+)
+
+# rangos por proceso en modo paralelo, para repartir mejor la carga
+SHARDS_PER_JOB = 4
+# tamano maximo de un rango, para acotar la memoria de cada proceso
+MAX_SHARD_BYTES = 64 << 20
+
+
+class PolicyRule:
+    """regla de politica aplicada a recursos null_resource de ciertos tipos"""
+
+    def __init__(
+        self,
+        name,
+        func,
+        resource_types=None,
+        contains=None,
+        aggregate=False,
+        group_by=None,
+    ):
+        """
+        resource_types: tipos exactos a los que aplica la regla
+        contains: texto que debe aparecer en el resource_type
+        aggregate: la regla recibe todos los recursos juntos en lugar de uno a uno
+        group_by: funcion triggers -> str que separa los recursos de una regla
+        agregada en grupos independientes; sin ella hay un solo grupo
+        sin resource_types ni contains la regla aplica a todos los recursos
+        """
+        self.name = name
+        self.func = func
+        self.resource_types = set(resource_types) if resource_types else None
+        self.contains = contains
+        self.aggregate = aggregate
+        self.group_by = group_by
+        # tiempo en la regla y recursos examinados, solo en copias timed()
+        self.measured = False
+        self.seconds = 0.0
+        self.examined = 0
+
+    def applies_to(self, resource_type):
+        """verificar si la regla aplica a un resource_type"""
+        if self.resource_types is not None:
+            return resource_type in self.resource_types
+        if self.contains is not None:
+            return self.contains in resource_type
+        return True
+
+    def timed(self):
+        """copia de la regla que acumula su tiempo y los recursos examinados"""
+        func = self.func
+        timed = PolicyRule(
+            self.name,
+            func,
+            self.resource_types,
+            self.contains,
+            self.aggregate,
+            self.group_by,
+        )
+        timed.measured = True
+
+        if self.aggregate:
+
+            def measure(entries):
+                start = time.perf_counter()
+                try:
+                    return func(entries)
+                finally:
+                    timed.seconds += time.perf_counter() - start
+                    timed.examined += len(entries)
 
-def load_terraform_plan(plan_path):
-    """cargar plan de terraform"""
-    try:
-        with open(plan_path) as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"error cargando plan: {e}")
-        return None
-
-
-def get_resources(plan_data):
-    """obtener recursos del plan"""
-    if not plan_data or "planned_values" not in plan_data:
-        return []
-
-    root_module = plan_data["planned_values"].get("root_module", {})
-    return root_module.get("resources", [])
-
+        else:
 
-def validate_resource_tags(resources):
-    """verificar que recursos tengan tags obligatorios"""
-    required_tags = ["Project", "Environment", "ManagedBy"]
-    errors = []
+            def measure(resource, triggers):
+                start = time.perf_counter()
+                try:
+                    return func(resource, triggers)
+                finally:
+                    timed.seconds += time.perf_counter() - start
+                    timed.examined += 1
+
+        timed.func = measure
+        return timed
+
+    def group_key(self, triggers):
+        """grupo del recurso dentro de una regla agregada"""
+        if self.group_by is None:
+            return ""
+        return self.group_by(triggers)
+
+    def group_entries(self, entries):
+        """separar los recursos de una regla agregada por grupo, en orden"""
+        groups = {}
+        for entry in entries:
+            groups.setdefault(self.group_key(entry[1]), []).append(entry)
+        return groups
+
+
+def policy_rule(
+    name, resource_types=None, contains=None, aggregate=False, group_by=None
+):
+    """decorador para registrar una regla de politica"""
+
+    def register(func):
+        RULES.append(
+            PolicyRule(name, func, resource_types, contains, aggregate, group_by)
+        )
+        return func
+
+    return register
+
+
+def _applicable_rules(dispatch, rules, resource_type):
+    """reglas que aplican a un resource_type, resueltas una vez por tipo"""
+    applicable = dispatch.get(resource_type)
+    if applicable is None:
+        applicable = [
+            (i, rule) for i, rule in enumerate(rules) if rule.applies_to(resource_type)
+        ]
+        dispatch[resource_type] = applicable
+    return applicable
+
+
+def evaluate_resources(resources, rules):
+    """
+    evaluar las reglas por recurso consumiendo los recursos a medida que llegan.
+    devuelve los errores por regla y, para las reglas agregadas, los recursos
+    que les aplican
+    """
+    errors = [[] for _ in rules]
+    # las reglas agregadas solo retienen los recursos que les aplican
+    pending = [[] for _ in rules]
+    # reglas aplicables por resource_type, resueltas una vez por tipo
+    dispatch = {}
 
     for resource in resources:
         if resource.get("type") != "null_resource":
             continue
 
         triggers = resource.get("values", {}).get("triggers", {})
-        tags = triggers.get("tags", {})
-
-        if not tags:
-            continue  # skip recursos sin tags
-
-        missing_tags = [tag for tag in required_tags if tag not in tags]
-        if missing_tags:
-            resource_name = resource.get("name", "unknown")
-            errors.append(f"recurso {resource_name} sin tags: {missing_tags}")
-
-    return errors
-
-
-def validate_vpc_security(resources):
-    """verificar configuracion segura de vpc"""
-    errors = []
-
-    vpc_resources = [
-        r
-        for r in resources
-        if r.get("type") == "null_resource"
-        and "vpc" in r.get("values", {}).get("triggers", {}).get("resource_type", "")
-    ]
-
-    for vpc in vpc_resources:
-        triggers = vpc.get("values", {}).get("triggers", {})
-
-        # verificar dns support
-        if triggers.get("enable_dns_support") != "true":
-            errors.append("vpc debe tener dns support habilitado")
-
-        # verificar dns hostnames
-        if triggers.get("enable_dns_hostnames") != "true":
-            errors.append("vpc debe tener dns hostnames habilitado")
-
-        # verificar cidr
-        cidr = triggers.get("cidr_block", "")
-        if not cidr or not cidr.startswith("10."):
-            errors.append("vpc debe usar cidr privado (10.x.x.x)")
-
-    return errors
-
-
-def validate_subnet_security(resources):
-    """verificar configuracion de subredes"""
-    errors = []
-
-    subnet_resources = [
-        r
-        for r in resources
-        if r.get("type") == "null_resource"
-        and "subnet" in r.get("values", {}).get("triggers", {}).get("resource_type", "")
-    ]
-
-    for subnet in subnet_resources:
-        triggers = subnet.get("values", {}).get("triggers", {})
-
-        # verificar que subnet tenga vpc dependency
-        if not triggers.get("vpc_dependency"):
-            errors.append("subnet debe tener vpc_dependency")
-
-        # verificar cidr privado
-        cidr = triggers.get("cidr_block", "")
-        if not cidr or not cidr.startswith("10."):
-            errors.append("subnet debe usar cidr privado")
-
-    return errors
-
+        resource_type = triggers.get("resource_type", "")
+
+        for i, rule in _applicable_rules(dispatch, rules, resource_type):
+            if rule.aggregate:
+                pending[i].append((resource, triggers))
+            else:
+                errors[i].extend(rule.func(resource, triggers))
+
+    return errors, pending
+
+
+def finish_rules(rules, errors, pending):
+    """evaluar las reglas agregadas y devolver (nombre, errores) por regla"""
+    for i, rule in enumerate(rules):
+        if rule.aggregate:
+            errors[i] = [
+                error
+                for entries in rule.group_entries(pending[i]).values()
+                for error in rule.func(entries)
+            ]
+        yield rule.name, errors[i]
+
+
+def run_rules(resources, rules=None):
+    """
+    ejecutar reglas consumiendo los recursos a medida que llegan,
+    devolviendo (nombre, errores) por regla en orden de registro
+    """
+    rules = rules or RULES
+    errors, pending = evaluate_resources(resources, rules)
+    yield from finish_rules(rules, errors, pending)
+
+
+def _evaluate_shard(shard):
+    """evaluar las reglas sobre un rango del plan mapeado en memoria"""
+    plan_path, start, stop, timed = shard
+    rules = [rule.timed() for rule in RULES] if timed else RULES
+
+    with open(plan_path, "rb") as plan_file, mmap.mmap(
+        plan_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        resources = PlanShard(data, start, stop)
+        try:
+            errors, pending = evaluate_resources(resources, rules)
+        except ValueError:
+            # el corte no coincidio con el inicio de un recurso
+            return None
+
+    if not resources.verified:
+        return None
+    stats = [(rule.seconds, rule.examined) for rule in rules]
+    return errors, pending, resources.array_end_offset, stats
+
+
+def _merge_shards(results, rules, errors, pending):
+    """
+    combinar los resultados de los rangos en orden hasta el que cierra el
+    arreglo de root_module. devuelve el offset que sigue a ese arreglo, o
+    None si algun corte no resulto valido
+    """
+    for result in results:
+        if result is None:
+            return None
+
+        shard_errors, shard_pending, array_end_offset, stats = result
+        for i, rule in enumerate(rules):
+            errors[i].extend(shard_errors[i])
+            pending[i].extend(shard_pending[i])
+            rule.seconds += stats[i][0]
+            rule.examined += stats[i][1]
+
+        if array_end_offset is not None:
+            return array_end_offset
+    return None
+
+
+def run_rules_parallel(plan_path, jobs, rules=None):
+    """
+    ejecutar las reglas en un pool de procesos, dividiendo el plan en rangos.
+    los errores se combinan en el orden de los rangos, igual que en serie;
+    si algun corte no resulta valido se valida el plan en serie. los rangos
+    cubren los recursos de root_module; sus child_modules se validan despues
+    en este proceso. rules son RULES o sus copias timed(), en el mismo orden
+    """
+    rules = rules or RULES
+    timed = any(rule.measured for rule in rules)
+    shard_count = max(
+        jobs * SHARDS_PER_JOB, os.path.getsize(plan_path) // MAX_SHARD_BYTES
+    )
+    shards = plan_shards(plan_path, shard_count)
+    errors = [[] for _ in rules]
+    pending = [[] for _ in rules]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(
+            _evaluate_shard,
+            [(plan_path, start, stop, timed) for start, stop in shards],
+        )
+        array_end_offset = _merge_shards(results, rules, errors, pending)
+        # los rangos posteriores al fin del arreglo no se necesitan
+        executor.shutdown(cancel_futures=True)
+
+    if array_end_offset is None:
+        # se descarta lo medido en los rangos antes de validar en serie
+        for rule in rules:
+            rule.seconds = 0.0
+            rule.examined = 0
+        with open(plan_path) as plan_file:
+            return list(run_rules(PlanResourceStream(plan_file), rules))
+
+    with open(plan_path, encoding="utf-8") as plan_file:
+        plan_file.seek(array_end_offset)
+        tail_errors, tail_pending = evaluate_resources(
+            PlanResourceStream(plan_file).resume_root_module(), rules
+        )
+    for i in range(len(rules)):
+        errors[i].extend(tail_errors[i])
+        pending[i].extend(tail_pending[i])
+    return list(finish_rules(rules, errors, pending))
+
+
+class _IncrementalRun:
+    """
+    estado de una validacion incremental contra un digest anterior. los
+    recursos sin cambios reutilizan sus errores y grupos del digest; los
+    nuevos o cambiados se evaluan y marcan sus grupos como afectados
+    """
+
+    def __init__(self, previous, rules):
+        """inicializar con el digest anterior y las reglas a ejecutar"""
+        self.previous = previous
+        self.rules = rules
+        self.rule_index = {rule.name: i for i, rule in enumerate(rules)}
+        # lo que queda al final sin consumir son los recursos eliminados
+        self.before_hashes = dict(previous["hashes"])
+        self.digest = empty_digest(previous["fingerprint"])
+        self.errors = [[] for _ in rules]
+        # recursos de las reglas agregadas, por grupo
+        self.pending = [{} for _ in rules]
+        self.affected = [set() for _ in rules]
+        self.dispatch = {}
+        self.changed = 0
+
+    def _mark_affected(self, address):
+        """marcar los grupos que ocupaba un recurso en el digest anterior"""
+        for name, key in self.previous["groups"].get(address, {}).items():
+            if name in self.rule_index:
+                self.affected[self.rule_index[name]].add(key)
+
+    def add(self, resource, text):
+        """procesar un recurso del plan con su texto json"""
+        if resource.get("type") != "null_resource":
+            return
 
-def validate_kubernetes_security(resources):
-    """verificar configuracion segura de kubernetes"""
+        triggers = resource.get("values", {}).get("triggers", {})
+        address = resource_address(resource)
+        value_hash = resource_hash(text)
+        self.digest["hashes"][address] = value_hash
+
+        before_hash = self.before_hashes.pop(address, None)
+        if before_hash == value_hash:
+            self._reuse(address, resource, triggers)
+            return
+
+        self.changed += 1
+        if before_hash is not None:
+            # el recurso pudo cambiar de grupo
+            self._mark_affected(address)
+        self._evaluate(address, resource, triggers)
+
+    def _reuse(self, address, resource, triggers):
+        """tomar del digest los errores y grupos de un recurso sin cambios"""
+        stored = self.previous["errors"].get(address)
+        if stored:
+            self.digest["errors"][address] = stored
+            for name, found in stored.items():
+                self.errors[self.rule_index[name]].extend(found)
+
+        keys = self.previous["groups"].get(address)
+        if keys:
+            self.digest["groups"][address] = keys
+            for name, key in keys.items():
+                self.pending[self.rule_index[name]].setdefault(key, []).append(
+                    (resource, triggers)
+                )
+
+    def _evaluate(self, address, resource, triggers):
+        """evaluar un recurso nuevo o cambiado y guardar su resultado"""
+        resource_errors = {}
+        resource_groups = {}
+        resource_type = triggers.get("resource_type", "")
+        for i, rule in _applicable_rules(self.dispatch, self.rules, resource_type):
+            if rule.aggregate:
+                key = rule.group_key(triggers)
+                self.pending[i].setdefault(key, []).append((resource, triggers))
+                self.affected[i].add(key)
+                resource_groups[rule.name] = key
+                continue
+
+            found = rule.func(resource, triggers)
+            if found:
+                self.errors[i].extend(found)
+                resource_errors[rule.name] = found
+
+        if resource_errors:
+            self.digest["errors"][address] = resource_errors
+        if resource_groups:
+            self.digest["groups"][address] = resource_groups
+
+    def _finish_aggregate(self, i, rule):
+        """evaluar los grupos afectados de una regla agregada"""
+        stored = self.previous["group_errors"].get(rule.name, {})
+        group_errors = {}
+        for key, entries in self.pending[i].items():
+            if key in self.affected[i]:
+                found = rule.func(entries)
+            else:
+                found = stored.get(key, [])
+            if found:
+                self.errors[i].extend(found)
+                group_errors[key] = found
+        if group_errors:
+            self.digest["group_errors"][rule.name] = group_errors
+
+    def finish(self):
+        """
+        evaluar las reglas agregadas y devolver
+        ((nombre, errores) por regla, digest nuevo, cambiados, eliminados)
+        """
+        removed = len(self.before_hashes)
+        for address in self.before_hashes:
+            self._mark_affected(address)
+
+        for i, rule in enumerate(self.rules):
+            if rule.aggregate:
+                self._finish_aggregate(i, rule)
+
+        results = [(rule.name, self.errors[i]) for i, rule in enumerate(self.rules)]
+        return results, self.digest, self.changed, removed
+
+
+def run_rules_incremental(resources, previous, rules=None):
+    """
+    ejecutar las reglas solo sobre los recursos nuevos o cambiados respecto
+    del digest anterior; los errores de los recursos sin cambios se toman del
+    digest. las reglas agregadas se evaluan solo en los grupos con recursos
+    nuevos, cambiados o eliminados.
+    resources entrega (recurso, texto json del recurso).
+    devuelve ((nombre, errores) por regla, digest nuevo, cambiados, eliminados)
+    """
+    run = _IncrementalRun(previous, rules or RULES)
+    for resource, text in resources:
+        run.add(resource, text)
+    return run.finish()
+
+
+def load_previous(previous_path, fingerprint):
+    """
+    cargar el digest de la validacion anterior. solo un digest escrito con
+    --write-digest guarda los errores de los recursos sin cambios; con un
+    plan, o un digest de otras reglas, se valida el plan completo
+    """
+    if not is_digest(previous_path):
+        print("un plan no guarda sus errores, se valida el plan completo")
+        return empty_digest(fingerprint)
+
+    previous = load_digest(previous_path, fingerprint)
+    if previous is None:
+        print("digest generado con otras reglas, se valida el plan completo")
+        return empty_digest(fingerprint)
+    return previous
+
+
+def validate_incremental(plan_path, previous_path=None, digest_path=None, rules=None):
+    """
+    validar el plan contra la validacion anterior y guardar el digest nuevo.
+    sin validacion anterior se evalua todo el plan
+    """
+    fingerprint = rules_fingerprint(*RULE_SOURCES)
+    if previous_path:
+        previous = load_previous(previous_path, fingerprint)
+    else:
+        previous = empty_digest(fingerprint)
+
+    with open(plan_path) as plan_file:
+        results, digest, changed, removed = run_rules_incremental(
+            PlanResourceStream(plan_file).with_text(), previous, rules
+        )
+
+    if previous_path:
+        print(
+            f"validacion incremental: {changed} recursos nuevos o cambiados, "
+            f"{removed} eliminados"
+        )
+    if digest_path:
+        write_digest(digest_path, digest)
+    return results
+
+
+def register_rules(rules_path):
+    """registrar las reglas declarativas de un archivo json"""
+    for spec, func in load_rules(rules_path):
+        RULES.append(
+            PolicyRule(spec["name"], func, spec["resource_types"], spec["contains"])
+        )
+
+
+# reglas por recurso definidas como datos
+register_rules(RULES_PATH)
+
+
+@policy_rule(
+    "privilegios iam",
+    resource_types=["iam_policy", "iam_role", "iam_user"],
+    aggregate=True,
+)
+def validate_iam_privileges(entries):
+    """verificar que ningun rol o usuario pueda ejecutar acciones sensibles"""
     errors = []
 
-    k8s_resources = [
-        r
-        for r in resources
-        if r.get("type") == "null_resource"
-        and "kubernetes"
-        in r.get("values", {}).get("triggers", {}).get("resource_type", "")
-    ]
-
-    for k8s in k8s_resources:
-        triggers = k8s.get("values", {}).get("triggers", {})
-
-        # verificar version de kubernetes
-        version = triggers.get("kubernetes_version", "")
-        if version and version < "1.25":
-            errors.append("kubernetes version debe ser >= 1.25")
-
-        # verificar que cluster tenga al menos 3 nodos
-        total_nodes = triggers.get("total_nodes")
-        if total_nodes and int(total_nodes) < 3:
-            errors.append("cluster debe tener al menos 3 nodos")
+    evaluator = IAMPolicyEvaluator.from_triggers(triggers for _, triggers in entries)
+    for policy in evaluator.invalid_policies:
+        errors.append(f"politica iam {policy} tiene un documento json invalido")
+    for principal, actions in evaluator.find_privileged().items():
+        errors.append(f"{principal} puede ejecutar acciones sensibles: {actions}")
 
     return errors
 
 
-def validate_iam_security(resources):
-    """verificar politicas iam"""
-    errors = []
-
-    iam_resources = [
-        r
-        for r in resources
-        if r.get("type") == "null_resource"
-        and r.get("values", {}).get("triggers", {}).get("resource_type", "")
-        in ["iam_policy", "iam_role"]
+def _parse_args():
+    """leer los argumentos de la linea de comandos"""
+    parser = argparse.ArgumentParser(
+        usage=(
+            "python security.py [--jobs N | --previous DIGEST] "
+            "[--write-digest DIGEST] [--json-report JSON] [--junit-report XML] "
+            "<terraform_plan.json>"
+        )
+    )
+    parser.add_argument("plan_path")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="procesos para validar el plan por rangos en paralelo",
+    )
+    parser.add_argument(
+        "--previous",
+        help="digest escrito con --write-digest en la validacion anterior; "
+        "solo se validan los recursos que cambiaron",
+    )
+    parser.add_argument(
+        "--write-digest",
+        help="guardar el digest de esta validacion para la proxima ejecucion",
+    )
+    parser.add_argument(
+        "--json-report", help="escribir un reporte json con el resultado por regla"
+    )
+    parser.add_argument(
+        "--junit-report", help="escribir un reporte junit xml con una prueba por regla"
+    )
+    args = parser.parse_args()
+    if (args.previous or args.write_digest) and args.jobs > 1:
+        parser.error("--jobs no se combina con --previous ni --write-digest")
+    return args
+
+
+def _validate(args, rules):
+    """validar el plan en el modo pedido y devolver (modo, resultados)"""
+    if args.previous or args.write_digest:
+        results = validate_incremental(
+            args.plan_path, args.previous, args.write_digest, rules
+        )
+        return "incremental", results
+    if args.jobs > 1:
+        return "paralelo", run_rules_parallel(args.plan_path, args.jobs, rules)
+    with open(args.plan_path) as plan_file:
+        return "serie", list(run_rules(PlanResourceStream(plan_file), rules))
+
+
+def _write_reports(args, rules, results, mode, seconds):
+    """escribir los reportes json y junit pedidos"""
+    report = [
+        RuleResult(name, errors, rule.seconds, rule.examined)
+        for rule, (name, errors) in zip(rules, results)
     ]
-
-    for iam in iam_resources:
-        triggers = iam.get("values", {}).get("triggers", {})
-
-        # verificar que politica tenga documento
-        if not triggers.get("policy_document"):
-            errors.append("politica iam debe tener documento")
-
-        # verificar tipo de politica
-        if not triggers.get("policy_type"):
-            errors.append("politica iam debe tener tipo definido")
-
-    return errors
-
-
-def main():
-    """validar politicas de seguridad"""
-    if len(sys.argv) != 2:
-        print("uso: python security.py <terraform_plan.json>")
-        sys.exit(1)
-
-    plan_path = sys.argv[1]
-    plan_data = load_terraform_plan(plan_path)
-
-    if not plan_data:
-        sys.exit(1)
-
-    resources = get_resources(plan_data)
+    if args.json_report:
+        write_json_report(
+            args.json_report,
+            "security",
+            report,
+            seconds,
+            plan=args.plan_path,
+            mode=mode,
+        )
+    if args.junit_report:
+        write_junit_report(args.junit_report, "security", report, seconds)
+
+
+def _print_results(results):
+    """imprimir el resultado de cada regla y devolver todos los errores"""
     all_errors = []
-
-    # ejecutar validaciones
-    validations = [
-        ("tags obligatorios", validate_resource_tags),
-        ("seguridad vpc", validate_vpc_security),
-        ("seguridad subnets", validate_subnet_security),
-        ("seguridad kubernetes", validate_kubernetes_security),
-        ("seguridad iam", validate_iam_security),
-    ]
-
-    for name, validation_func in validations:
+    for name, errors in results:
         print(f"validando {name}...")
-        errors = validation_func(resources)
         if errors:
             print(f"errores en {name}:")
             for error in errors:
@@ -194,7 +605,32 @@ def main():
             all_errors.extend(errors)
         else:
             print(f"  ok: {name}")
+    return all_errors
+
+
+def main():
+    """validar politicas de seguridad"""
+    args = _parse_args()
+
+    # solo se mide cada regla si se pidio algun reporte
+    reporting = args.json_report or args.junit_report
+    rules = [rule.timed() for rule in RULES] if reporting else RULES
+    start = time.perf_counter()
+
+    try:
+        mode, results = _validate(args, rules)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"error cargando plan: {e}")
+        sys.exit(1)
+
+    if reporting:
+        try:
+            _write_reports(args, rules, results, mode, time.perf_counter() - start)
+        except OSError as e:
+            print(f"error escribiendo reporte: {e}")
+            sys.exit(1)
 
+    all_errors = _print_results(results)
     if all_errors:
         print(f"\ntotal errores encontrados: {len(all_errors)}")
         sys.exit(1)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+decodificacion compartida de los campos estructurados de los triggers
+
+terraform solo admite strings en los triggers, por eso tags, ports,
+environment, routes, attached_policies y similares llegan serializados, con
+str() de python o como json segun trigger_encoding del generador. cada texto
+se decodifica una sola vez: los recursos que repiten el mismo texto reutilizan
+el valor ya decodificado
+"""
+
+import ast
+import json
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+# raiz del repositorio: la lista de campos la define el generador en iac/
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from iac.composite import STRUCTURED_TRIGGER_FIELDS  # noqa: E402
+
+# campos de triggers que guardan colecciones serializadas como texto
+STRUCTURED_FIELDS = STRUCTURED_TRIGGER_FIELDS
+
+# textos distintos que se mantienen decodificados en memoria
+DECODE_CACHE_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=DECODE_CACHE_SIZE)
+def decode_field(text):
+    """
+    decodificar el texto de un campo estructurado, probando json y luego
+    literales de python. si no se puede decodificar se devuelve el texto.
+    el valor se comparte entre llamadas, no se debe modificar
+    """
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return text
+
+
+def field_value(triggers, field):
+    """obtener un campo de los triggers, decodificado si es estructurado"""
+    value = triggers.get(field)
+    if field in STRUCTURED_FIELDS and isinstance(value, str):
+        return decode_field(value)
+    return value
+
+
+def decode_triggers(triggers):
+    """copiar los triggers con los campos estructurados decodificados"""
+    return {field: field_value(triggers, field) for field in triggers}
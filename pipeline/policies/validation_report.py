@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+reportes de validacion en json y junit xml
+
+cada regla o validacion se reporta con su resultado, sus errores, el tiempo
+que tomo y cuantos recursos examino, para seguir el costo de cada regla
+entre ejecuciones del pipeline
+"""
+
+import json
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+
+REPORT_VERSION = 1
+
+
+class RuleResult:
+    """resultado de una regla o validacion"""
+
+    def __init__(self, name, errors, seconds=0.0, examined=0):
+        """errors: mensajes de error; seconds: tiempo en la regla"""
+        self.name = name
+        self.errors = list(errors)
+        self.seconds = seconds
+        self.examined = examined
+
+    @property
+    def passed(self):
+        """la regla paso si no produjo errores"""
+        return not self.errors
+
+    def to_dict(self):
+        """representacion para el reporte json"""
+        return {
+            "name": self.name,
+            "passed": self.passed,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 6),
+            "examined": self.examined,
+        }
+
+
+def _write_atomic(path, write):
+    """escribir el reporte en un temporal y reemplazar el destino"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        write(f)
+    os.replace(temp_path, path)
+
+
+def write_json_report(path, suite, results, seconds, **summary):
+    """escribir el reporte json; summary agrega campos a nivel de suite"""
+    report = {
+        "report_version": REPORT_VERSION,
+        "suite": suite,
+        "timestamp": datetime.now(tz=timezone.utc).isoformat(),
+        "seconds": round(seconds, 6),
+        "passed": all(result.passed for result in results),
+        **summary,
+        "rules": [result.to_dict() for result in results],
+    }
+    _write_atomic(path, lambda f: json.dump(report, f, indent=2, ensure_ascii=False))
+
+
+def write_junit_report(path, suite, results, seconds):
+    """escribir el reporte junit xml, un testcase por regla"""
+    failures = sum(not result.passed for result in results)
+    suites = ET.Element("testsuites")
+    testsuite = ET.SubElement(
+        suites,
+        "testsuite",
+        name=suite,
+        tests=str(len(results)),
+        failures=str(failures),
+        errors="0",
+        time=f"{seconds:.6f}",
+        timestamp=datetime.now(tz=timezone.utc).isoformat(timespec="seconds"),
+    )
+
+    for result in results:
+        testcase = ET.SubElement(
+            testsuite,
+            "testcase",
+            classname=suite,
+            name=result.name,
+            time=f"{result.seconds:.6f}",
+        )
+        properties = ET.SubElement(testcase, "properties")
+        ET.SubElement(
+            properties, "property", name="examined", value=str(result.examined)
+        )
+        if not result.passed:
+            failure = ET.SubElement(
+                testcase, "failure", message=f"{len(result.errors)} errores"
+            )
+            failure.text = "\n".join(result.errors)
+
+    ET.indent(suites)
+    tree = ET.ElementTree(suites)
+    _write_atomic(
+        path, lambda f: tree.write(f, encoding="unicode", xml_declaration=True)
+    )
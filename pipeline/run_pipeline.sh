@@ -96,6 +96,13 @@ run_integration_tests() {
     mkdir -p "$WORKSPACE_DIR"
     cp -r "$TERRAFORM_DIR"/* "$WORKSPACE_DIR/"
     
+    # regenerar main.tf.json junto con su manifiesto de expectativas
+    if ! python "$PROJECT_ROOT/generate_infrastructure.py" "$WORKSPACE_DIR"; then
+        log_error "generacion de infraestructura fallo"
+        rm -rf "$WORKSPACE_DIR"
+        return 1
+    fi
+    
     cd "$WORKSPACE_DIR"
     
     # terraform init
@@ -121,7 +128,8 @@ run_integration_tests() {
     
     # validar outputs esperados
     cd "$PIPELINE_DIR"
-    if ! python scripts/validate_terraform_outputs.py "$WORKSPACE_DIR/tfplan"; then
+    if ! python scripts/validate_terraform_outputs.py "$WORKSPACE_DIR/tfplan" \
+        --summary "$WORKSPACE_DIR/infrastructure_summary.json"; then
         log_error "validacion de outputs terraform fallo"
         rm -rf "$WORKSPACE_DIR"
         return 1
@@ -91,6 +91,13 @@ integration_tests() {
     mkdir -p "$TEMP_DIR"
     cp -r "$TERRAFORM_DIR"/* "$TEMP_DIR/"
     
+    # regenerar main.tf.json junto con su manifiesto de expectativas
+    if ! python "$PROJECT_ROOT/generate_infrastructure.py" "$TEMP_DIR" > /dev/null; then
+        error "fallo al generar infraestructura"
+        rm -rf "$TEMP_DIR"
+        return 1
+    fi
+    
     cd "$TEMP_DIR"
     
     echo "generando plan terraform..."
@@ -115,7 +122,8 @@ integration_tests() {
         fi
         
         # validar outputs
-        if python "$PROJECT_ROOT/pipeline/scripts/validate_terraform_outputs.py" tfplan; then
+        if python "$PROJECT_ROOT/pipeline/scripts/validate_terraform_outputs.py" tfplan \
+            --summary "$TEMP_DIR/infrastructure_summary.json"; then
             success "outputs terraform ok"
         else
             error "outputs terraform invalidos"
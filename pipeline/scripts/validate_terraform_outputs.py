@@ -2,78 +2,297 @@
 """
 validador de outputs de terraform plan
 verifica que el plan contenga los recursos esperados
+
+acepta el plan binario o el json ya renderizado. el json de terraform show
+se guarda en una cache indexada por el hash del plan binario, y el plan se lee
+por bloques resumiendo cada recurso por resource_type a medida que llega.
+opcionalmente escribe reportes json y junit xml por validacion
 """
 
+import argparse
+import contextlib
+import hashlib
+import io
 import json
+import os
 import subprocess
 import sys
-from typing import Any, Dict, List
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# lector incremental compartido con las politicas de seguridad
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "policies"))
+
+from plan_reader import CHUNK_SIZE, PlanResourceStream  # noqa: E402
+from trigger_fields import decode_triggers  # noqa: E402
+from validation_report import (  # noqa: E402
+    RuleResult,
+    write_json_report,
+    write_junit_report,
+)
+
+
+# cache de planes renderizados, indexada por el hash del plan binario,
+# en .cache/ de la raiz del proyecto (ignorado por git)
+DEFAULT_CACHE_DIR = os.environ.get(
+    "TF_PLAN_CACHE_DIR",
+    str(Path(__file__).resolve().parents[2] / ".cache" / "terraform-plan-json"),
+)
+
+
+# resumen exportado por InfrastructureBuilder junto a main.tf.json
+SUMMARY_FILE = "infrastructure_summary.json"
+
+
+def _is_rendered_json(plan_file: str) -> bool:
+    """verificar si el archivo ya es un plan json y no un plan binario"""
+    with open(plan_file, "rb") as f:
+        return f.read(64).lstrip().startswith(b"{")
+
+
+class ResourceTypeSummary:
+    """resumen de los recursos de un resource_type vistos en el plan"""
+
+    def __init__(self, resource_type: str, position: int, triggers: Dict[str, Any]):
+        """inicializar con el primer recurso del tipo"""
+        self.resource_type = resource_type
+        self.first_position = position
+        # campos estructurados ya decodificados (tags, ports, etc.)
+        self.first_triggers = decode_triggers(triggers)
+        # cuantos recursos del tipo definen cada campo de triggers
+        self.field_counts: Counter = Counter()
+
+
+def load_expectation_manifest(summary_path: str) -> Dict[str, Any]:
+    """
+    cargar el manifiesto de expectativas del infrastructure_summary.json
+    generado por InfrastructureBuilder
+    """
+    with open(summary_path) as f:
+        summary = json.load(f)
+
+    manifest = summary.get("expectation_manifest")
+    if manifest is None:
+        # resumenes anteriores solo tienen el total
+        manifest = {"total_resources": summary["total_resources"]}
+    return manifest
 
 
 class TerraformPlanValidator:
     """validador para planes de terraform"""
 
-    def __init__(self, plan_file: str):
-        """inicializar validador con archivo de plan"""
+    def __init__(
+        self,
+        plan_file: str,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+    ):
+        """
+        inicializar validador con archivo de plan.
+        plan_file puede ser el plan binario de terraform o el json ya renderizado;
+        con cache_dir=None el plan binario se lee directo del pipe sin cache
+        """
         self.plan_file = plan_file
-        self.plan_data = self._load_plan()
+        self.cache_dir = cache_dir
+        self.has_planned_values = False
+        self.resource_count = 0
+        # conteo e indice por resource_type, construidos en una sola pasada
+        self.type_counts: Counter = Counter()
+        self.summaries: Dict[str, ResourceTypeSummary] = {}
+        # recursos por direccion de modulo ("" es root_module)
+        self.module_counts: Counter = Counter()
+        # resource_types consultados por la validacion en curso
+        self.examined_types: set = set()
+        # resultado, tiempo y recursos examinados de cada validacion
+        self.results: List[RuleResult] = []
+        start = time.perf_counter()
+        self._load_plan()
+        self.load_seconds = time.perf_counter() - start
+
+    def _load_plan(self) -> None:
+        """leer el plan json, renderizandolo con terraform show si es necesario"""
+        if not os.path.isfile(self.plan_file):
+            print(f"error al leer plan: no existe {self.plan_file}")
+            sys.exit(1)
+
+        if _is_rendered_json(self.plan_file):
+            self._read_rendered(self.plan_file)
+        elif self.cache_dir is None:
+            self._stream_terraform_show()
+        else:
+            self._read_rendered(self._render_cached())
 
-    def _load_plan(self) -> Dict[str, Any]:
-        """cargar y parsear el plan de terraform"""
+    def _read_rendered(self, json_path: str) -> None:
+        """leer un plan ya renderizado en json"""
         try:
-            # convertir plan binario a json
-            result = subprocess.run(
-                ["terraform", "show", "-json", self.plan_file],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
+            with open(json_path) as plan_json:
+                stream = PlanResourceStream(plan_json)
+                self._summarize(stream.with_modules())
+                self.has_planned_values = stream.has_planned_values
+        except json.JSONDecodeError as e:
+            print(f"error al parsear json del plan: {e}")
+            sys.exit(1)
 
-            return json.loads(result.stdout)
+    def _render_cached(self) -> str:
+        """
+        obtener el json renderizado del plan desde la cache, indexada por el
+        hash del plan binario; si no existe se ejecuta terraform show una vez
+        """
+        digest = hashlib.sha256()
+        with open(self.plan_file, "rb") as plan_binary:
+            for chunk in iter(lambda: plan_binary.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+
+        cache_path = os.path.join(self.cache_dir, f"{digest.hexdigest()}.json")
+        if os.path.exists(cache_path):
+            return cache_path
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        # convertir plan binario a json, escribiendo directo al archivo
+        command = ["terraform", "show", "-json", self.plan_file]
+        try:
+            with open(temp_path, "w") as rendered:
+                subprocess.run(
+                    command, stdout=rendered, stderr=subprocess.DEVNULL, check=True
+                )
         except subprocess.CalledProcessError as e:
+            os.remove(temp_path)
             print(f"error al leer plan: {e}")
             sys.exit(1)
+
+        os.replace(temp_path, cache_path)
+        return cache_path
+
+    def _stream_terraform_show(self) -> None:
+        """leer el plan de terraform desde el pipe de terraform show"""
+        # convertir plan binario a json
+        command = ["terraform", "show", "-json", self.plan_file]
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+
+        try:
+            stream = PlanResourceStream(process.stdout)
+            self._summarize(stream.with_modules())
+            self.has_planned_values = stream.has_planned_values
         except json.JSONDecodeError as e:
-            print(f"error al parsear json del plan: {e}")
+            # un json incompleto suele indicar que terraform fallo
+            returncode = process.wait()
+            if returncode != 0:
+                error = subprocess.CalledProcessError(returncode, command)
+                print(f"error al leer plan: {error}")
+            else:
+                print(f"error al parsear json del plan: {e}")
             sys.exit(1)
+        finally:
+            # el resto del plan no se necesita
+            process.stdout.close()
+            if process.poll() is None:
+                process.terminate()
+            process.wait()
+
+    def _summarize(self, resources) -> None:
+        """
+        resumir los recursos por resource_type a medida que llegan.
+        resources entrega (direccion del modulo, recurso)
+        """
+        type_counts = self.type_counts
+        summaries = self.summaries
+
+        for position, (module, resource) in enumerate(resources):
+            self.resource_count += 1
+            self.module_counts[module] += 1
+            if resource.get("type") != "null_resource":
+                continue
+
+            triggers = resource.get("values", {}).get("triggers", {})
+            resource_type = triggers.get("resource_type", "")
+            type_counts[resource_type] += 1
+
+            summary = summaries.get(resource_type)
+            if summary is None:
+                summary = ResourceTypeSummary(resource_type, position, triggers)
+                summaries[resource_type] = summary
+            summary.field_counts.update(triggers.keys())
+
+    def _select(self, predicate) -> List[ResourceTypeSummary]:
+        """obtener resumenes de los tipos que cumplen el predicado, en orden del plan"""
+        self.examined_types.update(filter(predicate, self.summaries))
+        return sorted(
+            (
+                summary
+                for resource_type, summary in self.summaries.items()
+                if predicate(resource_type)
+            ),
+            key=lambda summary: summary.first_position,
+        )
+
+    def _count(self, predicate) -> int:
+        """contar recursos de los tipos que cumplen el predicado"""
+        self.examined_types.update(filter(predicate, self.type_counts))
+        return sum(
+            count
+            for resource_type, count in self.type_counts.items()
+            if predicate(resource_type)
+        )
 
     def validate_resource_count(self, expected_count: int) -> bool:
         """validar numero total de recursos"""
-        if "planned_values" not in self.plan_data:
+        self.examined_types.update(self.type_counts)
+        if not self.has_planned_values:
             print("plan no contiene planned_values")
             return False
 
-        root_module = self.plan_data["planned_values"].get("root_module", {})
-        resources = root_module.get("resources", [])
-
-        actual_count = len(resources)
+        actual_count = self.resource_count
         if actual_count != expected_count:
             print(f"recursos esperados: {expected_count}, encontrados: {actual_count}")
             return False
 
-        print(f"validacion de conteo exitosa: {actual_count} recursos")
+        if len(self.module_counts) > 1:
+            print(
+                f"validacion de conteo exitosa: {actual_count} recursos "
+                f"en {len(self.module_counts)} modulos"
+            )
+        else:
+            print(f"validacion de conteo exitosa: {actual_count} recursos")
+        return True
+
+    def validate_resource_types(self, expected_types: Dict[str, int]) -> bool:
+        """validar la cantidad de recursos de cada resource_type esperado"""
+        self.examined_types.update(self.type_counts)
+        mismatches = {
+            resource_type: (expected, self.type_counts[resource_type])
+            for resource_type, expected in expected_types.items()
+            if self.type_counts[resource_type] != expected
+        }
+        # tipos presentes en el plan que el manifiesto no espera
+        for resource_type in self.type_counts.keys() - expected_types.keys():
+            mismatches[resource_type] = (0, self.type_counts[resource_type])
+
+        if mismatches:
+            for resource_type, (expected, actual) in sorted(mismatches.items()):
+                print(f"{resource_type}: esperados {expected}, encontrados {actual}")
+            return False
+
+        print(f"validados conteos de {len(expected_types)} tipos de recursos")
         return True
 
     def validate_vpc_resources(self) -> bool:
         """validar recursos de vpc"""
-        resources = self._get_resources()
-
         # buscar recursos vpc
-        vpc_resources = [
-            r
-            for r in resources
-            if r.get("type") == "null_resource"
-            and "vpc"
-            in r.get("values", {}).get("triggers", {}).get("resource_type", "")
-        ]
+        vpc_resources = self._select(lambda resource_type: "vpc" in resource_type)
 
         if not vpc_resources:
             print("no se encontraron recursos vpc")
             return False
 
         # validar vpc tiene cidr
-        vpc = vpc_resources[0]
-        triggers = vpc.get("values", {}).get("triggers", {})
+        triggers = vpc_resources[0].first_triggers
 
         if "cidr_block" not in triggers:
             print("vpc no tiene cidr_block")
@@ -84,52 +303,36 @@ class TerraformPlanValidator:
 
     def validate_subnet_resources(self) -> bool:
         """validar recursos de subnet"""
-        resources = self._get_resources()
-
         # buscar recursos subnet
-        subnet_resources = [
-            r
-            for r in resources
-            if r.get("type") == "null_resource"
-            and "subnet"
-            in r.get("values", {}).get("triggers", {}).get("resource_type", "")
-        ]
+        subnet_resources = self._select(lambda resource_type: "subnet" in resource_type)
+        subnet_count = self._count(lambda resource_type: "subnet" in resource_type)
 
-        if len(subnet_resources) < 2:
-            print(
-                f"se esperaban al menos 2 subredes, encontradas: {len(subnet_resources)}"
-            )
+        if subnet_count < 2:
+            print(f"se esperaban al menos 2 subredes, encontradas: {subnet_count}")
             return False
 
         # validar cada subnet tiene vpc_dependency
-        for subnet in subnet_resources:
-            triggers = subnet.get("values", {}).get("triggers", {})
-            if "vpc_dependency" not in triggers:
+        for summary in subnet_resources:
+            type_count = self.type_counts[summary.resource_type]
+            if summary.field_counts["vpc_dependency"] != type_count:
                 print("subnet sin vpc_dependency")
                 return False
 
-        print(f"validadas {len(subnet_resources)} subredes")
+        print(f"validadas {subnet_count} subredes")
         return True
 
     def validate_kubernetes_resources(self) -> bool:
         """validar recursos de kubernetes"""
-        resources = self._get_resources()
-
         # buscar cluster de kubernetes
-        k8s_cluster = [
-            r
-            for r in resources
-            if r.get("type") == "null_resource"
-            and "kubernetes_cluster"
-            in r.get("values", {}).get("triggers", {}).get("resource_type", "")
-        ]
+        k8s_cluster = self._select(
+            lambda resource_type: "kubernetes_cluster" in resource_type
+        )
 
         if not k8s_cluster:
             print("no se encontro cluster de kubernetes")
             return False
 
-        cluster = k8s_cluster[0]
-        triggers = cluster.get("values", {}).get("triggers", {})
+        triggers = k8s_cluster[0].first_triggers
 
         # validar propiedades del cluster
         required_fields = ["total_nodes", "kubernetes_version", "cluster_type"]
@@ -139,86 +342,83 @@ class TerraformPlanValidator:
                 return False
 
         # validar nodos de kubernetes
-        k8s_nodes = [
-            r
-            for r in resources
-            if r.get("type") == "null_resource"
-            and r.get("values", {}).get("triggers", {}).get("resource_type", "")
+        k8s_nodes = self._count(
+            lambda resource_type: resource_type
             in ["kubernetes_master", "kubernetes_node"]
-        ]
+        )
 
-        if len(k8s_nodes) < 4:  # 1 master + 3 workers
-            print(f"se esperaban al menos 4 nodos k8s, encontrados: {len(k8s_nodes)}")
+        if k8s_nodes < 4:  # 1 master + 3 workers
+            print(f"se esperaban al menos 4 nodos k8s, encontrados: {k8s_nodes}")
             return False
 
-        print(f"validado cluster kubernetes con {len(k8s_nodes)} nodos")
+        print(f"validado cluster kubernetes con {k8s_nodes} nodos")
         return True
 
     def validate_iam_resources(self) -> bool:
         """validar recursos iam"""
-        resources = self._get_resources()
-
         # buscar recursos iam
-        iam_resources = [
-            r
-            for r in resources
-            if r.get("type") == "null_resource"
-            and r.get("values", {}).get("triggers", {}).get("resource_type", "")
+        iam_resources = self._select(
+            lambda resource_type: resource_type
             in ["iam_policy", "iam_role", "iam_user"]
-        ]
+        )
 
         if not iam_resources:
             print("no se encontraron recursos iam")
             return False
 
         # validar tipos de recursos iam
-        iam_types = set()
-        for resource in iam_resources:
-            iam_type = (
-                resource.get("values", {}).get("triggers", {}).get("resource_type", "")
-            )
-            iam_types.add(iam_type)
+        iam_types = {
+            summary.first_triggers["resource_type"] for summary in iam_resources
+        }
 
         expected_types = {"iam_policy", "iam_role"}
         if not expected_types.issubset(iam_types):
             print(f"tipos iam faltantes: {expected_types - iam_types}")
             return False
 
-        print(f"validados {len(iam_resources)} recursos iam")
+        iam_count = sum(self.type_counts[t] for t in iam_types)
+        print(f"validados {iam_count} recursos iam")
         return True
 
     def validate_compute_resources(self) -> bool:
         """validar recursos de compute adicionales"""
-        resources = self._get_resources()
-
         # buscar recursos de compute
-        compute_resources = [
-            r
-            for r in resources
-            if r.get("type") == "null_resource"
-            and r.get("values", {}).get("triggers", {}).get("resource_type", "")
-            in ["virtual_machine", "container"]
-        ]
+        compute_count = self._count(
+            lambda resource_type: resource_type in ["virtual_machine", "container"]
+        )
 
-        if not compute_resources:
+        if not compute_count:
             print("no se encontraron recursos de compute adicionales")
             return False
 
-        print(f"validados {len(compute_resources)} recursos de compute")
+        print(f"validados {compute_count} recursos de compute")
         return True
 
-    def _get_resources(self) -> List[Dict[str, Any]]:
-        """obtener lista de recursos del plan"""
-        if "planned_values" not in self.plan_data:
-            return []
-
-        root_module = self.plan_data["planned_values"].get("root_module", {})
-        return root_module.get("resources", [])
-
-    def validate_all(self) -> bool:
-        """ejecutar todas las validaciones"""
-        validations = [
-            ("conteo de recursos", lambda: self.validate_resource_count(27)),
+    def validate_all(self, manifest: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        ejecutar todas las validaciones.
+        los conteos esperados vienen del manifiesto de expectativas; sin
+        manifiesto no se validan conteos
+        """
+        validations = []
+        if manifest is not None:
+            expected_count = manifest["total_resources"]
+            validations.append(
+                (
+                    "conteo de recursos",
+                    lambda: self.validate_resource_count(expected_count),
+                )
+            )
+            if "resource_types" in manifest:
+                expected_types = manifest["resource_types"]
+                validations.append(
+                    (
+                        "conteo por tipo de recurso",
+                        lambda: self.validate_resource_types(expected_types),
+                    )
+                )
+
+        validations += [
             ("recursos vpc", self.validate_vpc_resources),
             ("recursos subnet", self.validate_subnet_resources),
             ("recursos kubernetes", self.validate_kubernetes_resources),
@@ -227,34 +427,128 @@ class TerraformPlanValidator:
         ]
 
         all_passed = True
+        self.results = []
 
         for name, validation_func in validations:
             print(f"validando {name}...")
-            try:
-                if not validation_func():
-                    print(f"fallo: {name}")
-                    all_passed = False
-                else:
-                    print(f"exito: {name}")
-            except Exception as e:
-                print(f"error en {name}: {e}")
+            if not self._run_validation(name, validation_func):
                 all_passed = False
 
         return all_passed
 
+    def _run_validation(self, name: str, validation_func) -> bool:
+        """
+        ejecutar una validacion midiendo su tiempo y los recursos que examina.
+        los mensajes que imprime se reenvian a la salida y, si falla, son sus
+        errores en los reportes
+        """
+        self.examined_types = set()
+        output = io.StringIO()
+        failure = None
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(output):
+                passed = bool(validation_func())
+            errors = [] if passed else output.getvalue().splitlines()
+        except Exception as e:
+            passed = False
+            errors = [str(e)]
+            failure = f"error en {name}: {e}"
+        seconds = time.perf_counter() - start
+
+        print(output.getvalue(), end="")
+        if failure:
+            print(failure)
+        elif passed:
+            print(f"exito: {name}")
+        else:
+            print(f"fallo: {name}")
+
+        examined = sum(self.type_counts[t] for t in self.examined_types)
+        self.results.append(RuleResult(name, errors, seconds, examined))
+        return passed
+
 
 def main():
     """funcion principal"""
-    if len(sys.argv) != 2:
-        print("uso: python validate_terraform_outputs.py <plan_file>")
+    parser = argparse.ArgumentParser(
+        usage="python validate_terraform_outputs.py [opciones] <plan_file>"
+    )
+    parser.add_argument("plan_file", help="plan binario de terraform o plan json")
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help="directorio de la cache de planes renderizados",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="leer terraform show -json directo del pipe, sin cache",
+    )
+    parser.add_argument(
+        "--summary",
+        help="infrastructure_summary.json con el manifiesto de expectativas "
+        "(por defecto, junto al plan)",
+    )
+    parser.add_argument(
+        "--allow-missing-summary",
+        action="store_true",
+        help="sin manifiesto de expectativas, omitir los conteos en vez de fallar",
+    )
+    parser.add_argument(
+        "--json-report", help="escribir un reporte json con el resultado por validacion"
+    )
+    parser.add_argument(
+        "--junit-report",
+        help="escribir un reporte junit xml con una prueba por validacion",
+    )
+    args = parser.parse_args()
+
+    summary_path = args.summary or os.path.join(
+        os.path.dirname(os.path.abspath(args.plan_file)), SUMMARY_FILE
+    )
+    manifest = None
+    if os.path.exists(summary_path):
+        manifest = load_expectation_manifest(summary_path)
+    elif args.allow_missing_summary:
+        print(f"sin manifiesto de expectativas ({summary_path}), se omiten conteos")
+    else:
+        # sin manifiesto los conteos no se validan: no se aprueba en silencio
+        print(
+            f"error: no existe el manifiesto de expectativas {summary_path}; "
+            "usar --summary o --allow-missing-summary"
+        )
         sys.exit(1)
 
-    plan_file = sys.argv[1]
-    validator = TerraformPlanValidator(plan_file)
+    cache_dir = None if args.no_cache else args.cache_dir
+    validator = TerraformPlanValidator(args.plan_file, cache_dir)
 
     print("iniciando validacion del plan de terraform...")
 
-    if validator.validate_all():
+    start = time.perf_counter()
+    passed = validator.validate_all(manifest)
+    seconds = validator.load_seconds + time.perf_counter() - start
+
+    try:
+        if args.json_report:
+            write_json_report(
+                args.json_report,
+                "terraform_outputs",
+                validator.results,
+                seconds,
+                plan=args.plan_file,
+                resources=validator.resource_count,
+                load_seconds=round(validator.load_seconds, 6),
+            )
+        if args.junit_report:
+            write_junit_report(
+                args.junit_report, "terraform_outputs", validator.results, seconds
+            )
+    except OSError as e:
+        print(f"error escribiendo reporte: {e}")
+        sys.exit(1)
+
+    if passed:
         print("todas las validaciones pasaron exitosamente")
         sys.exit(0)
     else:
@@ -0,0 +1,92 @@
+import json
+import marshal
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from iac.config_loader import LayeredConfigLoader  # noqa: E402
+from iac.file_cache import load_cached  # noqa: E402
+
+
+class CountingParser:
+    """parser json que cuenta las veces que se llama"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, content):
+        self.calls += 1
+        return json.loads(content)
+
+
+@pytest.fixture
+def source(tmp_path):
+    """archivo json y ruta de su cache"""
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"node_count": 3}))
+    return str(path), str(tmp_path / "cache" / "settings.marshal")
+
+
+class TestFileCache:
+    """pruebas de la cache binaria de archivos parseados"""
+
+    def test_unchanged_file_is_not_parsed_again(self, source):
+        """verificar que con mtime y tamano iguales se usa la cache"""
+        parse = CountingParser()
+
+        assert load_cached(*source, parse) == {"node_count": 3}
+        assert load_cached(*source, parse) == {"node_count": 3}
+        assert parse.calls == 1
+        assert marshal.loads(Path(source[1]).read_bytes())["data"] == {"node_count": 3}
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            b"\x80\x04\x95 no es marshal",
+            b"",
+            marshal.dumps([1, 2]),
+            marshal.dumps({"version": 1, "size": 16, "sha256": "x", "data": 1}),
+            marshal.dumps(
+                {
+                    "version": 1,
+                    "marshal_version": marshal.version,
+                    "mtime_ns": "1",
+                    "size": 16,
+                    "sha256": "x",
+                    "data": 1,
+                }
+            ),
+        ],
+    )
+    def test_malformed_entry_is_rebuilt(self, source, content):
+        """verificar que una entrada danada o incompleta se reconstruye"""
+        Path(source[1]).parent.mkdir()
+        Path(source[1]).write_bytes(content)
+        parse = CountingParser()
+
+        assert load_cached(*source, parse) == {"node_count": 3}
+        assert parse.calls == 1
+        assert load_cached(*source, parse) == {"node_count": 3}
+        assert parse.calls == 1
+
+    def test_other_version_is_ignored(self, source):
+        """verificar que una entrada de otra version del formato no se usa"""
+        parse = CountingParser()
+        load_cached(*source, parse, version=1)
+
+        load_cached(*source, parse, version=2)
+
+        assert parse.calls == 2
+
+    def test_config_loader_rebuilds_broken_cache(self, tmp_path):
+        """verificar que el cargador de configuracion tolera una cache rota"""
+        (tmp_path / "pruebas.json").write_text(json.dumps({"node_count": 5}))
+        loader = LayeredConfigLoader("pruebas", config_dir=str(tmp_path))
+        cache_path = Path(loader._cache_path())
+        cache_path.parent.mkdir()
+        cache_path.write_bytes(marshal.dumps({"size": 1, "data": {}}))
+
+        assert loader.load_file() == {"node_count": 5}
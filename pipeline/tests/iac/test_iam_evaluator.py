@@ -0,0 +1,215 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "policies"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from iac.iam_evaluator import IAMPolicyEvaluator, WildcardMatcher  # noqa: E402
+from security import run_rules  # noqa: E402
+
+
+def document(*statements):
+    """documento de politica iam serializado"""
+    return json.dumps({"Version": "2012-10-17", "Statement": list(statements)})
+
+
+def evaluator(*statements):
+    """evaluador con un rol que adjunta una politica con las sentencias"""
+    return (
+        IAMPolicyEvaluator()
+        .add_policy("policy", document(*statements))
+        .add_principal("role", "['policy']")
+    )
+
+
+class TestWildcardMatcher:
+    """pruebas de los comodines de action y resource"""
+
+    def test_star_wildcards(self):
+        """verificar * solo, como prefijo y en medio del patron"""
+        assert WildcardMatcher(["*"]).matches("cualquier:Cosa")
+
+        prefix = WildcardMatcher(["ec2:Describe*"])
+        assert prefix.matches("ec2:DescribeInstances")
+        assert not prefix.matches("ec2:RunInstances")
+
+        middle = WildcardMatcher(["ec2:*Instances"])
+        assert middle.matches("ec2:TerminateInstances")
+        assert not middle.matches("ec2:TerminateInstance")
+
+    def test_question_mark_matches_one_character(self):
+        """verificar que ? coincide con exactamente un caracter"""
+        matcher = WildcardMatcher(["s3:Get?bject"])
+
+        assert matcher.matches("s3:GetObject")
+        assert not matcher.matches("s3:GetObjject")
+        assert not matcher.matches("s3:Getbject")
+
+    def test_case_insensitive_and_negated(self):
+        """verificar acciones sin distinguir mayusculas y matchers negados"""
+        assert WildcardMatcher(["EC2:run*"], False).matches("ec2:RunInstances")
+        assert not WildcardMatcher(["EC2:run*"]).matches("ec2:RunInstances")
+
+        negated = WildcardMatcher(["iam:*"], negated=True)
+        assert negated.matches("ec2:RunInstances")
+        assert not negated.matches("iam:PassRole")
+
+
+class TestIAMPolicyEvaluator:
+    """pruebas de la logica de decision del evaluador"""
+
+    def test_explicit_deny_overrides_allow(self):
+        """verificar que un deny explicito prevalece sobre un allow"""
+        policies = evaluator(
+            {"Effect": "Allow", "Action": "ec2:*", "Resource": "*"},
+            {"Effect": "Deny", "Action": "ec2:Terminate*", "Resource": "*"},
+        )
+
+        assert policies.is_allowed("role", "ec2:RunInstances")
+        assert not policies.is_allowed("role", "ec2:TerminateInstances")
+        # sin allow aplicable la accion se deniega
+        assert not policies.is_allowed("role", "iam:CreateUser")
+
+    def test_not_action(self):
+        """verificar allow y deny con NotAction"""
+        policies = evaluator(
+            {"Effect": "Allow", "NotAction": "iam:*", "Resource": "*"},
+            {"Effect": "Deny", "NotAction": ["ec2:*", "s3:*"], "Resource": "*"},
+        )
+
+        assert policies.is_allowed("role", "ec2:DeleteVpc")
+        assert policies.is_allowed("role", "s3:GetObject")
+        # permitida por el allow, pero fuera de las excepciones del deny
+        assert not policies.is_allowed("role", "eks:DeleteCluster")
+        assert not policies.is_allowed("role", "iam:PassRole")
+
+    def test_resource_patterns(self):
+        """verificar que el recurso se compara con Resource y NotResource"""
+        policies = evaluator(
+            {"Effect": "Allow", "Action": "s3:*", "Resource": "arn:aws:s3:::logs-*"},
+            {"Effect": "Deny", "Action": "s3:*", "NotResource": "arn:aws:s3:::logs-?"},
+        )
+
+        assert policies.is_allowed("role", "s3:GetObject", "arn:aws:s3:::logs-a")
+        assert not policies.is_allowed("role", "s3:GetObject", "arn:aws:s3:::logs-ab")
+        assert not policies.is_allowed("role", "s3:GetObject", "arn:aws:s3:::data")
+
+    def test_find_privileged_from_triggers(self):
+        """verificar el barrido de acciones sensibles desde triggers generados"""
+        admin = document({"Effect": "Allow", "Action": "*", "Resource": "*"})
+        reader = document({"Effect": "Allow", "Action": "ec2:Describe*"})
+        triggers = [
+            {"resource_type": "iam_policy", "name": "admin", "policy_document": admin},
+            {"resource_type": "iam_policy", "name": "read", "policy_document": reader},
+            {
+                "resource_type": "iam_role",
+                "name": "ops",
+                "attached_policies": "['admin']",
+            },
+            {
+                "resource_type": "iam_user",
+                "name": "ci",
+                "attached_policies": "['read']",
+            },
+        ]
+
+        privileged = IAMPolicyEvaluator.from_triggers(triggers).find_privileged(
+            ["iam:PassRole", "ec2:DeleteVpc"]
+        )
+
+        assert privileged == {"ops": ["iam:PassRole", "ec2:DeleteVpc"]}
+
+    def test_deny_on_one_resource_without_resource(self):
+        """verificar que sin recurso un deny acotado no oculta el allow"""
+        policies = evaluator(
+            {"Effect": "Allow", "Action": "iam:*", "Resource": "*"},
+            {
+                "Effect": "Deny",
+                "Action": "iam:*",
+                "Resource": "arn:aws:iam::123456789012:role/admin",
+            },
+        )
+
+        assert policies.is_allowed("role", "iam:PassRole")
+        assert not policies.is_allowed(
+            "role", "iam:PassRole", "arn:aws:iam::123456789012:role/admin"
+        )
+        assert policies.find_privileged(["iam:PassRole"]) == {
+            "role": ["iam:PassRole"]
+        }
+
+    def test_allow_without_any_resource(self):
+        """verificar que un allow con NotResource * no permite nada"""
+        policies = evaluator({"Effect": "Allow", "Action": "*", "NotResource": "*"})
+
+        assert not policies.is_allowed("role", "iam:PassRole")
+        assert policies.find_privileged() == {}
+
+    def test_deny_on_every_resource_without_resource(self):
+        """verificar que sin recurso bloquea el deny que cubre todo recurso"""
+        policies = evaluator(
+            {"Effect": "Allow", "Action": "*", "Resource": "*"},
+            {"Effect": "Deny", "Action": "iam:*", "NotResource": []},
+        )
+
+        assert not policies.is_allowed("role", "iam:PassRole")
+        assert policies.is_allowed("role", "ec2:DeleteVpc")
+
+
+def iam_policy(name, **triggers):
+    """recurso iam_policy de un plan de terraform"""
+    return {
+        "address": f"null_resource.{name}",
+        "type": "null_resource",
+        "name": name,
+        "values": {
+            "triggers": {"resource_type": "iam_policy", "name": name, **triggers}
+        },
+    }
+
+
+class TestInvalidDocuments:
+    """pruebas de politicas sin documento o con un documento invalido"""
+
+    @pytest.mark.parametrize("policy_document", [None, "no es json", "[]"])
+    def test_invalid_document_is_skipped(self, policy_document):
+        """verificar que el evaluador omite la politica sin fallar"""
+        triggers = [
+            {"resource_type": "iam_policy", "name": "rota"},
+            {
+                "resource_type": "iam_role",
+                "name": "ops",
+                "attached_policies": "['rota']",
+            },
+        ]
+        if policy_document is not None:
+            triggers[0]["policy_document"] = policy_document
+
+        policies = IAMPolicyEvaluator.from_triggers(triggers)
+
+        assert "rota" not in policies.policies
+        assert policies.find_privileged() == {}
+        # la falta de documento la reporta la regla seguridad iam
+        invalid = [] if policy_document is None else ["rota"]
+        assert policies.invalid_policies == invalid
+
+    def test_missing_document_is_reported(self):
+        """verificar que la regla seguridad iam reporta la politica sin documento"""
+        results = dict(run_rules([iam_policy("rota", policy_type="custom")]))
+
+        assert results["seguridad iam"] == ["politica iam debe tener documento"]
+        assert results["privilegios iam"] == []
+
+    def test_invalid_document_is_reported(self):
+        """verificar que la regla privilegios iam reporta el documento invalido"""
+        results = dict(
+            run_rules([iam_policy("rota", policy_type="custom", policy_document="{")])
+        )
+
+        assert results["seguridad iam"] == []
+        assert results["privilegios iam"] == [
+            "politica iam rota tiene un documento json invalido"
+        ]
@@ -0,0 +1,147 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from iac.iam_module import (  # noqa: E402
+    IAMModule,
+    IAMPolicyFactory,
+    IAMPolicyPacker,
+    IAMRoleFactory,
+    _resource_triggers,
+)
+
+
+def exported(module, resource_type):
+    """triggers de los recursos exportados de un tipo"""
+    return [
+        triggers
+        for triggers in map(_resource_triggers, module.export_resources())
+        if triggers["resource_type"] == resource_type
+    ]
+
+
+class TestIAMInterning:
+    """pruebas del internado de politicas por contenido"""
+
+    def test_roles_with_same_trust_policy_are_kept(self):
+        """verificar que solo las politicas identicas se colapsan"""
+        module = IAMModule("pruebas")
+        tags = {"Project": "pruebas"}
+
+        first = module.intern_resource(IAMPolicyFactory.create_ec2_policy("ec2_a"))
+        second = module.intern_resource(IAMPolicyFactory.create_ec2_policy("ec2_b"))
+        module.intern_resource(
+            IAMRoleFactory.create_service_role("web_role", "ec2", [first], tags)
+        )
+        module.intern_resource(
+            IAMRoleFactory.create_service_role("batch_role", "ec2", [second], tags)
+        )
+
+        assert first == second == "ec2_a"
+        assert [policy["name"] for policy in exported(module, "iam_policy")] == [
+            "ec2_a"
+        ]
+
+        roles = exported(module, "iam_role")
+        assert [role["name"] for role in roles] == ["web_role", "batch_role"]
+        assert [role["arn"] for role in roles] == [
+            "arn:aws:iam::123456789012:role/web_role",
+            "arn:aws:iam::123456789012:role/batch_role",
+        ]
+        assert roles[0]["trust_policy"] == roles[1]["trust_policy"]
+        assert all(role["attached_policies"] == "['ec2_a']" for role in roles)
+
+
+class TestIAMPacking:
+    """pruebas del empaquetado de politicas al exportar"""
+
+    def test_policies_of_the_same_role_are_packed(self):
+        """verificar que las politicas del mismo conjunto de roles se combinan"""
+        module = IAMModule("pruebas")
+        policies = [
+            module.intern_resource(IAMPolicyFactory.create_ec2_policy(name, actions))
+            for name, actions in [
+                ("read", ["ec2:DescribeInstances"]),
+                ("write", ["ec2:StopInstances", "ec2:DescribeInstances"]),
+                ("shared", ["s3:GetObject"]),
+                ("unused", ["s3:PutObject"]),
+            ]
+        ]
+        module.intern_resource(
+            IAMRoleFactory.create_service_role("ops", "ec2", policies[:3])
+        )
+        module.intern_resource(
+            IAMRoleFactory.create_service_role("audit", "ec2", ["shared"])
+        )
+
+        exported_policies = exported(module, "iam_policy")
+        names = [policy["name"] for policy in exported_policies]
+
+        # shared la adjuntan dos roles y unused ninguno: no se combinan
+        assert names[1:] == ["shared", "unused"]
+        packed = exported_policies[0]
+        assert packed["name"].startswith("pruebas_packed_")
+        assert packed["source_policies"] == "['read', 'write']"
+        assert json.loads(packed["policy_document"])["Statement"] == [
+            {
+                "Effect": "Allow",
+                "Action": ["ec2:DescribeInstances", "ec2:StopInstances"],
+                "Resource": "*",
+            }
+        ]
+
+        roles = {role["name"]: role for role in exported(module, "iam_role")}
+        assert roles["ops"]["attached_policies"] == str([packed["name"], "shared"])
+        assert roles["audit"]["attached_policies"] == "['shared']"
+        # exportar de nuevo no vuelve a empaquetar
+        assert exported(module, "iam_policy") == exported_policies
+
+    def test_equal_packed_documents_are_shared(self):
+        """verificar que grupos con el mismo documento empaquetado lo comparten"""
+        module = IAMModule("pruebas")
+        for role, attached in [
+            ("r1", [("x", ["s3:GetObject"]), ("y", ["s3:PutObject"])]),
+            (
+                "r2",
+                [
+                    ("x2", ["s3:PutObject", "s3:GetObject"]),
+                    ("y2", ["s3:GetObject", "s3:PutObject"]),
+                ],
+            ),
+        ]:
+            policies = [
+                module.intern_resource(IAMPolicyFactory.create_ec2_policy(n, a))
+                for n, a in attached
+            ]
+            module.intern_resource(
+                IAMRoleFactory.create_service_role(role, "ec2", policies)
+            )
+
+        names = [policy["name"] for policy in exported(module, "iam_policy")]
+
+        # r1 y r2 empaquetan por separado el mismo documento
+        assert len(names) == 1
+        assert names[0].startswith("pruebas_packed_")
+        roles = exported(module, "iam_role")
+        assert [role["attached_policies"] for role in roles] == [str(names)] * 2
+
+    def test_statements_with_other_fields_are_kept(self):
+        """verificar que NotAction y Condition no se fusionan con otras"""
+        statements = [
+            {"Effect": "Allow", "Action": "ec2:Describe*", "Resource": "*"},
+            {"Effect": "Allow", "NotAction": "iam:*", "Resource": "*"},
+            {"Effect": "Allow", "Action": "ec2:Run*", "Resource": "*"},
+        ]
+
+        merged = IAMPolicyPacker().merge_statements(statements)
+
+        assert merged == [
+            statements[1],
+            {
+                "Effect": "Allow",
+                "Action": ["ec2:Describe*", "ec2:Run*"],
+                "Resource": "*",
+            },
+        ]
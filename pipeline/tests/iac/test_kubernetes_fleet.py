@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from iac.kubernetes_fleet import KubernetesFleet  # noqa: E402
+from iac.network_composite import NetworkModuleBuilder  # noqa: E402
+
+
+def network():
+    """red privada minima compartida por la flota"""
+    return (
+        NetworkModuleBuilder("pruebas")
+        .with_private_network(vpc_name="pruebas-vpc", subnet_count=2)
+        .build()
+    )
+
+
+def cluster_spec(cluster_name, namespaces=("default", "staging")):
+    """cluster con la misma aplicacion en cada namespace"""
+    return {
+        "cluster_name": cluster_name,
+        "compute_config": {"node_count": 2},
+        "namespaces": [{"name": namespace} for namespace in namespaces],
+        "applications": [
+            {"app_name": "web", "namespace": namespace, "replicas": 1}
+            for namespace in namespaces
+        ],
+    }
+
+
+def resource_names(terraform_config):
+    """nombres de todos los null_resource exportados, con repetidos"""
+    return [
+        name
+        for block in terraform_config["resource"]
+        for null_resource in block["null_resource"]
+        for name in null_resource
+    ]
+
+
+class TestKubernetesFleet:
+    """pruebas de la combinacion de recursos de la flota"""
+
+    def test_fleet_exports_unique_names(self):
+        """verificar que varios clusters con los mismos namespaces no colisionan"""
+        fleet = KubernetesFleet("pruebas", max_workers=2)
+        fleet.inject_network_dependency(network())
+        fleet.add_clusters([cluster_spec(f"cluster-{i}") for i in range(3)])
+
+        names = resource_names(fleet.export().export())
+
+        assert len(names) == len(set(names))
+        for i in range(3):
+            assert f"k8s_namespace_cluster-{i}_default" in names
+            assert f"k8s_deployment_cluster-{i}_staging_web" in names
+            assert f"k8s_service_cluster-{i}_default_web" in names
+
+    def test_duplicate_name_fails(self):
+        """verificar que un nombre repetido entre clusters es un error"""
+        fleet = KubernetesFleet("pruebas", max_workers=1)
+        fleet.inject_network_dependency(network())
+        # ambos exportan k8s_namespace_a_b_c
+        fleet.add_cluster(cluster_spec("a_b", namespaces=["c"]))
+        fleet.add_cluster(cluster_spec("a", namespaces=["b_c"]))
+
+        with pytest.raises(ValueError, match="k8s_namespace_a_b_c"):
+            fleet.export()
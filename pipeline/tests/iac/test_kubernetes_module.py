@@ -0,0 +1,56 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from iac.kubernetes_module import KubernetesModule  # noqa: E402
+from iac.network_composite import NetworkModuleBuilder  # noqa: E402
+
+
+def network():
+    """red privada minima para inyectar en los modulos"""
+    return (
+        NetworkModuleBuilder("pruebas")
+        .with_private_network(vpc_name="pruebas-vpc", subnet_count=2)
+        .build()
+    )
+
+
+def resource_names(resources):
+    """nombres de los null_resource de una lista de recursos exportados"""
+    return [
+        name
+        for resource in resources
+        for block in resource["resource"]
+        for null_resource in block["null_resource"]
+        for name in null_resource
+    ]
+
+
+class TestKubernetesModule:
+    """pruebas del modulo kubernetes indexado por namespace"""
+
+    def test_same_app_in_two_namespaces(self):
+        """verificar que una aplicacion repetida en otro namespace no se pisa"""
+        module = KubernetesModule("pruebas")
+        module.inject_network_dependency(network())
+        module.create_cluster("pruebas-cluster")
+        module.add_namespace("staging")
+        module.add_namespace("production")
+        module.add_application("web", "staging", replicas=1)
+        module.add_application("web", "production", replicas=3)
+
+        resources = module.export_all_resources()["application_resources"]
+        names = resource_names(resources)
+
+        assert len(names) == len(set(names)) == 4
+        replicas = {
+            triggers["namespace_dependency"]: triggers["replicas"]
+            for resource in resources
+            for block in resource["resource"]
+            for null_resource in block["null_resource"]
+            for instances in null_resource.values()
+            for triggers in [instances[0]["triggers"]]
+            if triggers["resource_type"] == "kubernetes_deployment"
+        }
+        assert replicas == {"staging": "1", "production": "3"}
@@ -0,0 +1,132 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from generate_infrastructure import InfrastructureBuilder  # noqa: E402
+from iac.replica_sizing import ReplicaSizer  # noqa: E402
+
+SAMPLES = [
+    {"rps": 100, "p99_latency_ms": 10},
+    {"rps": 200, "p99_latency_ms": 30},
+    {"rps": 300, "p99_latency_ms": 90},
+]
+
+
+def sizer(**kwargs):
+    """dimensionador con las muestras de nginx-demo, desordenadas"""
+    return ReplicaSizer({"nginx-demo": SAMPLES[::-1]}, **kwargs)
+
+
+class TestReplicaSizer:
+    """pruebas del calculo de replicas desde el throughput por replica"""
+
+    @pytest.mark.parametrize(
+        "latency_slo_ms, rps", [(10, 100), (20, 150), (30, 200), (60, 250)]
+    )
+    def test_interpolates_between_samples(self, latency_slo_ms, rps):
+        """verificar la interpolacion lineal entre muestras medidas"""
+        assert sizer().per_replica_throughput("nginx-demo", latency_slo_ms) == rps
+
+    def test_capped_at_largest_measured_rps(self):
+        """verificar que no se extrapola mas alla de la mayor carga medida"""
+        assert sizer().per_replica_throughput("nginx-demo", 1000) == 300
+
+    def test_unreachable_slo(self):
+        """verificar el error cuando ni la carga minima cumple el slo"""
+        with pytest.raises(ValueError, match="no cumple un SLO de 5ms"):
+            sizer().per_replica_throughput("nginx-demo", 5)
+        with pytest.raises(ValueError, match="No hay resultados"):
+            sizer().size(["otro", "otro:1.0"], 100, 30)
+
+    def test_size_bounds(self):
+        """verificar margen, minimo, maximo y utilizacion objetivo"""
+        sized = sizer(headroom=0.5, burst_factor=1.5).size(
+            ["nginx", "nginx-demo"], 500, 30
+        )
+
+        assert sized == {
+            "benchmark": "nginx-demo",
+            "benchmark_source": "measured",
+            "per_replica_rps": 200,
+            # ceil(500 / 200) sin margen y ceil(500 * 1.5 / 200) con margen
+            "min_replicas": 3,
+            "replicas": 4,
+            "max_replicas": 6,
+            # 100 / 1.5: se escala antes de consumir el margen
+            "target_utilization": 67,
+        }
+
+    def test_low_traffic_keeps_one_replica(self):
+        """verificar al menos una replica y sin margen el minimo igual al deseado"""
+        sized = sizer(headroom=0).size(["nginx-demo"], 10, 30)
+
+        assert (sized["min_replicas"], sized["replicas"]) == (1, 1)
+        assert sized["max_replicas"] == 2
+        assert sized["target_utilization"] == 100
+
+    def test_invalid_headroom(self):
+        """verificar que se rechazan margen negativo y rafaga menor a 1"""
+        with pytest.raises(ValueError, match="headroom"):
+            sizer(headroom=-0.1)
+        with pytest.raises(ValueError, match="burst_factor"):
+            sizer(burst_factor=0.5)
+
+    def test_from_file_layouts(self, tmp_path):
+        """verificar el archivo con source y services y el mapa de servicios"""
+        labeled = ReplicaSizer.from_file(
+            write_benchmarks(tmp_path / "labeled.json", "example")
+        )
+        plain_path = tmp_path / "plain.json"
+        plain_path.write_text(json.dumps({"nginx-demo": SAMPLES}))
+        plain = ReplicaSizer.from_file(str(plain_path))
+
+        assert labeled.source == "example"
+        assert plain.source == "measured"
+        assert labeled.benchmarks == plain.benchmarks == {"nginx-demo": SAMPLES}
+        # el origen indicado al crear el dimensionador tiene prioridad
+        assert ReplicaSizer.from_file(str(plain_path), source="example").source == (
+            "example"
+        )
+
+
+def write_benchmarks(path, source):
+    """escribir resultados de benchmark de nginx-demo con su origen"""
+    path.write_text(json.dumps({"source": source, "services": {"nginx-demo": SAMPLES}}))
+    return str(path)
+
+
+def nginx(tmp_path, monkeypatch, source):
+    """aplicacion nginx-demo de un build con los benchmarks indicados"""
+    monkeypatch.setenv(
+        "IAC_REPLICA_TARGETS",
+        json.dumps({"nginx-demo": {"target_rps": 400, "latency_slo_ms": 30}}),
+    )
+    builder = InfrastructureBuilder()
+    builder.kubernetes_config["benchmarks_path"] = write_benchmarks(
+        tmp_path / "throughput.json", source
+    )
+    builder.build_network_infrastructure().build_kubernetes_cluster()
+    return builder.k8s_module.get_application("default", "nginx-demo")
+
+
+class TestBuilderSizing:
+    """pruebas del dimensionamiento de replicas en el build"""
+
+    def test_example_benchmarks_keep_fixed_replicas(self, tmp_path, monkeypatch):
+        """verificar que los datos de ejemplo no dimensionan replicas"""
+        application = nginx(tmp_path, monkeypatch, "example")
+
+        assert application.replicas == 2
+        assert application.autoscaling == {}
+
+    def test_measured_benchmarks_size_replicas(self, tmp_path, monkeypatch):
+        """verificar que los benchmarks medidos usan el trafico configurado"""
+        application = nginx(tmp_path, monkeypatch, "measured")
+
+        # 200 rps por replica con 30% de margen: ceil(400 * 1.3 / 200)
+        assert application.replicas == 3
+        assert application.autoscaling["benchmark_source"] == "measured"
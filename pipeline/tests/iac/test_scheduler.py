@@ -0,0 +1,114 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from iac.kubernetes_module import KubernetesModule  # noqa: E402
+from iac.network_composite import NetworkModuleBuilder  # noqa: E402
+from iac.scheduler import ReplicaScheduler, minimum_nodes  # noqa: E402
+
+
+def workload(name, replicas, cpu, memory=512):
+    """carga con solicitudes por replica en milicores y MiB"""
+    return {"name": name, "replicas": replicas, "cpu": cpu, "memory": memory}
+
+
+def module_with_app(node_count, replicas, cpu_request):
+    """modulo kubernetes con una aplicacion en el namespace default"""
+    network = (
+        NetworkModuleBuilder("pruebas")
+        .with_private_network(vpc_name="pruebas-vpc", subnet_count=2)
+        .build()
+    )
+    module = KubernetesModule("pruebas")
+    module.inject_network_dependency(network)
+    module.create_cluster("pruebas-cluster", {"node_count": node_count})
+    module.add_namespace("default")
+    module.add_application("api", "default", replicas=replicas, cpu_request=cpu_request)
+    return module
+
+
+def worker_nodes(module):
+    """nombres de los nodos worker exportados por el cluster"""
+    return [
+        triggers["name"]
+        for resource in module.cluster.cluster_resources
+        for block in resource["resource"]
+        for null_resource in block["null_resource"]
+        for instances in null_resource.values()
+        for triggers in [instances[0]["triggers"]]
+        if triggers.get("node_type") == "worker"
+    ]
+
+
+class TestReplicaScheduler:
+    """pruebas del empaquetado first-fit-decreasing"""
+
+    def test_largest_replicas_are_placed_first(self):
+        """verificar que las replicas grandes se ubican antes que las chicas"""
+        # en el orden de entrada las chicas llenarian el primer nodo y se
+        # necesitarian 3 nodos; ordenadas por recurso dominante bastan 2
+        workloads = [workload("small", 2, 800), workload("big", 2, 1200)]
+
+        report = ReplicaScheduler("t3.medium").schedule(workloads, ["w1", "w2"])
+
+        assert report["nodes_required"] == 2
+        assert report["fits"]
+        assert report["placements"] == {
+            "small": {"w1": 1, "w2": 1},
+            "big": {"w1": 1, "w2": 1},
+        }
+        assert [usage["cpu_used"] for usage in report["node_usage"]] == [2000, 2000]
+
+    def test_extra_nodes_get_default_names(self):
+        """verificar que los nodos que faltan se nombran worker-N"""
+        report = ReplicaScheduler("t3.medium").schedule(
+            [workload("api", 3, 1000)], ["w1"]
+        )
+
+        assert not report["fits"]
+        assert report["placements"]["api"] == {"w1": 2, "worker-2": 1}
+
+    def test_replica_larger_than_node_fails(self):
+        """verificar que una replica que no cabe en un nodo es un error"""
+        with pytest.raises(ValueError, match="no cabe"):
+            ReplicaScheduler("t3.micro").schedule([workload("db", 1, 500, 2048)])
+
+    def test_minimum_nodes(self):
+        """verificar el minimo de nodos para un conjunto de cargas"""
+        workloads = [workload("a", 5, 1000), workload("b", 0, 2000)]
+
+        assert minimum_nodes(workloads, "t3.medium") == 3
+        assert minimum_nodes(workloads, "t3.xlarge") == 2
+        assert minimum_nodes([], "t3.medium") == 0
+
+
+class TestScheduleApplications:
+    """pruebas de la planificacion de aplicaciones en el modulo kubernetes"""
+
+    def test_resize_grows_the_cluster(self):
+        """verificar que resize_cluster regenera los workers que faltan"""
+        module = module_with_app(node_count=1, replicas=6, cpu_request=1000)
+
+        report = module.schedule_applications(resize_cluster=True)
+
+        assert report["fits"]
+        assert module.cluster.compute_config["node_count"] == 3
+        assert worker_nodes(module) == [
+            f"pruebas-cluster-worker-{i}" for i in (1, 2, 3)
+        ]
+        assert module.get_application("default", "api").placement == {
+            f"pruebas-cluster-worker-{i}": 2 for i in (1, 2, 3)
+        }
+
+    def test_without_resize_the_cluster_is_kept(self):
+        """verificar que sin resize_cluster solo se reporta el faltante"""
+        module = module_with_app(node_count=1, replicas=6, cpu_request=1000)
+
+        report = module.schedule_applications()
+
+        assert not report["fits"]
+        assert report["nodes_required"] == 3
+        assert len(worker_nodes(module)) == 1
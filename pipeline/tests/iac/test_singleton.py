@@ -0,0 +1,235 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from generate_infrastructure import InfrastructureBuilder  # noqa: E402
+from iac.config_loader import LayeredConfigLoader  # noqa: E402
+from iac.singleton import (  # noqa: E402
+    ConfigSingleton,
+    ConfigSnapshot,
+    get_active_environment,
+    use_environment,
+)
+
+
+def environment():
+    """nombre de entorno unico para no compartir instancias entre pruebas"""
+    return f"pruebas-{uuid.uuid4().hex[:8]}"
+
+
+def run_threads(count, target):
+    """ejecuta target en varios hilos que arrancan a la vez"""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(index):
+        barrier.wait()
+        results[index] = target()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSingletonMeta:
+    """pruebas de la creacion de instancias unicas"""
+
+    def test_concurrent_first_access_creates_one_instance(self):
+        """verificar que hilos simultaneos obtienen la misma instancia"""
+        calls = []
+
+        class SlowConfig(ConfigSingleton):
+            def __init__(self, env_name=None):
+                calls.append(env_name)
+                # ensancha la ventana entre la verificacion y la creacion
+                time.sleep(0.01)
+                super().__init__(env_name)
+
+        env_name = environment()
+        instances = run_threads(16, lambda: SlowConfig(env_name=env_name))
+
+        assert len(calls) == 1
+        assert all(instance is instances[0] for instance in instances)
+
+    def test_one_instance_per_environment(self):
+        """verificar que instance_key separa las instancias por entorno"""
+        first, second = environment(), environment()
+
+        assert ConfigSingleton(first) is ConfigSingleton(env_name=first)
+        assert ConfigSingleton(first) is not ConfigSingleton(second)
+        assert ConfigSingleton(second).env_name == second
+
+
+class TestActiveEnvironment:
+    """pruebas del entorno activo por hilo y por tarea"""
+
+    def test_threads_do_not_share_the_environment(self):
+        """verificar que use_environment no se filtra a otros hilos"""
+        names = [environment() for _ in range(4)]
+        ready = threading.Barrier(len(names))
+        seen = {}
+
+        def worker(env_name):
+            with use_environment(env_name):
+                # todos los hilos activan su entorno antes de leerlo
+                ready.wait()
+                seen[env_name] = ConfigSingleton.current().env_name
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in names]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert seen == {env_name: env_name for env_name in names}
+        assert get_active_environment() != names[0]
+
+    def test_tasks_do_not_share_the_environment(self):
+        """verificar que cada tarea asyncio conserva su propio entorno"""
+        names = [environment() for _ in range(3)]
+
+        async def task(env_name):
+            with use_environment(env_name):
+                await asyncio.sleep(0)
+                before = ConfigSingleton.current()
+                await asyncio.sleep(0.01)
+                return before.env_name, ConfigSingleton.current().env_name
+
+        async def main():
+            return await asyncio.gather(*(task(env_name) for env_name in names))
+
+        assert asyncio.run(main()) == [(n, n) for n in names]
+
+
+class TestConfigSnapshot:
+    """pruebas de las lecturas con copy-on-write"""
+
+    def test_snapshot_is_immutable(self):
+        """verificar que un snapshot no cambia con escrituras posteriores"""
+        config = ConfigSingleton(environment())
+        config.update({"region": "us-east-1"})
+        snapshot = config.snapshot()
+
+        config.set("region", "eu-west-1")
+
+        assert isinstance(snapshot, ConfigSnapshot)
+        assert snapshot.get("region") == "us-east-1"
+        assert config.get("region") == "eu-west-1"
+        assert config.snapshot().version == snapshot.version + 1
+
+    def test_readers_see_consistent_snapshots(self):
+        """verificar que un lector nunca ve una escritura a medias"""
+        config = ConfigSingleton(environment())
+        config.update({"first": 0, "second": 0})
+        done = threading.Event()
+        torn = []
+
+        def writer():
+            for value in range(1, 2000):
+                config.update({"first": value, "second": value})
+            done.set()
+            return []
+
+        def reader():
+            versions = []
+            while not done.is_set():
+                snapshot = config.snapshot()
+                if snapshot.get("first") != snapshot.get("second"):
+                    torn.append(dict(snapshot.settings))
+                versions.append(snapshot.version)
+            return versions
+
+        roles = iter([writer, reader, reader, reader, reader])
+        lock = threading.Lock()
+
+        def next_role():
+            with lock:
+                role = next(roles)
+            return role()
+
+        results = run_threads(5, next_role)
+
+        assert torn == []
+        # cada lector ve versiones que solo avanzan
+        assert all(versions == sorted(versions) for versions in results)
+        assert config.get("first") == config.get("second") == 1999
+
+
+class TestBuilderSettings:
+    """pruebas de los valores propios de cada build"""
+
+    def test_project_name_does_not_leak_between_builds(self):
+        """verificar que el nombre de un build no queda en la configuracion"""
+        named = InfrastructureBuilder("otro-proyecto")
+        default = InfrastructureBuilder()
+
+        assert named.settings.get("proyecto") == "otro-proyecto"
+        assert default.settings.get("proyecto") == "red-privada-k8s"
+        assert default.config.get("proyecto") == "red-privada-k8s"
+
+
+def write_config(path, content, step):
+    """escribir el archivo del entorno con un mtime distinto en cada paso"""
+    path.write_text(content)
+    mtime_ns = 1_700_000_000_000_000_000 + step * 1_000_000_000
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def wait_for(condition, timeout=5.0):
+    """esperar a que se cumpla la condicion o se agote el tiempo"""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestConfigReload:
+    """pruebas de la recarga del archivo del entorno"""
+
+    def loaded_config(self, tmp_path):
+        """configuracion cargada desde un archivo del directorio temporal"""
+        env_name = environment()
+        path = tmp_path / f"{env_name}.json"
+        write_config(path, json.dumps({"a": 1}), 0)
+        config = ConfigSingleton(env_name)
+        config.load(LayeredConfigLoader(env_name, config_dir=str(tmp_path)))
+        return config, path
+
+    def test_reload_only_when_file_changes(self, tmp_path):
+        """verificar que reload publica un snapshot solo si el archivo cambio"""
+        config, path = self.loaded_config(tmp_path)
+
+        assert config.reload() is None
+        write_config(path, json.dumps({"a": 2}), 1)
+
+        assert config.reload().get("a") == 2
+        assert config.reload() is None
+
+    def test_watcher_survives_invalid_file(self, tmp_path, caplog):
+        """verificar que un archivo a medio guardar no detiene el watcher"""
+        config, path = self.loaded_config(tmp_path)
+
+        with caplog.at_level(logging.ERROR, logger="iac.config_loader"):
+            watcher = config.watch(interval=0.01)
+            try:
+                write_config(path, '{"a": ', 1)
+                assert wait_for(lambda: "recargando" in caplog.text)
+                # se conserva la ultima configuracion valida
+                assert config.get("a") == 1
+
+                write_config(path, json.dumps({"a": 3}), 2)
+                assert wait_for(lambda: config.get("a") == 3)
+                assert watcher._thread.is_alive()
+            finally:
+                watcher.stop()
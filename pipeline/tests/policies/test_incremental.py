@@ -0,0 +1,152 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "policies"))
+
+from plan_digest import empty_digest  # noqa: E402
+from security import (  # noqa: E402
+    RULE_SOURCES,
+    PolicyRule,
+    run_rules,
+    run_rules_incremental,
+    validate_incremental,
+)
+
+
+def node(name, cluster, version="1.28"):
+    """recurso de nodo de kubernetes"""
+    return {
+        "address": f"null_resource.{name}",
+        "type": "null_resource",
+        "name": name,
+        "values": {
+            "triggers": {
+                "resource_type": "kubernetes_node",
+                "cluster": cluster,
+                "kubernetes_version": version,
+            }
+        },
+    }
+
+
+def with_text(resources):
+    """entregar los recursos como los entrega PlanResourceStream.with_text"""
+    return [(resource, json.dumps(resource)) for resource in resources]
+
+
+class CountingRules:
+    """reglas de prueba que registran con que recursos se evaluaron"""
+
+    def __init__(self):
+        self.checked = []
+        self.groups = []
+        self.rules = [
+            PolicyRule("version", self.check_version),
+            PolicyRule(
+                "nodos por cluster",
+                self.check_cluster,
+                aggregate=True,
+                group_by=lambda triggers: triggers["cluster"],
+            ),
+        ]
+
+    def check_version(self, resource, triggers):
+        self.checked.append(resource["name"])
+        if triggers["kubernetes_version"] < "1.25":
+            return [f"{resource['name']} con version antigua"]
+        return []
+
+    def check_cluster(self, entries):
+        cluster = entries[0][1]["cluster"]
+        self.groups.append(cluster)
+        if len(entries) < 2:
+            return [f"cluster {cluster} con menos de 2 nodos"]
+        return []
+
+
+class TestIncrementalValidation:
+    """pruebas de la validacion incremental con digest"""
+
+    def test_only_changes_are_evaluated(self):
+        """verificar que solo se evaluan los recursos y grupos que cambiaron"""
+        before = [
+            node("a1", "a", "1.20"),
+            node("a2", "a"),
+            node("b1", "b"),
+            node("b2", "b"),
+        ]
+        counting = CountingRules()
+        _, digest, changed, _ = run_rules_incremental(
+            with_text(before), empty_digest("huella"), counting.rules
+        )
+        assert changed == 4
+
+        # b2 se elimina y aparece c1 en un cluster nuevo
+        after = [node("a1", "a", "1.20"), node("a2", "a"), node("b1", "b")]
+        after.append(node("c1", "c", "1.24"))
+        counting = CountingRules()
+        results, _, changed, removed = run_rules_incremental(
+            with_text(after), digest, counting.rules
+        )
+
+        assert (changed, removed) == (1, 1)
+        assert counting.checked == ["c1"]
+        assert counting.groups == ["b", "c"]
+        # el resultado es el mismo que validando el plan completo
+        assert results == list(run_rules(after, CountingRules().rules))
+
+
+def write_plan(path, resources):
+    """escribir un plan json con los recursos en root_module"""
+    path.write_text(
+        json.dumps({"planned_values": {"root_module": {"resources": resources}}})
+    )
+    return str(path)
+
+
+class TestPreviousValidation:
+    """pruebas de la validacion anterior que se reutiliza"""
+
+    def test_previous_plan_validates_everything(self, tmp_path, capsys):
+        """verificar que un plan anterior no da por validos sus recursos"""
+        resources = [node("a1", "a", "1.20"), node("a2", "a")]
+        plan_path = write_plan(tmp_path / "plan.json", resources)
+        counting = CountingRules()
+
+        results = validate_incremental(plan_path, plan_path, rules=counting.rules)
+
+        assert "se valida el plan completo" in capsys.readouterr().out
+        assert counting.checked == ["a1", "a2"]
+        assert results == list(run_rules(resources, CountingRules().rules))
+
+    def test_previous_digest_keeps_errors(self, tmp_path):
+        """verificar que un digest conserva los errores de lo que no cambio"""
+        resources = [node("a1", "a", "1.20"), node("b1", "b")]
+        plan_path = write_plan(tmp_path / "plan.json", resources)
+        digest_path = str(tmp_path / "digest.json")
+        validate_incremental(plan_path, None, digest_path, CountingRules().rules)
+
+        counting = CountingRules()
+        results = validate_incremental(plan_path, digest_path, rules=counting.rules)
+
+        assert counting.checked == []
+        assert results == [
+            ("version", ["a1 con version antigua"]),
+            (
+                "nodos por cluster",
+                ["cluster a con menos de 2 nodos", "cluster b con menos de 2 nodos"],
+            ),
+        ]
+
+    def test_fingerprint_covers_rule_modules(self):
+        """verificar que la huella cambia con los modulos que evaluan reglas"""
+        names = {path.name for path in RULE_SOURCES}
+
+        assert {
+            "rules.json",
+            "security.py",
+            "rule_compiler.py",
+            "trigger_fields.py",
+            "iam_evaluator.py",
+        } <= names
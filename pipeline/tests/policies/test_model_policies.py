@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "policies"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from generate_infrastructure import InfrastructureBuilder  # noqa: E402
+from security import run_rules  # noqa: E402
+
+
+def build(output_path=None):
+    """construir la infraestructura por defecto y exportarla"""
+    return (
+        InfrastructureBuilder()
+        .build_network_infrastructure()
+        .build_kubernetes_cluster()
+        .build_additional_compute_resources()
+        .finalize_and_export(output_path)
+    )
+
+
+def plan_resources(terraform_config):
+    """convertir main.tf.json a los recursos que entrega terraform show -json"""
+    for block in terraform_config["resource"]:
+        for null_resource in block["null_resource"]:
+            for name, instances in null_resource.items():
+                yield {
+                    "address": f"null_resource.{name}",
+                    "type": "null_resource",
+                    "name": name,
+                    "values": {"triggers": instances[0]["triggers"]},
+                }
+
+
+class TestModelPolicies:
+    """pruebas de las politicas ejecutadas sobre el modelo en memoria"""
+
+    def test_model_matches_plan_validation(self):
+        """verificar que el modelo y el plan producen las mismas violaciones"""
+        result = build()
+
+        plan_results = run_rules(plan_resources(result["terraform_config"]))
+        expected = {name: errors for name, errors in plan_results if errors}
+
+        assert result["infrastructure_summary"]["policy_violations"] == expected
+
+    def test_violations_block_export(self, tmp_path, monkeypatch):
+        """verificar que con policy_block_export no se escriben archivos"""
+        monkeypatch.setenv("IAC_POLICY_BLOCK_EXPORT", "true")
+        output_path = tmp_path / "salida"
+
+        with pytest.raises(ValueError, match="Exportación bloqueada"):
+            build(str(output_path))
+
+        assert not output_path.exists()
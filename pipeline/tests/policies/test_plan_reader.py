@@ -0,0 +1,184 @@
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "policies"))
+
+from plan_reader import (  # noqa: E402
+    PlanResourceStream,
+    PlanShard,
+    module_address,
+    plan_shards,
+)
+
+
+def build_plan(resources):
+    """construir un plan con secciones que el lector debe saltar"""
+    return {
+        "format_version": "1.2",
+        "variables": {"region": {"value": "us-east-1"}},
+        "planned_values": {
+            "outputs": {"vpc": {"sensitive": False, "value": '{"id": "vpc-1"}'}},
+            "root_module": {"resources": resources},
+        },
+        "resource_changes": [{"change": {"after": {"escape": 'a"b\\c ]}'}}}],
+    }
+
+
+class TestPlanResourceStream:
+    """pruebas del lector incremental de planes"""
+
+    def test_streams_resources_in_order(self):
+        """verificar que los recursos se entregan completos y en orden"""
+        resources = [
+            {
+                "type": "null_resource",
+                "name": f"node_{i}",
+                "values": {"triggers": {"resource_type": "kubernetes_node"}},
+            }
+            for i in range(50)
+        ]
+        plan = json.dumps(build_plan(resources), indent=2)
+
+        # bloques pequenos para cortar valores y strings entre lecturas
+        for chunk_size in (1, 7, 64):
+            stream = PlanResourceStream(io.StringIO(plan), chunk_size)
+            assert list(stream) == resources
+            assert stream.has_planned_values
+
+    def test_streams_child_modules(self):
+        """verificar que se recorren los child_modules a cualquier profundidad"""
+
+        def resources(module, count):
+            prefix = f"{module}." if module else ""
+            return [
+                {
+                    "address": f"{prefix}null_resource.r{i}",
+                    "type": "null_resource",
+                    "name": f"r{i}",
+                }
+                for i in range(count)
+            ]
+
+        # en terraform address va despues de resources en cada modulo
+        root = {
+            "resources": resources("", 2),
+            "child_modules": [
+                {
+                    "resources": resources("module.red", 1),
+                    "address": "module.red",
+                    "child_modules": [
+                        {
+                            "resources": resources("module.red.module.sub", 2),
+                            "address": "module.red.module.sub",
+                        }
+                    ],
+                },
+                {"address": "module.k8s", "resources": resources("module.k8s", 1)},
+            ],
+        }
+        plan = build_plan([])
+        plan["planned_values"]["root_module"] = root
+
+        stream = PlanResourceStream(io.StringIO(json.dumps(plan)), 16)
+        modules = [module for module, _ in stream.with_modules()]
+
+        assert modules == [
+            "",
+            "",
+            "module.red",
+            "module.red.module.sub",
+            "module.red.module.sub",
+            "module.k8s",
+        ]
+
+    def test_module_address_from_resource_address(self):
+        """verificar la direccion de modulo con indices y data sources"""
+        resource = {
+            "address": 'module.app["web"].module.db.data.aws_ami.base[0]',
+            "mode": "data",
+            "type": "aws_ami",
+            "name": "base",
+        }
+
+        assert module_address(resource) == 'module.app["web"].module.db'
+        assert module_address({"address": "null_resource.x"}) == ""
+
+    def test_plan_without_planned_values(self):
+        """verificar plan sin planned_values"""
+        stream = PlanResourceStream(io.StringIO('{"format_version": "1.2"}'))
+
+        assert list(stream) == []
+        assert not stream.has_planned_values
+
+    def test_truncated_plan_raises(self):
+        """verificar que un plan cortado produce error de json"""
+        plan = json.dumps(build_plan([{"type": "null_resource"}]))
+        truncated = plan[: plan.index("null_resource")]
+
+        with pytest.raises(json.JSONDecodeError):
+            list(PlanResourceStream(io.StringIO(truncated), 16))
+
+
+class TestPlanShards:
+    """pruebas de la division del plan en rangos de bytes"""
+
+    def test_shards_cover_all_resources(self, tmp_path):
+        """verificar que los rangos entregan todos los recursos en orden"""
+        resources = [
+            {"type": "null_resource", "name": f"nodo_{i}", "values": {"triggers": {}}}
+            for i in range(40)
+        ]
+        plan_path = tmp_path / "plan.json"
+        plan_path.write_text(json.dumps(build_plan(resources)))
+        data = plan_path.read_bytes()
+
+        shards = plan_shards(str(plan_path), 6)
+        streamed = []
+        for start, stop in shards:
+            shard = PlanShard(data, start, stop)
+            streamed.extend(shard)
+            assert shard.verified
+            if shard.array_end:
+                break
+
+        assert len(shards) > 1
+        assert streamed == resources
+
+    def test_child_modules_after_shards(self, tmp_path):
+        """verificar que tras el ultimo rango se leen los child_modules"""
+        resources = [
+            {"type": "null_resource", "name": f"nodo_{i}", "values": {"triggers": {}}}
+            for i in range(20)
+        ]
+        plan = build_plan(resources[:15])
+        plan["planned_values"]["root_module"]["child_modules"] = [
+            {"resources": resources[15:], "address": "module.k8s"}
+        ]
+        plan_path = tmp_path / "plan.json"
+        plan_path.write_text(json.dumps(plan))
+        data = plan_path.read_bytes()
+
+        streamed = []
+        for start, stop in plan_shards(str(plan_path), 4):
+            shard = PlanShard(data, start, stop)
+            streamed.extend(shard)
+            if shard.array_end:
+                break
+
+        with open(plan_path, encoding="utf-8") as plan_file:
+            plan_file.seek(shard.array_end_offset)
+            streamed.extend(PlanResourceStream(plan_file).resume_root_module())
+
+        assert streamed == resources
+
+    def test_nested_cut_is_rejected(self):
+        """verificar que un corte dentro de un recurso no se acepta"""
+        data = b'{"a": [{"b": 1}, {"c": 2}]}, {"d": 3}]'
+
+        # el rango termina dentro del primer recurso
+        with pytest.raises(json.JSONDecodeError):
+            list(PlanShard(data, 0, data.index(b'{"c"')))
@@ -0,0 +1,88 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "policies"))
+
+from rule_compiler import (  # noqa: E402
+    RuleSpecError,
+    compile_rule,
+    load_rule_specs,
+    normalize_rules,
+)
+
+
+def compile_checks(*checks):
+    """compilar una regla de prueba con los chequeos dados"""
+    (rule,) = normalize_rules({"rules": [{"name": "prueba", "checks": list(checks)}]})
+    return compile_rule(rule)
+
+
+class TestRuleCompiler:
+    """pruebas del compilador de reglas declarativas"""
+
+    def test_semver_comparison_is_numeric(self):
+        """verificar que 1.9 es menor que 1.25 como version"""
+        rule = compile_checks(
+            {
+                "field": "kubernetes_version",
+                "op": ">=",
+                "type": "semver",
+                "value": "1.25",
+                "when_present": True,
+                "message": "version {value} no soportada",
+            }
+        )
+
+        assert rule({}, {"kubernetes_version": "1.9"}) == ["version 1.9 no soportada"]
+        assert rule({}, {"kubernetes_version": "1.28.3"}) == []
+        assert rule({}, {}) == []
+
+    def test_cidr_containment(self):
+        """verificar que el cidr debe estar contenido en la red privada"""
+        rule = compile_checks(
+            {
+                "field": "cidr_block",
+                "op": "within",
+                "type": "cidr",
+                "value": "10.0.0.0/8",
+                "message": "cidr invalido",
+            }
+        )
+
+        assert rule({}, {"cidr_block": "10.0.1.0/24"}) == []
+        assert rule({}, {"cidr_block": "100.64.0.0/16"}) == ["cidr invalido"]
+        assert rule({}, {"cidr_block": "no-es-cidr"}) == ["cidr invalido"]
+
+    def test_missing_items_in_message(self):
+        """verificar que el mensaje incluye los elementos faltantes"""
+        rule = compile_checks(
+            {
+                "field": "tags",
+                "op": "contains_all",
+                "value": ["Project", "ManagedBy"],
+                "message": "recurso {resource_name} sin tags: {missing}",
+            }
+        )
+
+        errors = rule({"name": "vpc"}, {"tags": {"Project": "demo"}})
+        assert errors == ["recurso vpc sin tags: ['ManagedBy']"]
+
+    def test_unknown_operator(self):
+        """verificar que un operador desconocido se rechaza al compilar"""
+        with pytest.raises(RuleSpecError):
+            compile_checks({"field": "x", "op": "~=", "message": "x"})
+
+    def test_cached_specs_reused(self, tmp_path):
+        """verificar que las reglas normalizadas se reutilizan desde cache"""
+        rules_path = tmp_path / "rules.json"
+        rules_path.write_text(json.dumps({"rules": [{"name": "vacia"}]}))
+        cache_dir = tmp_path / "cache"
+
+        first = load_rule_specs(rules_path, cache_dir)
+        assert list(cache_dir.iterdir())
+
+        # el archivo sin cambios no se vuelve a leer
+        assert load_rule_specs(rules_path, cache_dir) == first
@@ -0,0 +1,62 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "policies"))
+
+from rule_compiler import compile_rule, normalize_rules  # noqa: E402
+from trigger_fields import decode_field, decode_triggers  # noqa: E402
+
+TAGS = {"Project": "demo", "Environment": "dev", "ManagedBy": "terraform"}
+
+
+class TestTriggerFields:
+    """pruebas de la decodificacion de campos estructurados"""
+
+    def test_repr_and_json_decode_equally(self):
+        """verificar que str() y json producen el mismo valor"""
+        triggers = {"resource_type": "vpc", "tags": str(TAGS), "ports": "[80, 443]"}
+        json_triggers = {**triggers, "tags": json.dumps(TAGS)}
+
+        decoded = decode_triggers(triggers)
+
+        assert decoded == decode_triggers(json_triggers)
+        assert decoded["tags"] == TAGS
+        assert decoded["ports"] == [80, 443]
+        assert decoded["resource_type"] == "vpc"
+
+    def test_identical_text_is_decoded_once(self):
+        """verificar que el mismo texto se decodifica una sola vez"""
+        text = str({**TAGS, "Owner": "equipo-unico"})
+        decode_field.cache_clear()
+
+        values = [decode_triggers({"tags": text})["tags"] for _ in range(100)]
+
+        assert all(value is values[0] for value in values)
+        assert decode_field.cache_info().misses == 1
+
+    def test_tag_keys_are_not_substrings(self):
+        """verificar que los tags se buscan como claves y no como texto"""
+        (rule,) = normalize_rules(
+            {
+                "rules": [
+                    {
+                        "name": "tags",
+                        "checks": [
+                            {
+                                "field": "tags",
+                                "op": "contains_all",
+                                "value": ["Project"],
+                                "message": "faltan {missing}",
+                            }
+                        ],
+                    }
+                ]
+            }
+        )
+        evaluate = compile_rule(rule)
+
+        assert evaluate({}, {"tags": str({"Name": "Project-x"})}) == [
+            "faltan ['Project']"
+        ]
+        assert evaluate({}, {"tags": json.dumps(TAGS)}) == []
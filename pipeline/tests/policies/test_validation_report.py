@@ -0,0 +1,76 @@
+import json
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "policies"))
+
+from security import PolicyRule, run_rules  # noqa: E402
+from validation_report import (  # noqa: E402
+    RuleResult,
+    write_json_report,
+    write_junit_report,
+)
+
+
+def resource(name, resource_type):
+    """recurso null_resource con su resource_type"""
+    return {
+        "type": "null_resource",
+        "name": name,
+        "values": {"triggers": {"resource_type": resource_type}},
+    }
+
+
+class TestValidationReport:
+    """pruebas de los reportes por regla"""
+
+    def test_timed_rules_count_examined_resources(self):
+        """verificar que cada regla cuenta solo los recursos que evalua"""
+        rules = [
+            PolicyRule(
+                "vpc",
+                lambda resource, triggers: [f"{resource['name']} invalida"],
+                resource_types=["vpc"],
+            ).timed(),
+            PolicyRule("total", lambda entries: [], aggregate=True).timed(),
+        ]
+        resources = [resource("red", "vpc"), resource("a", "subnet")]
+        resources.append(resource("b", "subnet"))
+
+        results = list(run_rules(resources, rules))
+
+        assert results == [("vpc", ["red invalida"]), ("total", [])]
+        assert [rule.examined for rule in rules] == [1, 3]
+        assert all(rule.seconds >= 0 for rule in rules)
+
+    def test_json_and_junit_reports(self, tmp_path):
+        """verificar el contenido de los reportes json y junit"""
+        results = [
+            RuleResult("tags", [], 0.25, 10),
+            RuleResult("vpc", ["cidr publico", "sin dns"], 0.5, 2),
+        ]
+        json_path = tmp_path / "report.json"
+        junit_path = tmp_path / "report.xml"
+
+        write_json_report(json_path, "security", results, 1.0, mode="serie")
+        write_junit_report(junit_path, "security", results, 1.0)
+
+        report = json.loads(json_path.read_text())
+        assert not report["passed"]
+        assert report["mode"] == "serie"
+        assert report["rules"][1] == {
+            "name": "vpc",
+            "passed": False,
+            "errors": ["cidr publico", "sin dns"],
+            "seconds": 0.5,
+            "examined": 2,
+        }
+
+        suite = ET.parse(junit_path).getroot().find("testsuite")
+        assert suite.get("tests") == "2"
+        assert suite.get("failures") == "1"
+        tags, vpc = suite.findall("testcase")
+        assert tags.find("failure") is None
+        assert vpc.find("failure").text == "cidr publico\nsin dns"
+        assert vpc.find("properties/property").get("value") == "2"
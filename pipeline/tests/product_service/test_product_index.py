@@ -0,0 +1,194 @@
+import random
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(
+    0, str(Path(__file__).resolve().parents[3] / "microservices/product-service/app")
+)
+
+from product_index import ProductIndex, decode_cursor, encode_cursor  # noqa: E402
+
+
+def product(product_id, name, category="libros", price=10.0):
+    """producto con los campos que indexa ProductIndex"""
+    return SimpleNamespace(id=product_id, name=name, category=category, price=price)
+
+
+def catalog(*products):
+    """indice con los productos agregados uno a uno"""
+    index = ProductIndex()
+    for item in products:
+        index.add(item)
+    return index
+
+
+def expected(products, name=None, category=None, min_price=None, max_price=None):
+    """ids que cumplen los filtros recorriendo todos los productos"""
+    return [
+        item.id
+        for item in products
+        if (not name or name.lower() in item.name.lower())
+        and (not category or category.lower() == item.category.lower())
+        and (min_price is None or item.price >= min_price)
+        and (max_price is None or item.price <= max_price)
+    ]
+
+
+class TestProductIndexSearch:
+    """pruebas de las busquedas con indices secundarios"""
+
+    def test_name_uses_trigrams(self):
+        """verificar subcadenas de 3 o mas caracteres sin distinguir mayusculas"""
+        index = catalog(
+            product("1", "Teclado mecanico"),
+            product("2", "Mouse"),
+            product("3", "Funda de teclado"),
+        )
+
+        assert index.search(name="TECLADO") == ["1", "3"]
+        assert index.search(name="clad") == ["1", "3"]
+        # todos los trigramas aparecen pero no la subcadena completa
+        assert index.search(name="tecladomouse") == []
+
+    def test_short_name_scans_every_product(self):
+        """verificar nombres de menos de 3 caracteres, sin trigramas"""
+        index = catalog(
+            product("1", "Monitor"), product("2", "Mouse"), product("3", "Cable")
+        )
+
+        assert index.search(name="mo") == ["1", "2"]
+        assert index.search(name="o", limit=1) == ["1"]
+
+    def test_category_and_price(self):
+        """verificar categoria normalizada y rangos de precio con bisect"""
+        products = [
+            product("1", "Novela", "Libros", 15.0),
+            product("2", "Lampara", "hogar", 30.0),
+            product("3", "Ensayo", "libros", 30.0),
+            product("4", "Atlas", "LIBROS", 80.0),
+        ]
+        index = catalog(*products)
+
+        assert index.search(category="libros") == ["1", "3", "4"]
+        assert index.search(min_price=30) == ["2", "3", "4"]
+        assert index.search(max_price=30) == ["1", "2", "3"]
+        assert index.search(category="LIBROS", min_price=20, max_price=50) == ["3"]
+        assert index.search(min_price=90) == []
+
+    def test_update_reindexes(self):
+        """verificar que modificar un producto actualiza sus indices"""
+        index = catalog(product("1", "Silla", "hogar", 50.0))
+
+        index.add(product("1", "Mesa", "oficina", 120.0))
+
+        assert index.search(name="silla") == []
+        assert index.search(category="hogar") == []
+        assert index.search(name="mesa", category="oficina", min_price=100) == ["1"]
+        assert index.search(max_price=60) == []
+
+    def test_paths_agree_with_full_scan(self):
+        """verificar que recorrer o intersectar indices da el mismo resultado"""
+        rng = random.Random(7)
+        words = ["teclado", "monitor", "cable", "funda", "mouse"]
+        products = [
+            product(
+                str(i),
+                f"{rng.choice(words)} {rng.choice(words)}",
+                rng.choice(["hogar", "oficina", "libros"]),
+                float(rng.randint(1, 100)),
+            )
+            for i in range(300)
+        ]
+        index = ProductIndex()
+        index.extend(products[:200])
+        for item in products[200:]:
+            index.add(item)
+
+        for _ in range(200):
+            filters = {
+                "name": rng.choice([None, "mo", "cable", "funda mouse", "xyz"]),
+                "category": rng.choice([None, "hogar", "Oficina"]),
+                "min_price": rng.choice([None, 20.0, 50.0]),
+                "max_price": rng.choice([None, 60.0, 99.0]),
+            }
+            limit = rng.choice([None, 1, 5, 50])
+            assert index.search(limit=limit, **filters) == (
+                expected(products, **filters)[:limit]
+            )
+
+
+def pages(index, limit, updates=None, **filters):
+    """
+    recorrer todas las paginas como /products: se pide un resultado extra
+    para saber si hay otra pagina. updates(n) se llama despues de cada pagina
+    """
+    after = None
+    seen = []
+    while True:
+        found = index.search(limit=limit + 1, after=after, **filters)
+        page = found[:limit]
+        seen.append(page)
+        if len(found) <= limit:
+            return seen
+        after = decode_cursor(encode_cursor(index.seq(page[-1])))
+        if updates:
+            updates(len(seen))
+
+
+class TestCursorPaging:
+    """pruebas de la paginacion por cursor"""
+
+    def test_cursor_round_trip(self):
+        """verificar que el cursor es opaco y se decodifica a su secuencia"""
+        cursor = encode_cursor(41)
+
+        assert "41" not in cursor
+        assert decode_cursor(cursor) == 41
+
+    @pytest.mark.parametrize("cursor", ["", "no es base64!", encode_cursor(1)[:-1]])
+    def test_invalid_cursor(self, cursor):
+        """verificar que un cursor invalido es un ValueError"""
+        with pytest.raises(ValueError, match="cursor invalido"):
+            decode_cursor(cursor)
+
+    def test_pages_are_stable_across_updates(self):
+        """verificar que modificar o crear productos no repite ni salta paginas"""
+        index = catalog(
+            *(product(str(i), f"libro {i}", price=float(i)) for i in range(10))
+        )
+
+        def updates(page):
+            # un producto visto y otro pendiente cambian de precio, otro
+            # pendiente deja de cumplir el filtro y se crea uno nuevo
+            if page <= 2:
+                index.add(product("1", "libro 1", price=99.0))
+                index.add(product("8", "libro 8", price=float(page)))
+                index.add(product("5", "libro 5", "hogar"))
+                index.add(product(f"nuevo-{page}", "libro nuevo", price=1.0))
+
+        seen = pages(index, 3, updates, category="libros")
+
+        # cada producto conserva su posicion al modificarse y los nuevos
+        # aparecen al final
+        assert seen == [
+            ["0", "1", "2"],
+            ["3", "4", "6"],
+            ["7", "8", "9"],
+            ["nuevo-1", "nuevo-2"],
+        ]
+
+    def test_filtered_pages(self):
+        """verificar que las paginas con filtros cubren todos los resultados"""
+        index = ProductIndex()
+        index.extend(
+            product(str(i), f"item {i % 3}", price=float(i)) for i in range(50)
+        )
+
+        seen = pages(index, 4, name="item 1", min_price=10)
+
+        assert [product_id for page in seen for product_id in page] == [
+            str(i) for i in range(10, 50) if i % 3 == 1
+        ]
@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(
+    0, str(Path(__file__).resolve().parents[3] / "microservices/product-service/app")
+)
+
+from product_stats import ProductStats  # noqa: E402
+
+
+def product(product_id, category, stock):
+    """producto con los campos que cuenta ProductStats"""
+    return SimpleNamespace(id=product_id, category=category, stock=stock)
+
+
+class TestProductStats:
+    """pruebas de los agregados del catalogo"""
+
+    def test_add_products(self):
+        """verificar totales y desglose por categoria al agregar productos"""
+        stats = ProductStats()
+
+        stats.add(product("1", "libros", 3))
+        stats.add(product("2", "libros", 2))
+        stats.add(product("3", "hogar", 5))
+
+        assert stats.total_products == 3
+        assert stats.total_stock == 10
+        assert stats.categories() == {
+            "libros": {"count": 2, "stock": 5},
+            "hogar": {"count": 1, "stock": 5},
+        }
+
+    def test_update_moves_category_and_stock(self):
+        """verificar que modificar un producto reemplaza sus aportes"""
+        stats = ProductStats()
+        stats.add(product("1", "libros", 3))
+        stats.add(product("2", "libros", 2))
+
+        stats.add(product("1", "hogar", 7))
+
+        assert stats.total_products == 2
+        assert stats.total_stock == 9
+        assert stats.categories() == {
+            "libros": {"count": 1, "stock": 2},
+            "hogar": {"count": 1, "stock": 7},
+        }
+
+    def test_empty_category_disappears(self):
+        """verificar que una categoria sin productos deja de aparecer"""
+        stats = ProductStats()
+        stats.add(product("1", "libros", 3))
+        stats.add(product("2", "hogar", 1))
+
+        stats.add(product("1", "oficina", 3))
+        stats.remove("2")
+
+        assert stats.categories() == {"oficina": {"count": 1, "stock": 3}}
+        assert stats.total_products == 1
+        assert stats.total_stock == 3
@@ -0,0 +1,178 @@
+import asyncio
+import importlib
+import json
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_DIR = Path(__file__).resolve().parents[3] / "microservices/product-service/app"
+sys.path.insert(0, str(APP_DIR))
+
+import product_store  # noqa: E402
+from product_store import ProductStore  # noqa: E402
+
+
+def record(product_id, price=10.0):
+    """registro de producto tal como lo guarda el store"""
+    return {"id": product_id, "name": f"producto {product_id}", "price": price}
+
+
+class Catalog:
+    """catalogo en memoria con un store abierto, como main.py"""
+
+    def __init__(self, data_dir, snapshot_every=1000):
+        self.products = {}
+        self.store = ProductStore(data_dir, dict, snapshot_every)
+        for item in self.store.recover():
+            self.products[item["id"]] = item
+        self.store.open(self.products.values)
+
+    async def save(self, item):
+        """guardar un producto y esperar a que este persistido"""
+        self.products[item["id"]] = item
+        self.store.append(item)
+        await self.store.sync()
+
+
+def files(data_dir):
+    """nombres de los archivos del directorio de datos"""
+    return sorted(path.name for path in Path(data_dir).iterdir())
+
+
+class TestProductStore:
+    """pruebas del wal con fsync por lotes y snapshots"""
+
+    def test_torn_last_line_is_dropped(self, tmp_path):
+        """verificar que una escritura cortada por una caida se descarta"""
+        (tmp_path / "wal-0.log").write_text(
+            json.dumps(record("a")) + "\n" + '{"id": "b", "na'
+        )
+
+        assert [item["id"] for item in ProductStore(tmp_path, dict).recover()] == ["a"]
+
+    def test_corrupt_line_fails(self, tmp_path):
+        """verificar que un registro danado antes del final es un error"""
+        (tmp_path / "wal-0.log").write_text("no es json\n" + json.dumps(record("a")))
+
+        with pytest.raises(ValueError, match="wal-0.log:1"):
+            list(ProductStore(tmp_path, dict).recover())
+
+    def test_acknowledged_write_is_on_disk(self, tmp_path, monkeypatch):
+        """verificar que sync() vuelve despues del fsync del registro"""
+        synced = []
+        fsync = product_store.os.fsync
+
+        def spy(fd):
+            fsync(fd)
+            synced.append((tmp_path / "wal-0.log").read_text())
+
+        monkeypatch.setattr(product_store.os, "fsync", spy)
+
+        async def run():
+            catalog = Catalog(tmp_path)
+            await catalog.save(record("a"))
+            # contenido del wal en cada fsync hecho antes de confirmar
+            acknowledged = list(synced)
+            await catalog.store.close()
+            return acknowledged
+
+        acknowledged = asyncio.run(run())
+
+        assert json.dumps(record("a")) + "\n" in acknowledged
+
+    def test_recovery_after_rotation_and_snapshot(self, tmp_path):
+        """verificar la recuperacion desde el snapshot y los segmentos nuevos"""
+
+        async def run():
+            catalog = Catalog(tmp_path, snapshot_every=3)
+            for i in range(8):
+                await catalog.save(record(str(i % 5), price=float(i)))
+            await catalog.store.close()
+
+        asyncio.run(run())
+
+        # los segmentos y snapshots anteriores al ultimo snapshot se borran
+        assert files(tmp_path) == ["snapshot-2.jsonl", "wal-2.log"]
+        recovered = Catalog(tmp_path)
+        assert recovered.products == {
+            str(i % 5): record(str(i % 5), float(i)) for i in range(3, 8)
+        }
+        asyncio.run(recovered.store.close())
+
+    def test_close_without_open(self, tmp_path):
+        """verificar que cerrar un store que no se abrio no falla"""
+        asyncio.run(ProductStore(tmp_path, dict).close())
+
+    def test_failed_snapshot_is_reported(self, tmp_path, monkeypatch, caplog):
+        """verificar que el error de un snapshot se registra en la rotacion"""
+
+        def broken(generation, products):
+            raise OSError("disco lleno")
+
+        async def run():
+            catalog = Catalog(tmp_path, snapshot_every=2)
+            monkeypatch.setattr(catalog.store, "_write_snapshot", broken)
+            for i in range(2):
+                await catalog.save(record(str(i)))
+            # se espera al snapshot fallido antes de la siguiente rotacion
+            await asyncio.wait([catalog.store._snapshotting])
+            for i in range(2, 4):
+                await catalog.save(record(str(i)))
+            with pytest.raises(OSError, match="disco lleno"):
+                await catalog.store.close()
+
+        with caplog.at_level(logging.ERROR, logger="product_store"):
+            asyncio.run(run())
+
+        assert "fallo el snapshot" in caplog.text
+        # sin snapshots los segmentos siguen alcanzando para recuperar
+        recovered = Catalog(tmp_path)
+        assert sorted(recovered.products) == ["0", "1", "2", "3"]
+        asyncio.run(recovered.store.close())
+
+
+class TestServiceRestart:
+    """pruebas del reinicio del servicio de productos"""
+
+    def test_products_survive_restart(self, tmp_path, monkeypatch):
+        """verificar que load_products reconstruye catalogo, indice y totales"""
+        pytest.importorskip("fastapi")
+        pytest.importorskip("uvicorn")
+        monkeypatch.setenv("PRODUCT_DATA_DIR", str(tmp_path))
+        # cada arranque importa main de nuevo, con catalogo e indices vacios
+        sys.modules.pop("main", None)
+
+        async def create():
+            main = importlib.import_module("main")
+            await main.load_products()
+            created = await main.create_product(
+                main.ProductCreate(
+                    name="Teclado",
+                    description="mecanico",
+                    price=50.0,
+                    category="perifericos",
+                    stock=3,
+                )
+            )
+            await main.close_store()
+            return created.id
+
+        product_id = asyncio.run(create())
+        sys.modules.pop("main")
+
+        async def restart():
+            main = importlib.import_module("main")
+            await main.load_products()
+            try:
+                return main
+            finally:
+                await main.close_store()
+
+        main = asyncio.run(restart())
+        sys.modules.pop("main")
+
+        assert main.products_db[product_id].name == "Teclado"
+        assert main.product_index.search(name="tecl") == [product_id]
+        assert main.product_stats.total_stock == 3
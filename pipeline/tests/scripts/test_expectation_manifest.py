@@ -0,0 +1,132 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+import generate_infrastructure  # noqa: E402
+import validate_terraform_outputs  # noqa: E402
+from validate_terraform_outputs import (  # noqa: E402
+    TerraformPlanValidator,
+    load_expectation_manifest,
+)
+
+
+def write_plan(path, resource_types):
+    """escribir un plan json con un null_resource por cada resource_type"""
+    resources = [
+        {
+            "type": "null_resource",
+            "name": f"recurso_{i}",
+            "values": {"triggers": {"resource_type": resource_type}},
+        }
+        for i, resource_type in enumerate(resource_types)
+    ]
+    path.write_text(
+        json.dumps({"planned_values": {"root_module": {"resources": resources}}})
+    )
+
+
+class TestExpectationManifest:
+    """pruebas del manifiesto de expectativas generado"""
+
+    def test_counts_come_from_manifest(self, tmp_path):
+        """verificar conteos contra el manifiesto para cualquier tamano"""
+        plan_path = tmp_path / "plan.json"
+        write_plan(plan_path, ["vpc"] + ["kubernetes_node"] * 40)
+        summary_path = tmp_path / "infrastructure_summary.json"
+        summary_path.write_text(
+            json.dumps(
+                {
+                    "total_resources": 41,
+                    "expectation_manifest": {
+                        "total_resources": 41,
+                        "resource_types": {"kubernetes_node": 40, "vpc": 1},
+                    },
+                }
+            )
+        )
+
+        manifest = load_expectation_manifest(str(summary_path))
+        validator = TerraformPlanValidator(str(plan_path))
+
+        assert validator.type_counts == {"kubernetes_node": 40, "vpc": 1}
+        assert validator.validate_resource_count(manifest["total_resources"])
+        assert validator.validate_resource_types(manifest["resource_types"])
+
+    def test_type_mismatch_fails(self, tmp_path, capsys):
+        """verificar que un tipo con menos recursos de los esperados falla"""
+        plan_path = tmp_path / "plan.json"
+        write_plan(plan_path, ["subnet", "container"])
+
+        validator = TerraformPlanValidator(str(plan_path))
+
+        assert not validator.validate_resource_types({"subnet": 2})
+        output = capsys.readouterr().out
+        assert "subnet: esperados 2, encontrados 1" in output
+        assert "container: esperados 0, encontrados 1" in output
+
+    def test_summary_without_manifest(self, tmp_path):
+        """verificar resumenes anteriores que solo tienen el total"""
+        summary_path = tmp_path / "infrastructure_summary.json"
+        summary_path.write_text(json.dumps({"total_resources": 27}))
+
+        assert load_expectation_manifest(str(summary_path)) == {"total_resources": 27}
+
+
+def run_main(monkeypatch, *args):
+    """ejecutar el validador por linea de comandos y devolver el codigo de salida"""
+    monkeypatch.setattr(sys, "argv", ["validate_terraform_outputs.py", *args])
+    with pytest.raises(SystemExit) as exit_info:
+        validate_terraform_outputs.main()
+    return exit_info.value.code
+
+
+class TestMissingManifest:
+    """pruebas del validador sin manifiesto de expectativas"""
+
+    def test_missing_summary_fails(self, tmp_path, monkeypatch, capsys):
+        """verificar que sin manifiesto el validador no aprueba en silencio"""
+        plan_path = tmp_path / "plan.json"
+        write_plan(plan_path, ["vpc"])
+
+        assert run_main(monkeypatch, str(plan_path)) == 1
+        assert "--allow-missing-summary" in capsys.readouterr().out
+
+    def test_missing_summary_can_be_allowed(self, tmp_path, monkeypatch, capsys):
+        """verificar que con --allow-missing-summary solo se omiten conteos"""
+        plan_path = tmp_path / "plan.json"
+        write_plan(plan_path, ["vpc"])
+
+        run_main(monkeypatch, str(plan_path), "--allow-missing-summary")
+
+        output = capsys.readouterr().out
+        assert "se omiten conteos" in output
+        assert "validando conteo de recursos" not in output
+
+    def test_generated_summary_matches_plan(self, tmp_path, monkeypatch, capsys):
+        """verificar que el resumen generado valida los conteos de su plan"""
+        generate_infrastructure.main(str(tmp_path))
+        terraform_config = json.loads((tmp_path / "main.tf.json").read_text())
+        resources = [
+            {"type": "null_resource", "name": name, "values": instances[0]}
+            for block in terraform_config["resource"]
+            for null_resource in block["null_resource"]
+            for name, instances in null_resource.items()
+        ]
+        plan_path = tmp_path / "plan.json"
+        plan_path.write_text(
+            json.dumps({"planned_values": {"root_module": {"resources": resources}}})
+        )
+        summary_path = tmp_path / "infrastructure_summary.json"
+        capsys.readouterr()
+
+        assert (
+            run_main(monkeypatch, str(plan_path), "--summary", str(summary_path)) == 0
+        )
+        output = capsys.readouterr().out
+        assert "exito: conteo de recursos" in output
+        assert "exito: conteo por tipo de recurso" in output
@@ -0,0 +1,132 @@
+import json
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+from validate_terraform_outputs import TerraformPlanValidator  # noqa: E402
+
+# terraform falso: registra cada llamada y escribe el json de FAKE_PLAN_JSON
+FAKE_TERRAFORM = """#!{python}
+import os
+import sys
+
+with open(os.environ["FAKE_TERRAFORM_LOG"], "a") as log:
+    log.write(" ".join(sys.argv[1:]) + "\\n")
+
+if os.environ.get("FAKE_TERRAFORM_FAIL"):
+    sys.exit(1)
+
+with open(os.environ["FAKE_PLAN_JSON"]) as plan:
+    sys.stdout.write(plan.read())
+"""
+
+
+def build_plan(resource_count):
+    """construir un plan json con recursos null_resource"""
+    return {
+        "format_version": "1.2",
+        "planned_values": {
+            "root_module": {
+                "resources": [
+                    {
+                        "type": "null_resource",
+                        "name": f"nodo_{i}",
+                        "values": {"triggers": {"resource_type": "kubernetes_node"}},
+                    }
+                    for i in range(resource_count)
+                ]
+            }
+        },
+    }
+
+
+@pytest.fixture
+def fake_terraform(tmp_path, monkeypatch):
+    """colocar un terraform falso al inicio del PATH"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    terraform = bin_dir / "terraform"
+    terraform.write_text(FAKE_TERRAFORM.format(python=sys.executable))
+    terraform.chmod(terraform.stat().st_mode | stat.S_IEXEC)
+
+    log_path = tmp_path / "terraform.log"
+    log_path.touch()
+    plan_json = tmp_path / "rendered.json"
+    plan_json.write_text(json.dumps(build_plan(3)))
+
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_TERRAFORM_LOG", str(log_path))
+    monkeypatch.setenv("FAKE_PLAN_JSON", str(plan_json))
+
+    def calls():
+        return log_path.read_text().splitlines()
+
+    return calls
+
+
+@pytest.fixture
+def binary_plan(tmp_path):
+    """plan binario de terraform (un zip)"""
+    plan_file = tmp_path / "tfplan"
+    plan_file.write_bytes(b"PK\x03\x04plan-binario")
+    return plan_file
+
+
+class TestPlanRenderCache:
+    """pruebas de la cache de planes renderizados"""
+
+    def test_prerendered_json_skips_terraform(self, tmp_path, fake_terraform):
+        """verificar que un plan json no ejecuta terraform"""
+        plan_json = tmp_path / "plan.json"
+        plan_json.write_text(json.dumps(build_plan(5)))
+
+        validator = TerraformPlanValidator(str(plan_json), str(tmp_path / "cache"))
+
+        assert validator.resource_count == 5
+        assert fake_terraform() == []
+
+    def test_repeated_validation_uses_cache(
+        self, tmp_path, fake_terraform, binary_plan
+    ):
+        """verificar que el mismo plan binario se renderiza una sola vez"""
+        cache_dir = str(tmp_path / "cache")
+
+        first = TerraformPlanValidator(str(binary_plan), cache_dir)
+        second = TerraformPlanValidator(str(binary_plan), cache_dir)
+
+        assert first.resource_count == second.resource_count == 3
+        assert fake_terraform() == [f"show -json {binary_plan}"]
+
+    def test_changed_plan_renders_again(self, tmp_path, fake_terraform, binary_plan):
+        """verificar que un plan binario distinto no reutiliza la cache"""
+        cache_dir = str(tmp_path / "cache")
+
+        TerraformPlanValidator(str(binary_plan), cache_dir)
+        binary_plan.write_bytes(b"PK\x03\x04otro-plan")
+        TerraformPlanValidator(str(binary_plan), cache_dir)
+
+        assert len(fake_terraform()) == 2
+
+    def test_failed_render_is_not_cached(
+        self, tmp_path, fake_terraform, binary_plan, monkeypatch
+    ):
+        """verificar que un fallo de terraform no deja entradas en cache"""
+        cache_dir = tmp_path / "cache"
+        monkeypatch.setenv("FAKE_TERRAFORM_FAIL", "1")
+
+        with pytest.raises(SystemExit):
+            TerraformPlanValidator(str(binary_plan), str(cache_dir))
+
+        assert list(cache_dir.iterdir()) == []
+
+    def test_without_cache_reads_pipe(self, fake_terraform, binary_plan):
+        """verificar que sin cache se lee la salida de terraform directamente"""
+        validator = TerraformPlanValidator(str(binary_plan), cache_dir=None)
+
+        assert validator.resource_count == 3
+        assert len(fake_terraform()) == 1